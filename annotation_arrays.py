@@ -0,0 +1,399 @@
+import os
+from array import array
+from datetime import datetime, timezone
+import numpy as np
+from export_store import record_format
+from task_sources import iter_task_file
+
+# Bump when the cached column layout changes
+_CACHE_VERSION = 1
+
+# Region value types with normalized bounding boxes (percent of image size)
+_BOX_TYPES = ("rectanglelabels", "rectangle")
+
+def _timestamp(value):
+    if not value:
+        return np.nan
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return np.nan
+
+class _Codes:
+    """
+    Assign dense integer codes to strings (labels, control names).
+    """
+    def __init__(self, values=()):
+        self.values = list(values)
+        self.index = {v: i for i, v in enumerate(self.values)}
+
+    def code(self, value):
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+class AnnotationTable:
+    """
+    Columnar view of an annotation export.
+    Annotations, label results and bounding-box regions are stored as flat NumPy
+    arrays with integer-coded labels, so metrics run as vectorized reductions
+    instead of loops over nested dicts.
+    """
+    ANNOTATION_COLUMNS = ("ann_task", "ann_annotator", "ann_lead_time", "ann_created_at", "ann_cancelled")
+    RESULT_COLUMNS = ("res_ann", "res_from_name", "res_label")
+    REGION_COLUMNS = ("reg_ann", "reg_from_name", "reg_label", "reg_x", "reg_y", "reg_w", "reg_h")
+
+    def __init__(self, columns, labels, from_names):
+        for name in self.ANNOTATION_COLUMNS + self.RESULT_COLUMNS + self.REGION_COLUMNS:
+            setattr(self, name, columns[name])
+        self.labels = list(labels)
+        self.from_names = list(from_names)
+
+    @property
+    def annotation_count(self):
+        return len(self.ann_task)
+
+    @property
+    def result_count(self):
+        return len(self.res_ann)
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Build the table from an iterable of exported tasks (Label Studio JSON export shape).
+        Values are appended to typed buffers, so no per-annotation Python objects are kept.
+        """
+        cols = {
+            "ann_task": array("q"), "ann_annotator": array("q"), "ann_lead_time": array("d"),
+            "ann_created_at": array("d"), "ann_cancelled": array("b"),
+            "res_ann": array("l"), "res_from_name": array("l"), "res_label": array("l"),
+            "reg_ann": array("l"), "reg_from_name": array("l"), "reg_label": array("l"),
+            "reg_x": array("f"), "reg_y": array("f"), "reg_w": array("f"), "reg_h": array("f"),
+        }
+        labels = _Codes()
+        from_names = _Codes()
+        ann_index = 0
+        for task in records:
+            task_id = task.get("id", -1)
+            for annotation in task.get("annotations") or []:
+                completed_by = annotation.get("completed_by")
+                if isinstance(completed_by, dict):
+                    completed_by = completed_by.get("id")
+                lead_time = annotation.get("lead_time")
+                cols["ann_task"].append(task_id)
+                cols["ann_annotator"].append(completed_by if completed_by is not None else -1)
+                cols["ann_lead_time"].append(lead_time if lead_time is not None else np.nan)
+                cols["ann_created_at"].append(_timestamp(annotation.get("created_at")))
+                cols["ann_cancelled"].append(1 if annotation.get("was_cancelled") else 0)
+                for region in annotation.get("result") or []:
+                    value = region.get("value") or {}
+                    from_code = from_names.code(region.get("from_name") or "")
+                    for key, values in value.items():
+                        if key != "choices" and key != "taxonomy" and not key.endswith("labels"):
+                            continue
+                        for label in values or []:
+                            label_code = labels.code("/".join(label) if isinstance(label, list) else str(label))
+                            cols["res_ann"].append(ann_index)
+                            cols["res_from_name"].append(from_code)
+                            cols["res_label"].append(label_code)
+                            if key in _BOX_TYPES and "width" in value:
+                                cols["reg_ann"].append(ann_index)
+                                cols["reg_from_name"].append(from_code)
+                                cols["reg_label"].append(label_code)
+                                cols["reg_x"].append(value.get("x", 0.0))
+                                cols["reg_y"].append(value.get("y", 0.0))
+                                cols["reg_w"].append(value.get("width", 0.0))
+                                cols["reg_h"].append(value.get("height", 0.0))
+                ann_index += 1
+        columns = {name: np.frombuffer(buf, dtype=buf.typecode) if len(buf) else np.array([], dtype=buf.typecode)
+                   for name, buf in cols.items()}
+        columns["ann_cancelled"] = columns["ann_cancelled"].astype(bool)
+        return cls(columns, labels.values, from_names.values)
+
+    def save(self, path):
+        columns = {name: getattr(self, name) for name in self.ANNOTATION_COLUMNS + self.RESULT_COLUMNS + self.REGION_COLUMNS}
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            labels=np.array(self.labels, dtype=str),
+            from_names=np.array(self.from_names, dtype=str),
+            version=np.array(_CACHE_VERSION),
+            **columns,
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            if int(data["version"]) != _CACHE_VERSION:
+                raise ValueError(f"Column cache {path} has an outdated layout.")
+            columns = {name: data[name] for name in data.files if name not in ("labels", "from_names", "version")}
+            return cls(columns, data["labels"].tolist(), data["from_names"].tolist())
+
+def columns_cache_path(export_path):
+    return f"{export_path}.columns.npz"
+
+def load_table(export_path):
+    """
+    Load an export file as an AnnotationTable, reusing the .columns.npz cache next to it
+    when it is newer than the export. The export is parsed with the streaming readers
+    in task_sources, so it is never held in memory as Python dicts.
+    """
+    if not export_path or not os.path.isfile(export_path):
+        raise ValueError(f"Export file not found: {export_path}")
+    cache_path = columns_cache_path(export_path)
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(export_path):
+        try:
+            return AnnotationTable.load(cache_path)
+        except (ValueError, OSError, KeyError):
+            pass
+    fmt = record_format(export_path)
+    if fmt not in ('json', 'jsonl'):
+        raise ValueError(f"Annotation analytics need a JSON or JSONL export, got {export_path}.")
+    table = AnnotationTable.from_records(iter_task_file(export_path, format=fmt))
+    table.save(cache_path)
+    return table
+
+def _from_name_mask(table, codes, from_name):
+    if from_name is None:
+        return np.ones(len(codes), dtype=bool)
+    if from_name not in table.from_names:
+        raise ValueError(f"Control '{from_name}' does not appear in the export.")
+    return codes == table.from_names.index(from_name)
+
+def _active_results(table, from_name=None):
+    """
+    Boolean mask over results that belong to non-cancelled annotations (and from_name, if given).
+    """
+    mask = ~table.ann_cancelled[table.res_ann]
+    return mask & _from_name_mask(table, table.res_from_name, from_name)
+
+def label_distribution(table, from_name=None):
+    """
+    Count label occurrences across non-cancelled annotations.
+    """
+    mask = _active_results(table, from_name)
+    counts = np.bincount(table.res_label[mask], minlength=len(table.labels))
+    total = int(counts.sum())
+    order = np.argsort(-counts, kind="stable")
+    return {
+        "total": total,
+        "labels": [
+            {"label": table.labels[i], "count": int(counts[i]), "share": round(float(counts[i]) / total, 4) if total else 0.0}
+            for i in order if counts[i]
+        ],
+    }
+
+def _group_bounds(sorted_keys):
+    """
+    Start offsets and sizes of the runs of equal values in a sorted array.
+    """
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    return starts, np.diff(np.r_[starts, len(sorted_keys)])
+
+def _group_pairs(sorted_keys, max_pairs):
+    """
+    Index arrays (left, right) of every ordered pair of rows sharing a key, built with
+    array arithmetic instead of per-group loops. Pairs are ordered by left row.
+    """
+    starts, sizes = _group_bounds(sorted_keys)
+    group = np.repeat(np.arange(len(sizes)), sizes)
+    rep = sizes[group]
+    total = int(rep.sum())
+    if total > max_pairs:
+        raise ValueError(f"Comparison would build {total} pairs; restrict it with from_name.")
+    left = np.repeat(np.arange(len(sorted_keys)), rep)
+    within = np.arange(total) - np.repeat(np.cumsum(rep) - rep, rep)
+    return left, starts[group[left]] + within
+
+def annotator_throughput(table):
+    """
+    Per-annotator annotation counts, distinct tasks, lead time totals and annotations per hour
+    of active (lead) time, plus the first/last annotation timestamps.
+    """
+    mask = ~table.ann_cancelled
+    annotators, inverse = np.unique(table.ann_annotator[mask], return_inverse=True)
+    if not len(annotators):
+        return {"annotators": []}
+    lead = table.ann_lead_time[mask]
+    lead_valid = ~np.isnan(lead)
+    counts = np.bincount(inverse, minlength=len(annotators))
+    lead_sum = np.bincount(inverse, weights=np.where(lead_valid, lead, 0.0), minlength=len(annotators))
+    lead_n = np.bincount(inverse, weights=lead_valid, minlength=len(annotators))
+    # Sort once by annotator so per-annotator min/max are segment reductions
+    order = np.argsort(inverse, kind="stable")
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+    created = table.ann_created_at[mask][order]
+    first = np.minimum.reduceat(np.where(np.isnan(created), np.inf, created), starts)
+    last = np.maximum.reduceat(np.where(np.isnan(created), -np.inf, created), starts)
+    # Distinct (annotator, task) pairs
+    task_ids, task_idx = np.unique(table.ann_task[mask], return_inverse=True)
+    pairs = np.sort(inverse.astype(np.int64) * len(task_ids) + task_idx)
+    starts_pairs, _ = _group_bounds(pairs)
+    tasks = np.bincount(pairs[starts_pairs] // len(task_ids), minlength=len(annotators))
+    cancelled_ids = table.ann_annotator[~mask]
+    cancelled_ids = cancelled_ids[np.isin(cancelled_ids, annotators)]
+    cancelled = np.bincount(np.searchsorted(annotators, cancelled_ids), minlength=len(annotators))
+    result = []
+    for i in np.argsort(-counts, kind="stable"):
+        hours = lead_sum[i] / 3600.0
+        result.append({
+            "annotator_id": int(annotators[i]),
+            "annotation_count": int(counts[i]),
+            "task_count": int(tasks[i]),
+            "cancelled_count": int(cancelled[i]),
+            "lead_time_total_seconds": round(float(lead_sum[i]), 1),
+            "lead_time_mean_seconds": round(float(lead_sum[i] / lead_n[i]), 2) if lead_n[i] else None,
+            "annotations_per_hour": round(float(counts[i] / hours), 2) if hours > 0 else None,
+            "first_annotation_at": datetime.fromtimestamp(first[i], timezone.utc).isoformat() if np.isfinite(first[i]) else None,
+            "last_annotation_at": datetime.fromtimestamp(last[i], timezone.utc).isoformat() if np.isfinite(last[i]) else None,
+        })
+    return {"annotators": result}
+
+def lead_time_percentiles(table, percentiles=(50, 75, 90, 95, 99), by_annotator=False):
+    """
+    Lead time percentiles (seconds) over non-cancelled annotations, optionally per annotator.
+    """
+    mask = ~table.ann_cancelled & ~np.isnan(table.ann_lead_time)
+    lead = table.ann_lead_time[mask]
+    percentiles = [float(p) for p in percentiles]
+    if not len(lead):
+        return {"count": 0, "percentiles": None}
+    result = {
+        "count": int(len(lead)),
+        "mean": round(float(lead.mean()), 3),
+        "percentiles": {f"p{p:g}": round(float(v), 3) for p, v in zip(percentiles, np.percentile(lead, percentiles))},
+    }
+    if by_annotator:
+        annotators = table.ann_annotator[mask]
+        order = np.argsort(annotators, kind="stable")
+        annotators, lead = annotators[order], lead[order]
+        ids, starts = np.unique(annotators, return_index=True)
+        result["by_annotator"] = {
+            str(int(a)): {f"p{p:g}": round(float(v), 3) for p, v in zip(percentiles, np.percentile(group, percentiles))}
+            for a, group in zip(ids, np.split(lead, starts[1:]))
+        }
+    return result
+
+def _primary_labels(table, from_name):
+    """
+    One label per non-cancelled annotation (its first result for from_name).
+    :return: Tuple (task_ids, annotator_ids, label_codes) as aligned arrays
+    """
+    mask = _active_results(table, from_name)
+    res_ann = table.res_ann[mask]
+    res_label = table.res_label[mask]
+    ann, first = np.unique(res_ann, return_index=True)
+    return table.ann_task[ann], table.ann_annotator[ann], res_label[first]
+
+def cohen_kappa(table, from_name=None, min_overlap=10, max_annotators=50, max_pairs=50_000_000):
+    """
+    Pairwise Cohen's kappa between annotators on tasks both labeled (first label per annotation).
+    Only the max_annotators most active annotators are paired. All annotator pairs are scored
+    together from per-pair agreement counts and label marginals.
+    """
+    tasks, annotators, labels = _primary_labels(table, from_name)
+    k = len(table.labels)
+    ids, counts = np.unique(annotators, return_counts=True)
+    top = np.sort(ids[np.argsort(-counts, kind="stable")[:max_annotators]])
+    keep = np.isin(annotators, top)
+    tasks, rater, labels = tasks[keep], np.searchsorted(top, annotators[keep]), labels[keep]
+    # One label per (task, annotator), grouped by task
+    order = np.lexsort((rater, tasks))
+    tasks, rater, labels = tasks[order], rater[order], labels[order]
+    first = np.r_[True, (tasks[1:] != tasks[:-1]) | (rater[1:] != rater[:-1])]
+    tasks, rater, labels = tasks[first], rater[first], labels[first]
+    if not len(tasks):
+        return {"pairs": [], "mean_kappa": None}
+    left, right = _group_pairs(tasks, max_pairs)
+    ordered = rater[left] < rater[right]
+    left, right = left[ordered], right[ordered]
+    n_raters = len(top)
+    pair_key = rater[left] * n_raters + rater[right]
+    pair_ids, pair_idx = np.unique(pair_key, return_inverse=True)
+    overlap = np.bincount(pair_idx, minlength=len(pair_ids)).astype(np.float64)
+    agreed = np.bincount(pair_idx, weights=labels[left] == labels[right], minlength=len(pair_ids))
+    marg_a = np.bincount(pair_idx * k + labels[left], minlength=len(pair_ids) * k).reshape(-1, k)
+    marg_b = np.bincount(pair_idx * k + labels[right], minlength=len(pair_ids) * k).reshape(-1, k)
+    observed = agreed / overlap
+    expected = (marg_a * marg_b).sum(axis=1) / (overlap * overlap)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kappa = np.where(expected < 1.0, (observed - expected) / (1.0 - expected), 1.0)
+    pairs = [
+        {"annotator_a": int(top[pair // n_raters]), "annotator_b": int(top[pair % n_raters]),
+         "overlap": int(overlap[i]), "kappa": round(float(kappa[i]), 4)}
+        for i, pair in enumerate(pair_ids) if overlap[i] >= min_overlap
+    ]
+    valid = [p["kappa"] for p in pairs]
+    return {"pairs": pairs, "mean_kappa": round(float(np.mean(valid)), 4) if valid else None}
+
+def fleiss_kappa(table, from_name=None):
+    """
+    Fleiss' kappa over tasks with at least two ratings (first label per annotation),
+    using the generalization for a varying number of raters per task.
+    """
+    tasks, _, labels = _primary_labels(table, from_name)
+    k = len(table.labels)
+    task_ids, task_idx = np.unique(tasks, return_inverse=True)
+    counts = np.bincount(task_idx * k + labels, minlength=len(task_ids) * k).reshape(len(task_ids), k).astype(np.float64)
+    raters = counts.sum(axis=1)
+    keep = raters >= 2
+    counts, raters = counts[keep], raters[keep]
+    if not len(raters):
+        return {"tasks": 0, "kappa": None}
+    agreement = ((counts * counts).sum(axis=1) - raters) / (raters * (raters - 1))
+    p_bar = agreement.mean()
+    p_j = counts.sum(axis=0) / raters.sum()
+    p_e = float((p_j * p_j).sum())
+    kappa = 1.0 if p_e == 1.0 else (p_bar - p_e) / (1.0 - p_e)
+    return {"tasks": int(len(raters)), "mean_raters": round(float(raters.mean()), 2), "kappa": round(float(kappa), 4)}
+
+def region_iou(table, from_name=None, same_label=True, max_pairs=50_000_000):
+    """
+    Mean best-match IoU of bounding boxes between annotations of the same task.
+    For every region, the best IoU against each other annotation of its task is taken
+    (optionally only boxes with the same label); the mean of those is reported overall
+    and per label.
+    """
+    mask = ~table.ann_cancelled[table.reg_ann] & _from_name_mask(table, table.reg_from_name, from_name)
+    reg_ann = table.reg_ann[mask]
+    if not len(reg_ann):
+        return {"regions": 0, "compared_regions": 0, "mean_iou": None, "by_label": {}}
+    reg_task = table.ann_task[reg_ann]
+    order = np.lexsort((reg_ann, reg_task))
+    reg_ann, reg_task = reg_ann[order], reg_task[order]
+    label = table.reg_label[mask][order]
+    x0 = table.reg_x[mask][order].astype(np.float64)
+    y0 = table.reg_y[mask][order].astype(np.float64)
+    x1 = x0 + table.reg_w[mask][order]
+    y1 = y0 + table.reg_h[mask][order]
+    left, right = _group_pairs(reg_task, max_pairs)
+    keep = reg_ann[left] != reg_ann[right]
+    if same_label:
+        keep &= label[left] == label[right]
+    left, right = left[keep], right[keep]
+    if not len(left):
+        return {"regions": int(len(reg_ann)), "compared_regions": 0, "mean_iou": None, "by_label": {}}
+    iw = np.clip(np.minimum(x1[left], x1[right]) - np.maximum(x0[left], x0[right]), 0, None)
+    ih = np.clip(np.minimum(y1[left], y1[right]) - np.maximum(y0[left], y0[right]), 0, None)
+    inter = iw * ih
+    union = (x1[left] - x0[left]) * (y1[left] - y0[left]) + (x1[right] - x0[right]) * (y1[right] - y0[right]) - inter
+    iou = np.where(union > 0, inter / np.where(union > 0, union, 1), 0.0)
+    # Pairs are sorted by (left region, right annotation), so best matches are segment maxima
+    starts, _ = _group_bounds(left.astype(np.int64) * (int(reg_ann.max()) + 1) + reg_ann[right])
+    best = np.maximum.reduceat(iou, starts)
+    best_label = label[left[starts]]
+    sums = np.bincount(best_label, weights=best, minlength=len(table.labels))
+    counts = np.bincount(best_label, minlength=len(table.labels))
+    by_label = {
+        table.labels[code]: {"matches": int(counts[code]), "mean_iou": round(float(sums[code] / counts[code]), 4)}
+        for code in np.nonzero(counts)[0]
+    }
+    return {
+        "regions": int(len(reg_ann)),
+        "compared_regions": int(len(_group_bounds(left[starts])[0])),
+        "mean_iou": round(float(best.mean()), 4),
+        "by_label": by_label,
+    }
@@ -0,0 +1,52 @@
+import asyncio
+import time
+from config import config
+from error_handling import map_exception_to_mcp_error
+
+def normalize_ids(ids, name="project_ids"):
+    """
+    Validate a list of ids and drop duplicates, keeping the first occurrence.
+    """
+    if not isinstance(ids, list) or not ids:
+        raise ValueError(f"{name} must be a non-empty list.")
+    ids = [str(i).strip() for i in ids]
+    if not all(ids):
+        raise ValueError(f"{name} cannot contain empty ids.")
+    return list(dict.fromkeys(ids))
+
+async def run_batch(ids, fetch, concurrency=None, id_key="id"):
+    """
+    Run fetch(id) for every id with at most `concurrency` calls in flight.
+    A failing id does not fail the batch: its entry carries an 'error' dict in the same
+    format as tool errors, and the other results are still returned.
+    :param ids: List of ids (see normalize_ids)
+    :param fetch: Coroutine function returning a dict of result fields for one id
+    :param concurrency: Max calls in flight (default: LS_BATCH_CONCURRENCY)
+    :param id_key: Key holding the id in each result entry
+    :return: Dict with 'results' (in input order) and a 'summary' with counts and elapsed time
+    """
+    concurrency = concurrency or config.BATCH_CONCURRENCY
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1.")
+    semaphore = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+
+    async def run_one(item_id):
+        async with semaphore:
+            try:
+                return {id_key: item_id, **await fetch(item_id)}
+            except Exception as exc:
+                return {id_key: item_id, **map_exception_to_mcp_error(exc).to_dict()}
+
+    results = await asyncio.gather(*(run_one(item_id) for item_id in ids))
+    failed = sum(1 for r in results if "error" in r)
+    return {
+        "results": results,
+        "summary": {
+            "requested": len(ids),
+            "succeeded": len(ids) - failed,
+            "failed": failed,
+            "concurrency": concurrency,
+            "elapsed_seconds": round(time.perf_counter() - start, 3),
+        },
+    }
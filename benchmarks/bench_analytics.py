@@ -0,0 +1,114 @@
+"""
+Benchmark: vectorized annotation analytics.
+
+Parses a synthetic JSON export once (cold) and from the .columns.npz cache (warm),
+compares a plain-dict label count with the NumPy engine, then times every metric
+on a synthetic table with millions of label results.
+
+Usage:
+    python benchmarks/bench_analytics.py [--records 100000] [--results 3000000]
+"""
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+
+import numpy as np
+
+from bench_common import arg_parser, configure_env
+from fake_label_studio import export_record
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def synthetic_table(results, raters=3, labels=8, annotators=40, seed=0):
+    """
+    Build an AnnotationTable directly from arrays: `raters` annotations per task,
+    one label result and one box region per annotation.
+    """
+    from annotation_arrays import AnnotationTable
+    rng = np.random.default_rng(seed)
+    n = results
+    tasks = n // raters
+    ann_task = np.repeat(np.arange(tasks, dtype=np.int64), raters)[:n]
+    truth = rng.integers(0, labels, tasks)[ann_task]
+    agree = rng.random(n) < 0.8
+    res_label = np.where(agree, truth, rng.integers(0, labels, n))
+    base = rng.random((tasks, 2)) * 80
+    jitter = rng.normal(0, 1.5, (n, 2))
+    columns = {
+        'ann_task': ann_task,
+        'ann_annotator': rng.integers(1, annotators + 1, n),
+        'ann_lead_time': rng.gamma(2.0, 15.0, n),
+        'ann_created_at': 1.7e9 + rng.random(n) * 86400 * 30,
+        'ann_cancelled': rng.random(n) < 0.01,
+        'res_ann': np.arange(n),
+        'res_from_name': np.zeros(n, dtype=np.int64),
+        'res_label': res_label,
+        'reg_ann': np.arange(n),
+        'reg_from_name': np.zeros(n, dtype=np.int64),
+        'reg_label': res_label,
+        'reg_x': (base[ann_task, 0] + jitter[:, 0]).astype(np.float32),
+        'reg_y': (base[ann_task, 1] + jitter[:, 1]).astype(np.float32),
+        'reg_w': np.full(n, 15.0, dtype=np.float32),
+        'reg_h': np.full(n, 10.0, dtype=np.float32),
+    }
+    return AnnotationTable(columns, [f'Label{i}' for i in range(labels)], ['label'])
+
+def main():
+    parser = arg_parser(__doc__)
+    parser.add_argument('--records', type=int, default=100_000, help='Tasks in the synthetic JSON export')
+    parser.add_argument('--results', type=int, default=3_000_000, help='Label results in the synthetic table')
+    args = parser.parse_args()
+
+    configure_env()
+    import annotation_arrays
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'export.json')
+        with open(path, 'w') as f:
+            f.write('[')
+            for i in range(args.records):
+                f.write((',' if i else '') + json.dumps(export_record(1, i)))
+            f.write(']')
+        size = os.path.getsize(path)
+
+        def dict_label_count():
+            with open(path) as f:
+                records = json.load(f)
+            return Counter(
+                label
+                for task in records for ann in task['annotations'] for r in ann['result']
+                for label in r['value'].get('choices', [])
+            )
+
+        _, dict_time = timed(dict_label_count)
+        table, cold = timed(annotation_arrays.load_table, path)
+        table, warm = timed(annotation_arrays.load_table, path)
+        _, dist_time = timed(annotation_arrays.label_distribution, table)
+
+    print(f"export: {args.records} tasks, {size / 1e6:.1f} MB")
+    print(f"dict label count (json.load + loops): {dict_time * 1000:9.1f} ms")
+    print(f"columns from export (cold parse):     {cold * 1000:9.1f} ms")
+    print(f"columns from .npz cache (warm):       {warm * 1000:9.1f} ms")
+    print(f"label distribution on columns:        {dist_time * 1000:9.1f} ms")
+
+    table = synthetic_table(args.results)
+    print(f"\nsynthetic table: {args.results} results, {args.results} regions")
+    metrics = [
+        ('label_distribution', annotation_arrays.label_distribution, ()),
+        ('annotator_throughput', annotation_arrays.annotator_throughput, ()),
+        ('lead_time_percentiles', annotation_arrays.lead_time_percentiles, ((50, 90, 99), True)),
+        ('cohen_kappa', annotation_arrays.cohen_kappa, ()),
+        ('fleiss_kappa', annotation_arrays.fleiss_kappa, ()),
+        ('region_iou', annotation_arrays.region_iou, ()),
+    ]
+    for name, fn, extra in metrics:
+        _, elapsed = timed(fn, table, *extra)
+        print(f"{name:24s} {elapsed * 1000:9.1f} ms  ({args.results / elapsed / 1e6:6.1f} M results/s)")
+
+if __name__ == '__main__':
+    main()
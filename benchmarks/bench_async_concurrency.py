@@ -0,0 +1,48 @@
+"""
+Benchmark: N concurrent get_project calls, sequential sync client vs. async client with asyncio.gather.
+
+Usage:
+    python benchmarks/bench_async_concurrency.py [--calls 20] [--latency 0.05]
+"""
+import asyncio
+import time
+
+from bench_common import arg_parser, configure_env
+from fake_label_studio import FakeLabelStudio
+
+def main():
+    parser = arg_parser(__doc__)
+    parser.add_argument('--calls', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.05, help='Fake upstream latency in seconds')
+    args = parser.parse_args()
+
+    with FakeLabelStudio(latency=args.latency) as fake:
+        configure_env(fake.url)
+        from label_studio_client import get_client, get_async_client
+
+        client = get_client()
+        client.get('/api/health')
+        start = time.perf_counter()
+        for i in range(args.calls):
+            client.get(f'/api/projects/{i}/')
+        sequential = time.perf_counter() - start
+
+        async def run_concurrent():
+            async_client = get_async_client()
+            # Warm the pool so both modes measure steady-state keep-alive traffic
+            await asyncio.gather(*(async_client.get('/api/health') for _ in range(args.calls)))
+            start = time.perf_counter()
+            await asyncio.gather(*(async_client.get(f'/api/projects/{i}/') for i in range(args.calls)))
+            elapsed = time.perf_counter() - start
+            await async_client.aclose()
+            return elapsed
+
+        concurrent = asyncio.run(run_concurrent())
+
+    print(f"{args.calls} calls at {args.latency * 1000:.0f} ms upstream latency")
+    print(f"sequential (sync):   {sequential * 1000:9.1f} ms")
+    print(f"concurrent (async):  {concurrent * 1000:9.1f} ms")
+    print(f"round trips spent:   {concurrent / args.latency:9.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""
+Shared bootstrap for the benchmark scripts: puts the repository root on sys.path, points the
+server configuration at a (fake) Label Studio and builds the command-line parser.
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+def configure_env(base_url=None):
+    """
+    Set the environment the server modules read before they are first imported.
+    :param base_url: Label Studio URL (e.g. FakeLabelStudio.url); defaults to http://localhost:8080
+    """
+    if base_url:
+        os.environ['LS_BASE_URL'] = base_url
+    else:
+        os.environ.setdefault('LS_BASE_URL', 'http://localhost:8080')
+    os.environ.setdefault('LS_API_TOKEN', 'benchmark-token')
+    # Measure raw throughput, not the client-side rate limit
+    os.environ.setdefault('LS_RATE_LIMIT', '0')
+
+def arg_parser(doc):
+    """
+    Build an argument parser that shows the script's module docstring verbatim in --help.
+    """
+    return argparse.ArgumentParser(description=doc, formatter_class=argparse.RawDescriptionHelpFormatter)
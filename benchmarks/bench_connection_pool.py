@@ -0,0 +1,63 @@
+"""
+Benchmark: per-call latency of a fresh connection per request vs. the shared pooled client.
+
+Usage:
+    python benchmarks/bench_connection_pool.py [--calls 500]
+"""
+import statistics
+import time
+
+from bench_common import arg_parser, configure_env
+from fake_label_studio import FakeLabelStudio
+
+def _summarize(samples):
+    samples = sorted(samples)
+    return {
+        'mean_ms': statistics.mean(samples) * 1000,
+        'p50_ms': samples[len(samples) // 2] * 1000,
+        'p99_ms': samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000,
+    }
+
+def _time_calls(fn, calls):
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def main():
+    parser = arg_parser(__doc__)
+    parser.add_argument('--calls', type=int, default=500)
+    args = parser.parse_args()
+
+    with FakeLabelStudio() as fake:
+        configure_env(fake.url)
+        import requests
+        from label_studio_client import get_client
+
+        client = get_client()
+        url = f"{client.base_url}/api/projects/1/"
+
+        def fresh_call():
+            # Previous behaviour: module-level requests.get opens a new connection every call
+            resp = requests.get(url, headers=client.headers, timeout=client.timeout)
+            resp.raise_for_status()
+            resp.json()
+
+        def pooled_call():
+            client.get('/api/projects/1/')
+
+        fresh_call()
+        pooled_call()
+        fresh = _summarize(_time_calls(fresh_call, args.calls))
+        pooled = _summarize(_time_calls(pooled_call, args.calls))
+
+    print(f"{'mode':<8} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, stats in (('fresh', fresh), ('pooled', pooled)):
+        print(f"{name:<8} {stats['mean_ms']:>9.3f} {stats['p50_ms']:>9.3f} {stats['p99_ms']:>9.3f}")
+    print(f"gain per call: {fresh['mean_ms'] - pooled['mean_ms']:.3f} ms "
+          f"({fresh['mean_ms'] / pooled['mean_ms']:.2f}x)")
+
+if __name__ == '__main__':
+    main()
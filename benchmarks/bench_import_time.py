@@ -0,0 +1,112 @@
+"""
+Benchmark: cold start cost of `import server` in fresh interpreters, checked against a budget.
+
+Each run imports mcp_instance (the FastMCP framework, which this server cannot avoid) and then
+server, and reports the median of both. The budget applies to the server's own share (tool
+modules and their registration). The run also fails if importing the server loaded a module
+that should only load on first tool use, or built the configuration.
+
+Usage:
+    python benchmarks/bench_import_time.py [--runs 5] [--budget 0.25] [--total-budget 2.0]
+
+Exits with status 1 when over budget, so it can gate CI.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from bench_common import ROOT, arg_parser
+
+# Only loaded when a tool first needs them (unless FastMCP already imports them)
+DEFERRED_MODULES = (
+    'requests', 'numpy', 'sqlite3', 'dotenv', 'xml.etree.ElementTree',
+    'label_studio_client', 'project_cache', 'pagination', 'bulk_import', 'export_snapshots',
+    'import_filter', 'predictions', 'task_mirror', 'annotation_arrays', 'label_config', 'health',
+)
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import mcp_instance
+framework = time.perf_counter()
+preloaded = set(sys.modules)
+import server
+end = time.perf_counter()
+import config
+print(json.dumps({
+    "framework_seconds": framework - start,
+    "server_seconds": end - framework,
+    "loaded": [m for m in %r if m in sys.modules and m not in preloaded],
+    "config_loaded": config._config is not None,
+}))
+""" % (DEFERRED_MODULES,)
+
+def probe():
+    # No Label Studio settings: importing the server must not need them
+    env = {k: v for k, v in os.environ.items() if not k.startswith('LS_')}
+    result = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"importing server failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def slowest_imports(count):
+    """
+    Largest cumulative import times (ms) below `server` from -X importtime.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import mcp_instance; import server'],
+                            cwd=ROOT, capture_output=True, text=True)
+    rows = []
+    after_framework = False
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        if after_framework and name != 'server':
+            rows.append((int(parts[1]) / 1000, name))
+        elif name == 'mcp_instance':
+            after_framework = True
+    return [{"module": name, "ms": round(ms, 1)} for ms, name in sorted(rows, reverse=True)[:count]]
+
+def main():
+    parser = arg_parser(__doc__)
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to time')
+    parser.add_argument('--budget', type=float, default=0.25, help='Max median seconds of `import server` on top of FastMCP')
+    parser.add_argument('--total-budget', type=float, help='Max median seconds including FastMCP (default: unchecked)')
+    parser.add_argument('--top', type=int, default=10, help='Slowest server imports to list')
+    args = parser.parse_args()
+
+    runs = [probe() for _ in range(args.runs)]
+    framework = statistics.median(r["framework_seconds"] for r in runs)
+    server = statistics.median(r["server_seconds"] for r in runs)
+    loaded = sorted({m for r in runs for m in r["loaded"]})
+    config_loaded = any(r["config_loaded"] for r in runs)
+    failures = []
+    if server > args.budget:
+        failures.append(f"server import took {server:.3f}s, budget {args.budget:.3f}s")
+    if args.total_budget is not None and framework + server > args.total_budget:
+        failures.append(f"total import took {framework + server:.3f}s, budget {args.total_budget:.3f}s")
+    if loaded:
+        failures.append(f"modules loaded at import time: {', '.join(loaded)}")
+    if config_loaded:
+        failures.append("configuration was loaded at import time")
+    report = {
+        "runs": args.runs,
+        "framework_seconds": round(framework, 4),
+        "server_seconds": round(server, 4),
+        "total_seconds": round(framework + server, 4),
+        "budget_seconds": args.budget,
+        "total_budget_seconds": args.total_budget,
+        "deferred_modules_loaded": loaded,
+        "config_loaded": config_loaded,
+        "slowest_imports": slowest_imports(args.top),
+        "passed": not failures,
+        "failures": failures,
+    }
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["passed"] else 1)
+
+if __name__ == '__main__':
+    main()
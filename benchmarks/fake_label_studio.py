@@ -0,0 +1,239 @@
+"""
+Minimal in-process stub of the Label Studio REST API used by the benchmarks.
+Runs a threaded HTTP/1.1 server on localhost so keep-alive connections behave
+like they would against a real Label Studio instance.
+"""
+import gzip
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+def task_text(i, text_size=0):
+    """
+    Task text padded to text_size characters, to control payload size.
+    """
+    return f'text {i}'.ljust(text_size, 'x')
+
+def task_record(project_id, i, text_size=0):
+    """
+    Deterministic task shaped like the Label Studio task list API.
+    """
+    return {
+        'id': i + 1,
+        'project': project_id,
+        'data': {'text': task_text(i, text_size)},
+        'is_labeled': i % 2 == 0,
+        'total_annotations': 1 if i % 2 == 0 else 0,
+        'created_at': '2024-06-01T00:00:00Z',
+        'updated_at': '2024-06-01T00:00:00Z',
+        'annotations': export_record(project_id, i, text_size)['annotations'] if i % 2 == 0 else [],
+    }
+
+def export_record(project_id, i, text_size=0):
+    """
+    Deterministic JSON export record shaped like Label Studio's JSON export.
+    """
+    return {
+        'id': i + 1,
+        'project': project_id,
+        'data': {'text': task_text(i, text_size)},
+        'annotations': [{
+            'id': i + 1,
+            'completed_by': i % 7 + 1,
+            'lead_time': float(i % 60),
+            'created_at': '2024-06-01T00:00:00Z',
+            'result': [{
+                'from_name': 'label',
+                'to_name': 'text',
+                'type': 'choices',
+                'value': {'choices': [f'Label{i % 5}']},
+            }],
+        }],
+    }
+
+class FakeLabelStudioHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without this, Nagle + delayed ACK
+    # stalls every keep-alive response by ~40 ms.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        headers = dict(headers or {})
+        if status == 200 and self.server.etag:
+            etag = '"%s"' % hashlib.md5(body).hexdigest()
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            headers['ETag'] = etag
+        if self.server.gzip and len(body) > 1024 and 'gzip' in (self.headers.get('Accept-Encoding') or ''):
+            body = gzip.compress(body, compresslevel=5)
+            headers['Content-Encoding'] = 'gzip'
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunked(self, content_type, pieces):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for piece in pieces:
+            if piece:
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(piece), piece))
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _export_pieces(self, project_id, export_type, batch=1000):
+        count = self.server.export_records
+        text_size = self.server.text_size
+        if export_type == 'CSV':
+            yield b'id,text,label\n'
+            for start in range(0, count, batch):
+                yield ''.join(f'{i},{task_text(i, text_size)},Label{i % 5}\n' for i in range(start, min(count, start + batch))).encode()
+            return
+        yield b'['
+        for start in range(0, count, batch):
+            records = (json.dumps(export_record(project_id, i, text_size)) for i in range(start, min(count, start + batch)))
+            yield (',' if start else '').encode() + ','.join(records).encode()
+        yield b']'
+
+    @staticmethod
+    def _page(query, count, make_record):
+        page = int(query.get('page', ['1'])[0])
+        page_size = int(query.get('page_size', ['100'])[0])
+        start = (page - 1) * page_size
+        if page < 1 or (start >= count and page > 1):
+            return None
+        return [make_record(i) for i in range(start, min(count, start + page_size))]
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _dispatch(self, body=b''):
+        latency = self.server.latency
+        if latency:
+            time.sleep(latency)
+        if self.server.error_rate and random.random() < self.server.error_rate:
+            status = self.server.error_status
+            headers = {'Retry-After': str(self.server.retry_after)} if self.server.retry_after is not None else None
+            return self._send_json({'detail': 'Request failed.'}, status=status, headers=headers)
+        path = self.path.split('?', 1)[0]
+        if path == '/api/health':
+            return self._send_json({'status': 'UP'})
+        match = re.fullmatch(r'/api/projects/(\d+)/import/predictions', path)
+        if match and self.command == 'POST':
+            predictions = json.loads(body or b'[]')
+            self.server.predicted += len(predictions)
+            return self._send_json({'created': len(predictions)}, status=201)
+        match = re.fullmatch(r'/api/projects/(\d+)/import', path)
+        if match and self.command == 'POST':
+            tasks = json.loads(body or b'[]')
+            self.server.imported += len(tasks)
+            return self._send_json({'task_count': len(tasks), 'annotation_count': 0, 'prediction_count': 0})
+        query = parse_qs(urlsplit(self.path).query)
+        match = re.fullmatch(r'/api/projects/(\d+)/tasks/?', path)
+        if match:
+            project_id = int(match.group(1))
+            records = self._page(query, self.server.task_count, lambda i: task_record(project_id, i, self.server.text_size))
+            if records is None:
+                return self._send_json({'detail': 'Invalid page.'}, status=404)
+            return self._send_json({'tasks': records, 'total': self.server.task_count, 'next': None, 'previous': None})
+        if path == '/api/projects/' and self.command == 'GET':
+            records = self._page(query, self.server.project_count, lambda i: {'id': i + 1, 'title': f'Project {i + 1}'})
+            if records is None:
+                return self._send_json({'detail': 'Invalid page.'}, status=404)
+            return self._send_json({'results': records, 'count': self.server.project_count, 'next': None, 'previous': None})
+        if path == '/api/users/':
+            records = self._page(query, self.server.user_count, lambda i: {'id': i + 1, 'email': f'user{i + 1}@example.com', 'username': f'user{i + 1}'})
+            if records is None:
+                return self._send_json({'detail': 'Invalid page.'}, status=404)
+            return self._send_json({'results': records, 'count': self.server.user_count, 'next': None, 'previous': None})
+        match = re.fullmatch(r'/api/projects/(\d+)/export', path)
+        if match:
+            export_type = query.get('exportType', ['JSON'])[0].upper()
+            content_type = 'text/csv' if export_type == 'CSV' else 'application/json'
+            return self._send_chunked(content_type, self._export_pieces(int(match.group(1)), export_type))
+        match = re.fullmatch(r'/api/projects/(\d+)/?', path)
+        if match:
+            project_id = int(match.group(1))
+            project = {'id': project_id, 'title': f'Project {project_id}'}
+            if self.server.label_config is not None:
+                project['label_config'] = self.server.label_config
+            return self._send_json(project)
+        return self._send_json({'detail': 'Not found.'}, status=404)
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch(self._read_body())
+
+    def do_PATCH(self):
+        self._dispatch(self._read_body())
+
+    def do_DELETE(self):
+        self._dispatch()
+
+class FakeLabelStudio:
+    """
+    Context manager that serves the fake API on an ephemeral localhost port.
+    :param latency: Artificial per-request latency in seconds
+    :param error_rate: Fraction of requests answered with error_status (0.0-1.0)
+    :param error_status: HTTP status of injected errors (e.g. 503, or 429 for throttling)
+    :param retry_after: Optional Retry-After seconds sent with injected errors
+    :param text_size: Characters of task text per task/export record (controls payload size)
+    :param etag: Send ETags on JSON responses and answer matching If-None-Match with 304
+    :param gzip: Gzip JSON responses over 1 KiB when the client accepts it
+    :param export_records: Number of records served by the export endpoint
+    :param task_count: Number of tasks served by the paginated task list
+    :param project_count: Number of projects served by the project list
+    :param user_count: Number of users served by the user list
+    :param label_config: Label config returned with project details (default: none)
+    """
+    def __init__(self, latency=0.0, error_rate=0.0, export_records=100, task_count=100, project_count=20, user_count=20,
+                 error_status=503, retry_after=None, text_size=0, etag=False, gzip=False, label_config=None):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeLabelStudioHandler)
+        self.server.daemon_threads = True
+        self.server.latency = latency
+        self.server.error_rate = error_rate
+        self.server.error_status = error_status
+        self.server.retry_after = retry_after
+        self.server.text_size = text_size
+        self.server.etag = etag
+        self.server.gzip = gzip
+        self.server.imported = 0
+        self.server.predicted = 0
+        self.server.label_config = label_config
+        self.server.export_records = export_records
+        self.server.task_count = task_count
+        self.server.project_count = project_count
+        self.server.user_count = user_count
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
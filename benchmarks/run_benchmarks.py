@@ -0,0 +1,295 @@
+"""
+Benchmark suite: client and tool throughput and p50/p99 latency against the in-process fake
+Label Studio server. Runs offline and prints (or writes) one JSON document so results can be
+diffed across releases.
+
+Scenarios:
+    list_tasks       sequential list_tasks tool page latency, then fetch_all_tasks throughput
+    bulk_import      bulk_import_tasks chunk latency and task throughput
+    predictions      import_predictions from task_id/label/score columns: chunk latency and throughput
+    export           export_annotations_to_file (and in-memory export_annotations up to
+                     --in-memory-max records) at each --export-sizes record count
+    get_project      concurrent get_project calls at each --concurrency level, on the client
+                     (every call upstream) and through the cached get_project tool
+
+Usage:
+    python benchmarks/run_benchmarks.py [--latency 0.005] [--text-size 200] [--output results.json]
+    python benchmarks/run_benchmarks.py --scenarios get_project,list_tasks --repeat 5
+"""
+import asyncio
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_common import ROOT, arg_parser, configure_env
+from fake_label_studio import FakeLabelStudio
+
+SCENARIOS = ('list_tasks', 'bulk_import', 'predictions', 'export', 'get_project')
+
+PREDICTION_LABELS = ('Positive', 'Negative', 'Neutral')
+
+LABEL_CONFIG = (
+    '<View><Text name="text" value="$text"/><Choices name="sentiment" toName="text">'
+    + ''.join(f'<Choice value="{label}"/>' for label in PREDICTION_LABELS)
+    + '</Choices></View>'
+)
+
+def latency_summary(samples):
+    """
+    Nearest-rank percentiles of latency samples (seconds) in milliseconds.
+    """
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pct(q):
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)] * 1000
+
+    return {
+        "count": len(ordered),
+        "p50_ms": round(pct(0.50), 3),
+        "p99_ms": round(pct(0.99), 3),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+def _rate(count, elapsed):
+    return round(count / elapsed, 1) if elapsed > 0 else None
+
+async def timed(coro):
+    start = time.perf_counter()
+    result = await coro
+    return result, time.perf_counter() - start
+
+async def bench_list_tasks(fake, client, args):
+    from tools.task import fetch_all_tasks, list_tasks
+    fake.server.task_count = args.tasks
+    pages = math.ceil(args.tasks / args.page_size)
+    samples = []
+    start = time.perf_counter()
+    for page in range(1, pages + 1):
+        result, elapsed = await timed(list_tasks('1', page=page, page_size=args.page_size))
+        if 'error' in result:
+            raise RuntimeError(result['error'])
+        samples.append(elapsed)
+    sequential = time.perf_counter() - start
+    runs = []
+    for _ in range(args.repeat):
+        result, elapsed = await timed(fetch_all_tasks('1', fields=['id'], page_size=args.page_size, max_bytes=0))
+        if 'error' in result:
+            raise RuntimeError(result['error'])
+        runs.append(elapsed)
+    return {
+        "tasks": args.tasks,
+        "page_size": args.page_size,
+        "list_tasks_page": latency_summary(samples),
+        "sequential_tasks_per_second": _rate(args.tasks, sequential),
+        "fetch_all_tasks": {
+            **latency_summary(runs),
+            "tasks_per_second": _rate(args.tasks, min(runs)),
+        },
+    }
+
+async def bench_bulk_import(fake, client, args):
+    from tools.task import bulk_import_tasks
+    tasks = [{'data': {'text': f'text {i}'.ljust(args.text_size, 'x')}} for i in range(args.import_tasks)]
+    chunk_samples = []
+    runs = []
+    for _ in range(args.repeat):
+        fake.server.imported = 0
+        result, elapsed = await timed(bulk_import_tasks('1', tasks, chunk_size=args.chunk_size, deduplicate=False))
+        if 'error' in result:
+            raise RuntimeError(result['error'])
+        if fake.server.imported != args.import_tasks:
+            raise RuntimeError(f"fake server received {fake.server.imported} of {args.import_tasks} tasks")
+        chunk_samples.extend(chunk['elapsed_seconds'] for chunk in result['chunks'])
+        runs.append((elapsed, result['summary']['bytes_sent']))
+    best, bytes_sent = min(runs)
+    return {
+        "tasks": args.import_tasks,
+        "chunk_size": args.chunk_size,
+        "chunk": latency_summary(chunk_samples),
+        "run": latency_summary([elapsed for elapsed, _ in runs]),
+        "tasks_per_second": _rate(args.import_tasks, best),
+        "megabytes_per_second": round(bytes_sent / best / 1e6, 2),
+    }
+
+async def bench_predictions(fake, client, args):
+    from tools.task import import_predictions
+    count = args.predictions
+    task_ids = list(range(1, count + 1))
+    labels = [PREDICTION_LABELS[i % len(PREDICTION_LABELS)] for i in range(count)]
+    scores = [round((i % 100) / 100, 2) for i in range(count)]
+    runs = []
+    for _ in range(args.repeat):
+        fake.server.predicted = 0
+        result, elapsed = await timed(import_predictions('1', task_ids=task_ids, labels=labels, scores=scores,
+                                                         chunk_size=args.chunk_size, max_bytes=0))
+        if 'error' in result:
+            raise RuntimeError(result['error'])
+        if fake.server.predicted != count:
+            raise RuntimeError(f"fake server received {fake.server.predicted} of {count} predictions")
+        runs.append((elapsed, result['summary']['bytes_sent']))
+    best, bytes_sent = min(runs)
+    return {
+        "predictions": count,
+        "chunk_size": args.chunk_size,
+        "run": latency_summary([elapsed for elapsed, _ in runs]),
+        "chunks": math.ceil(count / args.chunk_size),
+        "predictions_per_second": _rate(count, best),
+        "megabytes_per_second": round(bytes_sent / best / 1e6, 2),
+    }
+
+async def bench_export(fake, client, args, workdir):
+    results = {}
+    for size in args.export_sizes:
+        fake.server.export_records = size
+        to_file = []
+        entry = {"records": size}
+        for _ in range(args.repeat):
+            path = os.path.join(workdir, f'export-{size}.json')
+            result, elapsed = await timed(client.export_annotations_to_file(1, path=path, exportType='JSON'))
+            if result['record_count'] != size:
+                raise RuntimeError(f"export returned {result['record_count']} of {size} records")
+            to_file.append(elapsed)
+            entry["bytes"] = result['bytes_received']
+            os.remove(path)
+        entry["to_file"] = {
+            **latency_summary(to_file),
+            "records_per_second": _rate(size, min(to_file)),
+            "megabytes_per_second": round(entry["bytes"] / min(to_file) / 1e6, 2),
+        }
+        if size <= args.in_memory_max:
+            in_memory = []
+            for _ in range(args.repeat):
+                (content, _), elapsed = await timed(client.export_annotations(1, exportType='JSON'))
+                in_memory.append(elapsed)
+                del content
+            entry["in_memory"] = {**latency_summary(in_memory), "records_per_second": _rate(size, min(in_memory))}
+        results[str(size)] = entry
+    return results
+
+async def bench_get_project(fake, client, args):
+    from project_cache import get_project_cache
+    from tools.project import get_project
+    results = {}
+    for concurrency in args.concurrency:
+        calls = max(concurrency, args.calls)
+        samples = []
+
+        async def call(project_id):
+            _, elapsed = await timed(client.get(f'/api/projects/{project_id}/'))
+            samples.append(elapsed)
+
+        start = time.perf_counter()
+        for batch_start in range(0, calls, concurrency):
+            await asyncio.gather(*(call(i) for i in range(batch_start, min(calls, batch_start + concurrency))))
+        elapsed = time.perf_counter() - start
+
+        get_project_cache().clear()
+        tool_samples = []
+
+        async def tool_call(project_id):
+            result, elapsed = await timed(get_project(str(project_id)))
+            if 'error' in result:
+                raise RuntimeError(result['error'])
+            tool_samples.append(elapsed)
+
+        tool_start = time.perf_counter()
+        # Ids repeat across batches, so later batches are served by the project cache
+        for batch_start in range(0, calls, concurrency):
+            await asyncio.gather(*(tool_call(i % args.distinct_projects) for i in range(batch_start, min(calls, batch_start + concurrency))))
+        tool_elapsed = time.perf_counter() - tool_start
+        results[str(concurrency)] = {
+            "calls": calls,
+            "client": {**latency_summary(samples), "calls_per_second": _rate(calls, elapsed)},
+            "tool_cached": {**latency_summary(tool_samples), "calls_per_second": _rate(calls, tool_elapsed)},
+        }
+    return results
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def _int_list(value):
+    return [int(v) for v in value.split(',') if v]
+
+def main():
+    parser = arg_parser(__doc__)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Comma-separated scenarios to run')
+    parser.add_argument('--latency', type=float, default=0.005, help='Fake upstream latency per request in seconds')
+    parser.add_argument('--text-size', type=int, default=200, help='Characters of text per task/export record')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement')
+    parser.add_argument('--tasks', type=int, default=10_000, help='Tasks served for list_tasks pagination')
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--import-tasks', type=int, default=50_000, help='Tasks sent by bulk import')
+    parser.add_argument('--predictions', type=int, default=100_000, help='Predictions sent by import_predictions')
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--export-sizes', type=_int_list, default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--in-memory-max', type=int, default=100_000, help='Largest export also fetched in memory')
+    parser.add_argument('--concurrency', type=_int_list, default=[1, 10, 50])
+    parser.add_argument('--calls', type=int, default=200, help='get_project calls per concurrency level')
+    parser.add_argument('--distinct-projects', type=int, default=20, help='Distinct ids used by the cached tool calls')
+    parser.add_argument('--etag', action='store_true', help='Fake server sends ETags and answers 304 Not Modified')
+    parser.add_argument('--gzip', action='store_true', help='Fake server gzips JSON responses')
+    parser.add_argument('--output', help='Write the JSON results to this file as well')
+    args = parser.parse_args()
+    scenarios = [s for s in args.scenarios.split(',') if s]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "parameters": {k: v for k, v in vars(args).items() if k != 'output'},
+        },
+        "results": {},
+    }
+    with FakeLabelStudio(latency=args.latency, text_size=args.text_size, etag=args.etag, gzip=args.gzip,
+                         label_config=LABEL_CONFIG) as fake, \
+            tempfile.TemporaryDirectory() as workdir:
+        configure_env(fake.url)
+        os.environ.setdefault('LS_EXPORT_DIR', workdir)
+        from label_studio_client import get_async_client
+
+        async def run():
+            client = get_async_client()
+            # Warm the pool so every scenario measures steady-state keep-alive traffic
+            await asyncio.gather(*(client.get('/api/health') for _ in range(max(args.concurrency))))
+            for name in scenarios:
+                print(f"running {name}...", file=sys.stderr)
+                if name == 'list_tasks':
+                    report["results"][name] = await bench_list_tasks(fake, client, args)
+                elif name == 'bulk_import':
+                    report["results"][name] = await bench_bulk_import(fake, client, args)
+                elif name == 'predictions':
+                    report["results"][name] = await bench_predictions(fake, client, args)
+                elif name == 'export':
+                    report["results"][name] = await bench_export(fake, client, args, workdir)
+                elif name == 'get_project':
+                    report["results"][name] = await bench_get_project(fake, client, args)
+            await client.aclose()
+
+        asyncio.run(run())
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    print(text)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from config import config
+from label_studio_client import LabelStudioAPIError
+from metrics import endpoint_template, get_metrics
+from resilience import backoff_delay
+
+def iter_chunks(items, max_items, max_bytes):
+    """
+    Group items into JSON array bodies bounded by item count and serialized size.
+    Items are serialized once, so the body posted upstream is exactly what was measured.
+    :param items: Any iterable of JSON-serializable dicts (consumed lazily)
+    :param max_items: Max items per chunk
+    :param max_bytes: Max body size in bytes per chunk (a single larger item gets its own chunk)
+    :return: Generator of (index, item_count, body_bytes)
+    """
+    if max_items < 1 or max_bytes < 2:
+        raise ValueError("chunk size and chunk bytes must be positive.")
+    index = 0
+    parts = []
+    size = 2  # surrounding brackets
+    for item in items:
+        encoded = json.dumps(item, separators=(',', ':')).encode('utf-8')
+        extra = len(encoded) + (1 if parts else 0)
+        if parts and (len(parts) >= max_items or size + extra > max_bytes):
+            yield index, len(parts), b'[' + b','.join(parts) + b']'
+            index += 1
+            parts = []
+            size = 2
+            extra = len(encoded)
+        parts.append(encoded)
+        size += extra
+    if parts:
+        yield index, len(parts), b'[' + b','.join(parts) + b']'
+
+class ImportCheckpoint:
+    """
+    JSON checkpoint of completed chunks, rewritten atomically after every success.
+    A chunk is only skipped on resume if its index and content digest both match,
+    so a changed input never silently drops data.
+    """
+    def __init__(self, path, endpoint, chunk_size, max_chunk_bytes):
+        self.path = path
+        self.key = {"endpoint": endpoint, "chunk_size": chunk_size, "max_chunk_bytes": max_chunk_bytes}
+        self.completed = {}
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get("key") != self.key:
+                raise ValueError(
+                    f"Checkpoint {path} was written for a different import ({state.get('key')}); "
+                    "use a new checkpoint_path or the original chunking parameters."
+                )
+            self.completed = state.get("completed", {})
+
+    def is_done(self, index, digest):
+        entry = self.completed.get(str(index))
+        return entry is not None and entry.get("digest") == digest
+
+    def mark_done(self, index, digest, item_count):
+        if not self.path:
+            return
+        self.completed[str(index)] = {"digest": digest, "item_count": item_count}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"key": self.key, "completed": self.completed}, f)
+        os.replace(tmp_path, self.path)
+
+class ChunkedUploader:
+    """
+    Upload a stream of items to a Label Studio bulk endpoint in concurrent chunks.
+    Chunks are built lazily, at most `concurrency` are in flight at once, and each
+    failed chunk is retried on its own with jittered exponential backoff.
+    :param client: AsyncLabelStudioClient
+    :param endpoint: API endpoint accepting a JSON array body (e.g. '/api/projects/{id}/import')
+    :param chunk_size: Max items per chunk
+    :param max_chunk_bytes: Max serialized bytes per chunk
+    :param concurrency: Max chunks uploaded in parallel
+    :param retries: Retries per chunk after the first attempt
+    :param checkpoint_path: Optional JSON file used to resume an interrupted upload
+    :param count_key: Key of the upstream response holding the number of items accepted
+    """
+    def __init__(self, client, endpoint, chunk_size=None, max_chunk_bytes=None, concurrency=None,
+                 retries=None, timeout=None, checkpoint_path=None, count_key='task_count'):
+        self.client = client
+        self.endpoint = endpoint
+        self.chunk_size = chunk_size or config.IMPORT_CHUNK_SIZE
+        self.max_chunk_bytes = max_chunk_bytes or config.IMPORT_CHUNK_BYTES
+        self.concurrency = concurrency or config.IMPORT_CONCURRENCY
+        self.retries = config.IMPORT_RETRIES if retries is None else retries
+        self.timeout = timeout or config.IMPORT_TIMEOUT
+        self.count_key = count_key
+        if self.concurrency < 1 or self.retries < 0:
+            raise ValueError("concurrency must be at least 1 and retries cannot be negative.")
+        self.checkpoint = ImportCheckpoint(checkpoint_path, endpoint, self.chunk_size, self.max_chunk_bytes)
+
+    async def _upload_chunk(self, index, offset, item_count, body):
+        digest = hashlib.sha256(body).hexdigest()
+        result = {"index": index, "offset": offset, "item_count": item_count, "bytes": len(body), "attempts": 0}
+        if self.checkpoint.is_done(index, digest):
+            result["status"] = "skipped"
+            return result
+        start = time.perf_counter()
+        while True:
+            result["attempts"] += 1
+            try:
+                # Retries are budgeted per chunk here, not inside the client
+                response = await self.client.post_raw(self.endpoint, body, timeout=self.timeout, retries=0)
+                self.checkpoint.mark_done(index, digest, item_count)
+                result["status"] = "imported"
+                result["accepted"] = response.get(self.count_key, item_count) if isinstance(response, dict) else item_count
+                break
+            except LabelStudioAPIError as e:
+                if not e.retryable or result["attempts"] > self.retries:
+                    result["status"] = "failed"
+                    result["error"] = str(e)
+                    break
+                get_metrics().inc('upstream_retries_total', method='POST', endpoint=endpoint_template(self.endpoint))
+                await asyncio.sleep(backoff_delay(result["attempts"], e.retry_after))
+        result["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+        return result
+
+    async def run(self, items, on_chunk=None):
+        """
+        Upload all items and return per-chunk results plus an aggregate summary.
+        Chunks are built in a worker thread (reading, filtering and encoding the items
+        can take a while for large inputs), so the event loop keeps serving other tools.
+        :param items: Iterable of JSON-serializable dicts (consumed from a worker thread)
+        :param on_chunk: Optional callback invoked with each chunk result as it completes
+            ('offset' is the position of the chunk's first item in the input)
+        :return: Dict with 'summary' and 'chunks'
+        """
+        start = time.perf_counter()
+        results = []
+        pending = set()
+
+        def collect(done):
+            for task in done:
+                chunk_result = task.result()
+                results.append(chunk_result)
+                if on_chunk:
+                    on_chunk(chunk_result)
+
+        chunks = iter_chunks(items, self.chunk_size, self.max_chunk_bytes)
+        offset = 0
+        try:
+            while True:
+                chunk = await asyncio.to_thread(next, chunks, None)
+                if chunk is None:
+                    break
+                index, item_count, body = chunk
+                if len(pending) >= self.concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    collect(done)
+                pending.add(asyncio.ensure_future(self._upload_chunk(index, offset, item_count, body)))
+                offset += item_count
+            if pending:
+                done, pending = await asyncio.wait(pending)
+                collect(done)
+        finally:
+            # On errors (bad input, cancellation) do not leave uploads running in the background
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        results.sort(key=lambda r: r["index"])
+        return {"summary": summarize_chunks(results, time.perf_counter() - start), "chunks": results}
+
+def summarize_chunks(results, elapsed):
+    """
+    Aggregate per-chunk upload results into totals and throughput.
+    """
+    by_status = {"imported": [], "skipped": [], "failed": []}
+    for r in results:
+        by_status[r["status"]].append(r)
+    items_sent = sum(r["item_count"] for r in by_status["imported"])
+    bytes_sent = sum(r["bytes"] for r in by_status["imported"])
+    return {
+        "chunks_total": len(results),
+        "chunks_imported": len(by_status["imported"]),
+        "chunks_skipped": len(by_status["skipped"]),
+        "chunks_failed": len(by_status["failed"]),
+        "items_imported": sum(r.get("accepted", r["item_count"]) for r in by_status["imported"]),
+        "items_skipped": sum(r["item_count"] for r in by_status["skipped"]),
+        "items_failed": sum(r["item_count"] for r in by_status["failed"]),
+        "retries": sum(max(0, r["attempts"] - 1) for r in results),
+        "bytes_sent": bytes_sent,
+        "elapsed_seconds": round(elapsed, 3),
+        "items_per_second": round(items_sent / elapsed, 1) if elapsed > 0 else None,
+        "bytes_per_second": round(bytes_sent / elapsed, 1) if elapsed > 0 else None,
+    }
@@ -0,0 +1,129 @@
+import importlib.util
+import threading
+from collections import OrderedDict
+from urllib.parse import urlencode
+from config import config
+
+def accept_encoding():
+    """
+    Accept-Encoding value listing only the codings this process can decode.
+    httpx and urllib3 decode brotli when the brotli (or brotlicffi) package is installed.
+    """
+    if not config.COMPRESSION:
+        return 'identity'
+    codings = ['gzip', 'deflate']
+    if importlib.util.find_spec('brotli') or importlib.util.find_spec('brotlicffi'):
+        codings.append('br')
+    return ', '.join(codings)
+
+def request_key(url, params=None):
+    """
+    Cache key of a GET request: URL plus its query parameters in a stable order.
+    """
+    if not params:
+        return url
+    return f"{url}?{urlencode(sorted((k, str(v)) for k, v in params.items() if v is not None))}"
+
+class _Validated:
+    __slots__ = ('etag', 'last_modified', 'body', 'headers')
+
+    def __init__(self, etag, last_modified, body, headers):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body = body
+        self.headers = headers
+
+class ValidatorStore:
+    """
+    Thread-safe LRU of GET responses that carried an ETag or Last-Modified validator.
+    The clients send If-None-Match / If-Modified-Since for stored URLs and rebuild the
+    response from the stored body when Label Studio answers 304 Not Modified.
+    :param max_bytes: Total body bytes kept before least recently used entries are evicted
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_bytes // 4
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"not_modified": 0, "stored": 0, "evictions": 0, "bytes_saved": 0}
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def conditional_headers(self, key):
+        """
+        Validator headers to send for a stored request (empty dict if nothing is stored).
+        """
+        if not self.enabled:
+            return {}
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return {}
+            headers = {}
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+            return headers
+
+    def store(self, key, headers, body):
+        """
+        Keep the body of a 200 response if it carries a validator and fits the budget.
+        """
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.body)
+            if not self.enabled or not (etag or last_modified) or len(body) > self.max_entry_bytes:
+                return
+            content_type = headers.get('Content-Type')
+            kept = {'Content-Type': content_type} if content_type else {}
+            self._entries[key] = _Validated(etag, last_modified, body, kept)
+            self._bytes += len(body)
+            self._stats["stored"] += 1
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+                self._stats["evictions"] += 1
+
+    def not_modified(self, key):
+        """
+        Resolve a 304 response.
+        :return: Tuple (body, headers) of the stored response, or None if it was evicted meanwhile
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self._stats["not_modified"] += 1
+            self._stats["bytes_saved"] += len(entry.body)
+            return entry.body, entry.headers
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+_store = None
+_lock = threading.Lock()
+
+def get_validator_store():
+    """
+    Return the process-wide ValidatorStore (LS_VALIDATOR_CACHE_BYTES).
+    """
+    global _store
+    if _store is None:
+        with _lock:
+            if _store is None:
+                _store = ValidatorStore(config.VALIDATOR_CACHE_BYTES)
+    return _store
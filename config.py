@@ -1,8 +1,12 @@
+import hashlib
 import os
-from dotenv import load_dotenv
+import threading
 
-# Load environment variables from a .env file if present
-load_dotenv()
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
 
 class Config:
     """
@@ -14,12 +18,115 @@ class Config:
     - LS_API_TOKEN: Label Studio API token (required)
     - LS_TIMEOUT: Request timeout in seconds (optional, default: 10)
     - LS_AUTH_TYPE: 'personal' (default, Bearer <token>) or 'legacy' (Token <token>)
+    - LS_POOL_CONNECTIONS: Number of per-host connection pools to keep (optional, default: 10)
+    - LS_POOL_MAXSIZE: Max keep-alive connections per host (optional, default: 20)
+    - LS_POOL_BLOCK: Block when a host pool is exhausted instead of opening extra connections (optional, default: false)
+    - LS_KEEP_ALIVE: Reuse connections between requests (optional, default: true)
+    - LS_MAX_CONNECTIONS: Max concurrent connections of the async client (optional, default: 100)
+    - LS_KEEPALIVE_EXPIRY: Seconds an idle async keep-alive connection is kept open (optional, default: 5)
+    - LS_CACHE_ENABLED: Cache project detail fetches in-process (optional, default: true)
+    - LS_CACHE_MAX_PROJECTS: Max projects kept in the cache before LRU eviction (optional, default: 256)
+    - LS_CACHE_CONFIG_TTL: Seconds a cached label config stays fresh (optional, default: 600)
+    - LS_CACHE_GUIDELINES_TTL: Seconds cached guidelines stay fresh (optional, default: 600)
+    - LS_CACHE_DETAIL_TTL: Seconds a cached full project payload stays fresh (optional, default: 30)
+    - LS_CACHE_PROGRESS_TTL: Seconds cached progress counters stay fresh (optional, default: 5)
+    - LS_IMPORT_CHUNK_SIZE: Max tasks per bulk import chunk (optional, default: 1000)
+    - LS_IMPORT_CHUNK_BYTES: Max serialized bytes per bulk import chunk (optional, default: 8388608)
+    - LS_IMPORT_CONCURRENCY: Chunks uploaded in parallel during bulk import (optional, default: 4)
+    - LS_IMPORT_RETRIES: Retries per failed chunk during bulk import (optional, default: 3)
+    - LS_IMPORT_VALIDATE: Reject tasks missing data keys of the label config before importing (optional, default: true)
+    - LS_IMPORT_DEDUP: Drop tasks already imported into the project (same data) before importing (optional, default: false)
+    - LS_DEDUP_DIR: Directory of the per-project imported-task hash indexes (optional, default: <tmp>/label-studio-mcp/dedup);
+      each Label Studio instance gets a subdirectory named by its instance key
+    - LS_IMPORT_TIMEOUT: Request timeout in seconds for one bulk import chunk (optional, default: 120)
+    - LS_EXPORT_DIR: Directory for exports streamed to disk (optional, default: <tmp>/label-studio-mcp/exports)
+    - LS_EXPORT_TIMEOUT: Read timeout in seconds while streaming an export (optional, default: 600)
+    - LS_FETCH_PAGE_SIZE: Page size used by fetch-all pagination (optional, default: 100)
+    - LS_FETCH_CONCURRENCY: Pages fetched in parallel by fetch-all pagination (optional, default: 8)
+    - LS_SNAPSHOT_DIR: Directory of the incremental export snapshots (optional, default: <LS_EXPORT_DIR>/snapshots);
+      each Label Studio instance gets a subdirectory named by its instance key
+    - LS_SNAPSHOT_KEEP_DELTAS: Delta manifests kept per project snapshot (optional, default: 30)
+    - LS_MIRROR_PATH: SQLite file of the local task mirror (optional, default: <tmp>/label-studio-mcp/mirror.sqlite3);
+      the instance key is added to the file name
+    - LS_ANALYTICS_EXPORT_TTL: Seconds a project export is reused by the annotation analytics tools (optional, default: 300)
+    - LS_RETRIES: Retries per failed upstream request (optional, default: 3)
+    - LS_RETRY_BACKOFF: Base delay in seconds of the jittered exponential backoff (optional, default: 0.5)
+    - LS_RETRY_MAX_DELAY: Max seconds waited before one retry, including Retry-After (optional, default: 30)
+    - LS_RATE_LIMIT: Max upstream requests per second across all tools, 0 to disable (optional, default: 50)
+    - LS_RATE_BURST: Requests allowed in a burst above LS_RATE_LIMIT (optional, default: 50)
+    - LS_CIRCUIT_FAILURES: Consecutive upstream failures that open the circuit breaker, 0 to disable (optional, default: 5)
+    - LS_CIRCUIT_RESET: Seconds the circuit stays open before a probe request (optional, default: 30)
+    - LS_METRICS_ENABLED: Collect tool and upstream request metrics (optional, default: true)
+    - LS_METRICS_RESPONSE_BYTES: Measure the serialized size of every tool response (optional, default: false)
+    - LS_COMPRESSION: Ask Label Studio for gzip/brotli compressed responses (optional, default: true)
+    - LS_VALIDATOR_CACHE_BYTES: Body bytes kept for conditional GETs (ETag/Last-Modified), 0 to disable (optional, default: 67108864)
+    - LS_BATCH_CONCURRENCY: Projects fetched in parallel by the multi-project batch tools (optional, default: 16)
+    - LS_RESPONSE_MAX_BYTES: Serialized size above which tool responses are truncated or summarized, 0 to disable (optional, default: 100000)
+    - LS_STARTUP_CHECK: 'background' (default) checks the connection in a background thread, 'blocking' verifies it before serving and exits on failure, 'off' skips it
+    - LS_HEALTH_INTERVAL: Seconds between background health checks, 0 to only check once at startup (optional, default: 60)
     """
     def __init__(self):
         self.LS_BASE_URL = os.getenv('LS_BASE_URL')
         self.LS_API_TOKEN = os.getenv('LS_API_TOKEN')
         self.TIMEOUT = int(os.getenv('LS_TIMEOUT', '10'))  # seconds
         self.LS_AUTH_TYPE = os.getenv('LS_AUTH_TYPE', 'personal')
+        # Connection pool
+        self.POOL_CONNECTIONS = int(os.getenv('LS_POOL_CONNECTIONS', '10'))
+        self.POOL_MAXSIZE = int(os.getenv('LS_POOL_MAXSIZE', '20'))
+        self.POOL_BLOCK = _env_bool('LS_POOL_BLOCK', False)
+        self.KEEP_ALIVE = _env_bool('LS_KEEP_ALIVE', True)
+        self.MAX_CONNECTIONS = int(os.getenv('LS_MAX_CONNECTIONS', '100'))
+        self.KEEPALIVE_EXPIRY = float(os.getenv('LS_KEEPALIVE_EXPIRY', '5'))
+        # Project cache
+        self.CACHE_ENABLED = _env_bool('LS_CACHE_ENABLED', True)
+        self.CACHE_MAX_PROJECTS = int(os.getenv('LS_CACHE_MAX_PROJECTS', '256'))
+        self.CACHE_CONFIG_TTL = float(os.getenv('LS_CACHE_CONFIG_TTL', '600'))
+        self.CACHE_GUIDELINES_TTL = float(os.getenv('LS_CACHE_GUIDELINES_TTL', '600'))
+        self.CACHE_DETAIL_TTL = float(os.getenv('LS_CACHE_DETAIL_TTL', '30'))
+        self.CACHE_PROGRESS_TTL = float(os.getenv('LS_CACHE_PROGRESS_TTL', '5'))
+        # Bulk import
+        self.IMPORT_CHUNK_SIZE = int(os.getenv('LS_IMPORT_CHUNK_SIZE', '1000'))
+        self.IMPORT_CHUNK_BYTES = int(os.getenv('LS_IMPORT_CHUNK_BYTES', str(8 * 1024 * 1024)))
+        self.IMPORT_CONCURRENCY = int(os.getenv('LS_IMPORT_CONCURRENCY', '4'))
+        self.IMPORT_RETRIES = int(os.getenv('LS_IMPORT_RETRIES', '3'))
+        self.IMPORT_TIMEOUT = float(os.getenv('LS_IMPORT_TIMEOUT', '120'))
+        self.IMPORT_VALIDATE = _env_bool('LS_IMPORT_VALIDATE', True)
+        self.IMPORT_DEDUP = _env_bool('LS_IMPORT_DEDUP', False)
+        self.DEDUP_DIR = os.getenv('LS_DEDUP_DIR')
+        # Export
+        self.EXPORT_DIR = os.getenv('LS_EXPORT_DIR')
+        self.EXPORT_TIMEOUT = float(os.getenv('LS_EXPORT_TIMEOUT', '600'))
+        # Incremental export snapshots
+        self.SNAPSHOT_DIR = os.getenv('LS_SNAPSHOT_DIR')
+        self.SNAPSHOT_KEEP_DELTAS = int(os.getenv('LS_SNAPSHOT_KEEP_DELTAS', '30'))
+        # Fetch-all pagination
+        self.FETCH_PAGE_SIZE = int(os.getenv('LS_FETCH_PAGE_SIZE', '100'))
+        self.FETCH_CONCURRENCY = int(os.getenv('LS_FETCH_CONCURRENCY', '8'))
+        # Local task mirror
+        self.MIRROR_PATH = os.getenv('LS_MIRROR_PATH')
+        # Annotation analytics
+        self.ANALYTICS_EXPORT_TTL = float(os.getenv('LS_ANALYTICS_EXPORT_TTL', '300'))
+        # Retries, rate limiting and circuit breaker
+        self.RETRIES = int(os.getenv('LS_RETRIES', '3'))
+        self.RETRY_BACKOFF = float(os.getenv('LS_RETRY_BACKOFF', '0.5'))
+        self.RETRY_MAX_DELAY = float(os.getenv('LS_RETRY_MAX_DELAY', '30'))
+        self.RATE_LIMIT = float(os.getenv('LS_RATE_LIMIT', '50'))
+        self.RATE_BURST = float(os.getenv('LS_RATE_BURST', '50'))
+        self.CIRCUIT_FAILURES = int(os.getenv('LS_CIRCUIT_FAILURES', '5'))
+        self.CIRCUIT_RESET = float(os.getenv('LS_CIRCUIT_RESET', '30'))
+        # Metrics
+        self.METRICS_ENABLED = _env_bool('LS_METRICS_ENABLED', True)
+        self.METRICS_RESPONSE_BYTES = _env_bool('LS_METRICS_RESPONSE_BYTES', False)
+        # Conditional requests and compression
+        self.COMPRESSION = _env_bool('LS_COMPRESSION', True)
+        self.VALIDATOR_CACHE_BYTES = int(os.getenv('LS_VALIDATOR_CACHE_BYTES', str(64 * 1024 * 1024)))
+        # Multi-project batch tools
+        self.BATCH_CONCURRENCY = int(os.getenv('LS_BATCH_CONCURRENCY', '16'))
+        # Tool response budget
+        self.RESPONSE_MAX_BYTES = int(os.getenv('LS_RESPONSE_MAX_BYTES', '100000'))
+        # Startup and health checks
+        self.STARTUP_CHECK = os.getenv('LS_STARTUP_CHECK', 'background').strip().lower()
+        self.HEALTH_INTERVAL = float(os.getenv('LS_HEALTH_INTERVAL', '60'))
         # Validation
         missing = []
         if not self.LS_BASE_URL:
@@ -28,13 +135,61 @@ class Config:
             missing.append('LS_API_TOKEN')
         if missing:
             raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
+        # Short id of the Label Studio instance: keeps local state (mirror, snapshots, dedup
+        # indexes) of servers pointed at different instances apart
+        self.INSTANCE_KEY = hashlib.sha256(self.LS_BASE_URL.rstrip('/').encode('utf-8')).hexdigest()[:12]
+        if self.POOL_CONNECTIONS < 1 or self.POOL_MAXSIZE < 1 or self.MAX_CONNECTIONS < 1:
+            raise ValueError("LS_POOL_CONNECTIONS, LS_POOL_MAXSIZE and LS_MAX_CONNECTIONS must be at least 1.")
+        if self.STARTUP_CHECK not in ('background', 'blocking', 'off'):
+            raise ValueError("LS_STARTUP_CHECK must be 'background', 'blocking' or 'off'.")
 
     def __repr__(self):
         return (
             f"Config(LS_BASE_URL={self.LS_BASE_URL}, "
             f"LS_API_TOKEN={'***' if self.LS_API_TOKEN else None}, "
             f"TIMEOUT={self.TIMEOUT}, "
-            f"LS_AUTH_TYPE={self.LS_AUTH_TYPE})"
+            f"LS_AUTH_TYPE={self.LS_AUTH_TYPE}, "
+            f"POOL_CONNECTIONS={self.POOL_CONNECTIONS}, "
+            f"POOL_MAXSIZE={self.POOL_MAXSIZE}, "
+            f"POOL_BLOCK={self.POOL_BLOCK}, "
+            f"KEEP_ALIVE={self.KEEP_ALIVE}, "
+            f"MAX_CONNECTIONS={self.MAX_CONNECTIONS}, "
+            f"KEEPALIVE_EXPIRY={self.KEEPALIVE_EXPIRY}, "
+            f"CACHE_ENABLED={self.CACHE_ENABLED}, "
+            f"CACHE_MAX_PROJECTS={self.CACHE_MAX_PROJECTS})"
         )
 
-config = Config() 
\ No newline at end of file
+_config = None
+_config_lock = threading.Lock()
+
+def get_config():
+    """
+    Return the process-wide Config, loading .env and the environment on first use.
+    Raises ValueError (on every call, until fixed) if the configuration is invalid.
+    """
+    global _config
+    if _config is None:
+        with _config_lock:
+            if _config is None:
+                from dotenv import load_dotenv
+                # Load environment variables from a .env file if present
+                load_dotenv()
+                _config = Config()
+    return _config
+
+class _LazyConfig:
+    """
+    Stand-in for the Config instance that builds it on first attribute access, so modules
+    can keep `from config import config` without reading the environment at import time.
+    A missing LS_BASE_URL then fails the first tool call instead of the server start.
+    """
+    def __getattr__(self, name):
+        return getattr(get_config(), name)
+
+    def __setattr__(self, name, value):
+        setattr(get_config(), name, value)
+
+    def __repr__(self):
+        return repr(_config) if _config is not None else "Config(<not loaded>)"
+
+config = _LazyConfig()
@@ -1,6 +1,9 @@
 import logging
 import traceback
 import functools
+import inspect
+import time
+from metrics import end_tool_scope, record_tool, start_tool_scope
 
 class MCPError(Exception):
     def __init__(self, message, status_code=500, error_type="internal_error", details=None):
@@ -29,13 +32,46 @@ def map_exception_to_mcp_error(exc):
     # Fallback for unexpected errors
     return MCPError("Internal server error", status_code=500, error_type="internal_error", details=traceback.format_exc())
 
+def _handle_tool_exception(exc):
+    mcp_err = map_exception_to_mcp_error(exc)
+    logging.error(f"MCP Tool Error: {mcp_err.error_type} - {mcp_err} (status {mcp_err.status_code})")
+    return mcp_err.to_dict()
+
 def mcp_tool_error_handler(tool_func):
+    """
+    Turn tool exceptions into MCP error dicts and record per-call metrics
+    (wall time, upstream time spent inside the call, response size).
+    """
+    name = tool_func.__name__
+    if inspect.iscoroutinefunction(tool_func):
+        @functools.wraps(tool_func)
+        async def async_wrapper(*args, **kwargs):
+            scope, token = start_tool_scope()
+            start = time.perf_counter()
+            status = "ok"
+            try:
+                result = await tool_func(*args, **kwargs)
+            except Exception as exc:
+                status = "error"
+                result = _handle_tool_exception(exc)
+            finally:
+                end_tool_scope(token)
+            record_tool(name, time.perf_counter() - start, scope, status, result)
+            return result
+        return async_wrapper
+
     @functools.wraps(tool_func)
     def wrapper(*args, **kwargs):
+        scope, token = start_tool_scope()
+        start = time.perf_counter()
+        status = "ok"
         try:
-            return tool_func(*args, **kwargs)
+            result = tool_func(*args, **kwargs)
         except Exception as exc:
-            mcp_err = map_exception_to_mcp_error(exc)
-            logging.error(f"MCP Tool Error: {mcp_err.error_type} - {mcp_err} (status {mcp_err.status_code})")
-            return mcp_err.to_dict()
+            status = "error"
+            result = _handle_tool_exception(exc)
+        finally:
+            end_tool_scope(token)
+        record_tool(name, time.perf_counter() - start, scope, status, result)
+        return result
     return wrapper 
\ No newline at end of file
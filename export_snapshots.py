@@ -0,0 +1,299 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from config import config
+from export_store import export_dir
+from json_codec import dumps, loads
+from task_mirror import next_watermark, parse_timestamp, updated_since_filter
+
+_STATE_VERSION = 1
+
+# Project id -> lock serializing snapshot updates of that project
+_locks = {}
+
+def snapshot_root():
+    """
+    Snapshot directory of the configured Label Studio instance: <LS_SNAPSHOT_DIR>/<instance key>,
+    so project ids of different instances never share a snapshot.
+    """
+    path = os.path.join(config.SNAPSHOT_DIR or os.path.join(export_dir(), 'snapshots'), config.INSTANCE_KEY)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def _digest(line):
+    return hashlib.blake2b(line, digest_size=8).hexdigest()
+
+def _write_json(path, payload):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+class ExportSnapshot:
+    """
+    Compacted local snapshot of a project's tasks with their annotations.
+    One directory per project holds:
+        snapshot.jsonl   one line per task, the latest version of each
+        state.json       updated_at watermark, max task id and a digest per task
+        deltas/          per-run manifests (delta-*.json) and changed records (delta-*.jsonl)
+    Digests tell updated tasks from re-sent unchanged ones, so a run only rewrites the
+    snapshot when something actually changed.
+    :param project_id: Project ID
+    :param root: Directory holding the per-project snapshot directories (default: snapshot_root())
+    """
+    def __init__(self, project_id, root=None):
+        self.project_id = int(project_id)
+        self.dir = os.path.join(root or snapshot_root(), f"project-{self.project_id}")
+        self.deltas_dir = os.path.join(self.dir, 'deltas')
+        self.snapshot_path = os.path.join(self.dir, 'snapshot.jsonl')
+        self.state_path = os.path.join(self.dir, 'state.json')
+        os.makedirs(self.deltas_dir, exist_ok=True)
+
+    def load_state(self):
+        """
+        :return: State dict, or None if the project has no usable snapshot yet
+        """
+        if not os.path.exists(self.state_path) or not os.path.exists(self.snapshot_path):
+            return None
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('version') != _STATE_VERSION or state.get('project_id') != self.project_id:
+            return None
+        return state
+
+    def _classify(self, digests, changes):
+        """
+        Split changed lines into added and updated ids, dropping lines identical to the snapshot.
+        """
+        added, updated = [], []
+        for task_id, line in list(changes.items()):
+            digest = _digest(line)
+            old = digests.get(str(task_id))
+            if old is None:
+                added.append(task_id)
+            elif old != digest:
+                updated.append(task_id)
+            else:
+                del changes[task_id]
+                continue
+            digests[str(task_id)] = digest
+        return added, updated
+
+    def merge(self, changes, current_ids, state, watermark, max_task_id):
+        """
+        Merge changed task lines into the snapshot and write a delta manifest.
+        The snapshot is rewritten in one streaming pass: changed tasks replace their old
+        line in place, deleted tasks are dropped and new tasks are appended.
+        :param changes: Dict of task id -> serialized task line (bytes, no newline)
+        :param current_ids: Set of every task id upstream, or None to skip deletion detection
+        :param state: Current state (see load_state)
+        :return: Delta manifest dict
+        """
+        digests = state['digests']
+        added, updated = self._classify(digests, changes)
+        deleted = []
+        if current_ids is not None:
+            deleted = sorted(int(i) for i in digests if int(i) not in current_ids and int(i) not in changes)
+            for task_id in deleted:
+                del digests[str(task_id)]
+        if changes or deleted:
+            dropped = set(deleted)
+            pending = dict(changes)
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(self.snapshot_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+                for line in src:
+                    task_id = loads(line)['id']
+                    if task_id in dropped:
+                        continue
+                    # A task already in the file but not in the index (interrupted run) is replaced too
+                    replacement = pending.pop(task_id, None)
+                    dst.write(line if replacement is None else replacement + b'\n')
+                for line in pending.values():
+                    dst.write(line + b'\n')
+            os.replace(tmp_path, self.snapshot_path)
+        name = self._delta_name()
+        records_path = self._write_delta_records(name, (changes[i] for i in sorted(changes))) if changes else None
+        return self._finish('incremental', name, digests, added, updated, deleted, records_path,
+                            state['updated_at_watermark'], watermark, max_task_id)
+
+    def _delta_name(self):
+        return f"delta-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+    def _write_delta_records(self, name, lines):
+        path = os.path.join(self.deltas_dir, f"{name}.jsonl")
+        with open(path, 'wb') as f:
+            for line in lines:
+                f.write(line + b'\n')
+        return path
+
+    def start_full(self, state):
+        """
+        Begin replacing the whole snapshot (see FullRebuild).
+        :param state: Previous state, or None for the first (baseline) run
+        """
+        return FullRebuild(self, state)
+
+    def _finish(self, mode, name, digests, added, updated, deleted, records_path,
+                previous_watermark, watermark, max_task_id):
+        manifest = {
+            "project_id": self.project_id,
+            "mode": mode,
+            "created_at": time.time(),
+            "previous_watermark": previous_watermark,
+            "updated_at_watermark": watermark,
+            "counts": {"added": len(added), "updated": len(updated), "deleted": len(deleted),
+                       "records": len(digests)},
+            "added": sorted(added),
+            "updated": sorted(updated),
+            "deleted": deleted,
+            "snapshot_path": self.snapshot_path,
+            "delta_records_path": records_path,
+        }
+        manifest_path = os.path.join(self.deltas_dir, f"{name}.json")
+        _write_json(manifest_path, manifest)
+        manifest["manifest_path"] = manifest_path
+        # The state is written last: a run interrupted before this point is repeated from the old watermark
+        _write_json(self.state_path, {
+            "version": _STATE_VERSION,
+            "project_id": self.project_id,
+            "updated_at_watermark": watermark,
+            "max_task_id": max_task_id,
+            "synced_at": manifest["created_at"],
+            "digests": digests,
+        })
+        self.prune_deltas(config.SNAPSHOT_KEEP_DELTAS)
+        return manifest
+
+    def prune_deltas(self, keep):
+        """
+        Remove all but the newest `keep` delta manifests and their record files.
+        """
+        # Names only have second resolution, so order by write time
+        manifests = sorted((n for n in os.listdir(self.deltas_dir) if n.endswith('.json')),
+                           key=lambda n: (os.path.getmtime(os.path.join(self.deltas_dir, n)), n))
+        for name in manifests[:max(0, len(manifests) - keep)]:
+            for path in (name, name[:-len('.json')] + '.jsonl'):
+                try:
+                    os.remove(os.path.join(self.deltas_dir, path))
+                except FileNotFoundError:
+                    pass
+
+class FullRebuild:
+    """
+    Stream a complete set of tasks into a new snapshot file while diffing it against the
+    previous snapshot's digests. Changed lines go straight to the delta records file,
+    so a rebuild never holds the project in memory. A baseline run (no previous
+    snapshot) writes no delta records: the snapshot itself is the delta.
+    """
+    def __init__(self, store, state):
+        self.store = store
+        self.state = state
+        self.old = state['digests'] if state else {}
+        self.digests = {}
+        self.added = []
+        self.updated = []
+        self.name = store._delta_name()
+        self.tmp_path = f"{store.snapshot_path}.tmp"
+        self.records_path = os.path.join(store.deltas_dir, f"{self.name}.jsonl") if state else None
+        self._out = open(self.tmp_path, 'wb')
+        self._delta = open(self.records_path, 'wb') if state else None
+
+    def add(self, task_id, line):
+        key = str(task_id)
+        if key in self.digests:
+            return
+        digest = self.digests[key] = _digest(line)
+        self._out.write(line + b'\n')
+        previous = self.old.get(key)
+        if previous == digest:
+            return
+        (self.added if previous is None else self.updated).append(task_id)
+        if self._delta is not None:
+            self._delta.write(line + b'\n')
+
+    def abort(self):
+        for f in (self._out, self._delta):
+            if f is not None:
+                f.close()
+        for path in (self.tmp_path, self.records_path):
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    def finish(self, watermark, max_task_id):
+        """
+        :return: Delta manifest dict
+        """
+        self._out.close()
+        os.replace(self.tmp_path, self.store.snapshot_path)
+        records_path = self.records_path
+        if self._delta is not None:
+            self._delta.close()
+            if not (self.added or self.updated):
+                os.remove(records_path)
+                records_path = None
+        deleted = sorted(int(i) for i in self.old if i not in self.digests)
+        return self.store._finish(
+            'full' if self.state else 'baseline', self.name, self.digests, self.added, self.updated, deleted,
+            records_path, self.state['updated_at_watermark'] if self.state else None, watermark, max_task_id,
+        )
+
+async def update_snapshot(client, project_id, full=False, detect_deletions=True, columnar=False,
+                          page_size=None, concurrency=None):
+    """
+    Bring a project's export snapshot up to date.
+    The first run (or full=True) fetches every task. Later runs only fetch tasks whose
+    updated_at is newer than the stored watermark (see task_mirror.next_watermark) and,
+    with detect_deletions, list task ids (without annotations) to find deleted tasks.
+    Tasks re-sent by the watermark overlap are dropped by digest, not reported as updated.
+    :param client: Async Label Studio client
+    :param columnar: Also refresh the annotation_arrays .columns.npz file next to the snapshot
+    :return: Delta manifest dict with 'elapsed_seconds' (and 'columns_path' if columnar)
+    """
+    store = ExportSnapshot(project_id)
+    lock = _locks.setdefault(store.project_id, asyncio.Lock())
+    async with lock:
+        started_wall = time.time()
+        start = time.perf_counter()
+        state = await asyncio.to_thread(store.load_state)
+        incremental = not full and state is not None and state['updated_at_watermark'] is not None
+        previous_watermark = state['updated_at_watermark'] if incremental else None
+        newest_seen = None
+        max_task_id = state['max_task_id'] if incremental else None
+        query_params = {'filters': updated_since_filter(previous_watermark)} if incremental else {}
+        # Incremental runs keep the (small) set of changed tasks in memory; full runs stream to disk
+        changes = {}
+        rebuild = None if incremental else store.start_full(state)
+        try:
+            async for task in client.iter_all_tasks(store.project_id, page_size=page_size, concurrency=concurrency,
+                                                    **query_params):
+                if rebuild is None:
+                    changes[task['id']] = dumps(task)
+                else:
+                    rebuild.add(task['id'], dumps(task))
+                updated_at = parse_timestamp(task.get('updated_at'))
+                if updated_at is not None and (newest_seen is None or updated_at > newest_seen):
+                    newest_seen = updated_at
+                if max_task_id is None or task['id'] > max_task_id:
+                    max_task_id = task['id']
+        except BaseException:
+            if rebuild is not None:
+                rebuild.abort()
+            raise
+        watermark = next_watermark(started_wall, newest_seen, previous_watermark)
+        if incremental:
+            current_ids = None
+            if detect_deletions:
+                tasks = client.iter_all_tasks(store.project_id, page_size=page_size, concurrency=concurrency, fields=['id'])
+                current_ids = {task['id'] async for task in tasks}
+            manifest = await asyncio.to_thread(store.merge, changes, current_ids, state, watermark, max_task_id)
+        else:
+            manifest = await asyncio.to_thread(rebuild.finish, watermark, max_task_id)
+        if columnar:
+            import annotation_arrays
+            await asyncio.to_thread(annotation_arrays.load_table, store.snapshot_path)
+            manifest["columns_path"] = annotation_arrays.columns_cache_path(store.snapshot_path)
+        manifest["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+        return manifest
@@ -0,0 +1,125 @@
+import itertools
+import os
+import tempfile
+import time
+import uuid
+from config import config
+from task_sources import iter_task_file
+
+# Content type fragment -> file extension / record format
+_CONTENT_TYPES = (
+    ('json', 'json'),
+    ('csv', 'csv'),
+    ('tab-separated', 'tsv'),
+    ('zip', 'zip'),
+)
+
+_EXPORT_TYPES = {
+    'JSON': 'json',
+    'JSON_MIN': 'json',
+    'CSV': 'csv',
+    'TSV': 'tsv',
+}
+
+RECORD_FORMATS = ('json', 'jsonl', 'csv', 'tsv')
+
+# Largest page read_records returns; bigger limits are clamped
+MAX_PAGE_RECORDS = 1000
+
+def export_extension(content_type, export_type=None):
+    """
+    Pick a file extension for an export from its Content-Type, falling back to exportType.
+    """
+    content_type = (content_type or '').lower()
+    for fragment, ext in _CONTENT_TYPES:
+        if fragment in content_type:
+            return ext
+    return _EXPORT_TYPES.get((export_type or '').upper(), 'bin')
+
+def export_dir():
+    path = config.EXPORT_DIR or os.path.join(tempfile.gettempdir(), 'label-studio-mcp', 'exports')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def local_roots():
+    """
+    Directories tool callers may name local files in: LS_EXPORT_DIR and LS_SNAPSHOT_DIR.
+    """
+    roots = [export_dir()]
+    if config.SNAPSHOT_DIR:
+        roots.append(config.SNAPSHOT_DIR)
+    return [os.path.realpath(root) for root in roots]
+
+def resolve_local_path(path):
+    """
+    Resolve a local file path given by a tool caller and confine it to the export directories,
+    so tools cannot be used to read or overwrite arbitrary files on the server.
+    Relative paths are taken relative to LS_EXPORT_DIR; '..' and symlinks are resolved first.
+    :param path: File path from a tool argument
+    :return: The resolved absolute path
+    :raises ValueError: if the path is outside LS_EXPORT_DIR and LS_SNAPSHOT_DIR
+    """
+    if not path or not isinstance(path, str):
+        raise ValueError("path must be a non-empty string.")
+    roots = local_roots()
+    resolved = os.path.realpath(os.path.join(roots[0], os.path.expanduser(path)))
+    for root in roots:
+        if resolved == root or resolved.startswith(root.rstrip(os.sep) + os.sep):
+            return resolved
+    raise ValueError(f"Path {path} is outside the export directories ({', '.join(roots)}); "
+                     "set LS_EXPORT_DIR or LS_SNAPSHOT_DIR to allow another location.")
+
+def default_export_path(project_id, ext, compress=False):
+    """
+    Build a timestamped file path for a project export in the export directory.
+    """
+    name = f"project-{project_id}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.{ext}"
+    if compress:
+        name += '.gz'
+    return os.path.join(export_dir(), name)
+
+def record_format(path):
+    """
+    Return the record format of an export file, or None if records cannot be read from it.
+    """
+    name = path[:-3] if path.endswith('.gz') else path
+    ext = os.path.splitext(name)[1].lstrip('.').lower()
+    if ext == 'ndjson':
+        return 'jsonl'
+    return ext if ext in RECORD_FORMATS else None
+
+def count_records(path):
+    """
+    Count the records of an export file with a streaming pass (None for binary formats).
+    """
+    fmt = record_format(path)
+    if fmt is None:
+        return None
+    return sum(1 for _ in iter_task_file(path, format=fmt))
+
+def read_records(path, offset=0, limit=100):
+    """
+    Read one page of records from an export file without loading the rest of it.
+    :param path: Export file path (JSON array, JSONL, CSV or TSV, optionally .gz)
+    :param offset: Index of the first record to return
+    :param limit: Max records to return (clamped to MAX_PAGE_RECORDS)
+    :return: Dict with 'records', 'offset', 'limit' and 'next_offset' (None at the end)
+    """
+    if not path or not os.path.isfile(path):
+        raise ValueError(f"Export file not found: {path}")
+    if offset < 0 or limit < 1:
+        raise ValueError("offset must be >= 0 and limit must be >= 1.")
+    limit = min(limit, MAX_PAGE_RECORDS)
+    fmt = record_format(path)
+    if fmt is None:
+        raise ValueError(f"Cannot read records from {path}; only JSON, JSONL, CSV and TSV exports are paged.")
+    rows = itertools.islice(iter_task_file(path, format=fmt), offset, offset + limit + 1)
+    records = list(rows)
+    has_more = len(records) > limit
+    return {
+        "path": path,
+        "records": records[:limit],
+        "offset": offset,
+        "limit": limit,
+        "next_offset": offset + limit if has_more else None,
+    }
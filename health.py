@@ -0,0 +1,104 @@
+import threading
+import time
+from config import config
+from metrics import get_metrics
+
+class HealthMonitor:
+    """
+    Label Studio reachability, checked off the startup path.
+    start() runs a first check in a daemon thread and repeats it every LS_HEALTH_INTERVAL
+    seconds; the health tool reads the last result with status() or runs check() on demand.
+    Status is 'unknown' until the first check, then 'ok', 'unreachable' or 'misconfigured'.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.status = 'unknown'
+        self.error = None
+        self.checked_at = None
+        self.last_ok_at = None
+        self.latency_seconds = None
+        self.checks = 0
+        self.consecutive_failures = 0
+
+    def check(self):
+        """
+        Probe /api/health once with the shared sync client (no retries: a health check
+        reports the current state rather than waiting it out).
+        :return: Status dict (see status)
+        """
+        start = time.perf_counter()
+        try:
+            from label_studio_client import get_client
+            get_client().get('/api/health', retries=0)
+        except ValueError as e:
+            # Raised by Config for missing or invalid settings
+            status, error = 'misconfigured', str(e)
+        except Exception as e:
+            status, error = 'unreachable', str(e)
+        else:
+            status, error = 'ok', None
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.status = status
+            self.error = error
+            self.checked_at = time.time()
+            self.latency_seconds = round(elapsed, 4)
+            self.checks += 1
+            if status == 'ok':
+                self.last_ok_at = self.checked_at
+                self.consecutive_failures = 0
+            else:
+                self.consecutive_failures += 1
+        get_metrics().inc('health_checks_total', status=status)
+        return self.snapshot()
+
+    def _interval(self):
+        try:
+            return config.HEALTH_INTERVAL
+        except ValueError:
+            return 0
+
+    def _run(self):
+        if not self.checks:
+            self.check()
+        interval = self._interval()
+        while interval > 0 and not self._stop.wait(interval):
+            self.check()
+
+    def start(self):
+        """
+        Start background checking (no-op if already running). Returns immediately.
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='label-studio-health', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "status": self.status,
+                "error": self.error,
+                "checked_at": self.checked_at,
+                "last_ok_at": self.last_ok_at,
+                "latency_seconds": self.latency_seconds,
+                "checks": self.checks,
+                "consecutive_failures": self.consecutive_failures,
+                "background": self.running,
+            }
+
+_monitor = HealthMonitor()
+
+def get_health_monitor():
+    return _monitor
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import Counter
+from config import config
+from label_config import project_label_config
+
+_DIGEST_SIZE = 16
+
+# Rejected rows reported individually in the stats
+MAX_REJECTION_SAMPLES = 20
+
+def task_data(task):
+    """
+    The data part of a task: its 'data' dict, or the whole row for flat tasks (e.g. CSV rows).
+    """
+    data = task.get('data')
+    return data if isinstance(data, dict) else task
+
+def task_digest(task):
+    """
+    Content hash of a task's data, independent of key order.
+    """
+    encoded = json.dumps(task_data(task), sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.blake2b(encoded.encode('utf-8'), digest_size=_DIGEST_SIZE).digest()
+
+class TaskHashIndex:
+    """
+    Append-only file of task content hashes already imported into one project.
+    The file is a flat sequence of 16-byte digests, loaded into a set on open, so a
+    lookup is one set membership test and recording a chunk is one append.
+    :param path: Index file path
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.hashes = set()
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                content = f.read()
+            # A torn final record from an interrupted append is ignored
+            usable = len(content) - len(content) % _DIGEST_SIZE
+            self.hashes = {content[i:i + _DIGEST_SIZE] for i in range(0, usable, _DIGEST_SIZE)}
+
+    def __contains__(self, digest):
+        return digest in self.hashes
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def add(self, digests):
+        with self._lock:
+            new = [d for d in digests if d not in self.hashes]
+            if not new:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, 'ab') as f:
+                f.write(b''.join(new))
+            self.hashes.update(new)
+
+    def clear(self):
+        with self._lock:
+            self.hashes.clear()
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+def dedup_dir():
+    """
+    Index directory of the configured Label Studio instance: <LS_DEDUP_DIR>/<instance key>,
+    so tasks imported into one instance are never taken as duplicates on another.
+    """
+    root = config.DEDUP_DIR or os.path.join(tempfile.gettempdir(), 'label-studio-mcp', 'dedup')
+    return os.path.join(root, config.INSTANCE_KEY)
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_hash_index(project_id):
+    """
+    Return the shared TaskHashIndex of a project, loading it on first use.
+    """
+    key = (config.INSTANCE_KEY, str(project_id))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = TaskHashIndex(os.path.join(dedup_dir(), f"project-{project_id}.hashes"))
+        return index
+
+def drop_hash_index(project_id):
+    """
+    Forget the imported-task hashes of a project (e.g. after it was deleted).
+    """
+    get_hash_index(project_id).clear()
+    with _indexes_lock:
+        _indexes.pop((config.INSTANCE_KEY, str(project_id)), None)
+
+class ImportFilter:
+    """
+    Streaming pre-import stage: rejects tasks whose data lacks a key the label config
+    displays, and drops tasks whose content was already imported into the project
+    (or appears earlier in the same run).
+    Hashes of accepted tasks are only recorded in the project index once their chunk
+    was imported (see commit), so a failed upload is never mistaken for a duplicate.
+    :param required_keys: Data keys every task must have (None = skip the check)
+    :param index: TaskHashIndex of the project (None = no deduplication)
+    """
+    def __init__(self, required_keys=None, index=None):
+        self.required_keys = list(required_keys) if required_keys else None
+        self.index = index
+        self.rows_checked = 0
+        self.accepted = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.rejections = []
+        self.missing_keys = Counter()
+        self._seen = set()
+        self._pending = {}
+
+    def _missing(self, task):
+        if not isinstance(task, dict):
+            return ['<task is not an object>']
+        data = task_data(task)
+        return [key for key in self.required_keys if key not in data]
+
+    def filter(self, tasks):
+        """
+        Yield the tasks that pass, in order. Accepted tasks are numbered from 0 in the order
+        they are yielded; commit() takes ranges of those positions.
+        """
+        for row, task in enumerate(tasks):
+            self.rows_checked += 1
+            if self.required_keys:
+                missing = self._missing(task)
+                if missing:
+                    self.rejected += 1
+                    self.missing_keys.update(missing)
+                    if len(self.rejections) < MAX_REJECTION_SAMPLES:
+                        self.rejections.append({"row": row, "missing_keys": missing})
+                    continue
+            if self.index is not None:
+                digest = task_digest(task)
+                if digest in self.index or digest in self._seen:
+                    self.duplicates += 1
+                    continue
+                self._seen.add(digest)
+                self._pending[self.accepted] = digest
+            self.accepted += 1
+            yield task
+
+    def commit(self, offset, count):
+        """
+        Record the hashes of accepted tasks [offset, offset + count) as imported.
+        """
+        if self.index is None:
+            return
+        self.index.add([d for d in (self._pending.pop(i, None) for i in range(offset, offset + count)) if d])
+
+    def on_chunk(self, chunk):
+        """
+        ChunkedUploader callback committing imported (or checkpoint-skipped) chunks.
+        """
+        if chunk["status"] != "failed":
+            self.commit(chunk["offset"], chunk["item_count"])
+
+    def stats(self):
+        return {
+            "validated": self.required_keys is not None,
+            "required_keys": self.required_keys,
+            "deduplicated": self.index is not None,
+            "rows_checked": self.rows_checked,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "duplicates": self.duplicates,
+            "missing_keys": dict(self.missing_keys.most_common()),
+            "rejections": self.rejections,
+        }
+
+async def build_import_filter(project_id, validate=None, deduplicate=None):
+    """
+    Build the ImportFilter for a project. Required data keys come from the project's label
+    config, fetched through the project cache and parsed with the cached label_config model.
+    Validation is skipped when the project has no (parseable) config.
+    :param validate: Check data keys (default: LS_IMPORT_VALIDATE)
+    :param deduplicate: Drop already imported tasks (default: LS_IMPORT_DEDUP, off)
+    """
+    validate = config.IMPORT_VALIDATE if validate is None else validate
+    deduplicate = config.IMPORT_DEDUP if deduplicate is None else deduplicate
+    required_keys = None
+    if validate:
+        model = await project_label_config(project_id)
+        if model is not None:
+            required_keys = model.required_data_keys or None
+    return ImportFilter(required_keys, get_hash_index(project_id) if deduplicate else None)
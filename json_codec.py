@@ -0,0 +1,32 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+JSON_BACKEND = 'orjson' if orjson is not None else 'json'
+
+def loads(data):
+    """
+    Decode JSON from bytes or str, with orjson when it is installed.
+    Falls back to the standard library for input orjson rejects (e.g. integers over 64 bits).
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+def dumps(obj):
+    """
+    Encode obj as compact UTF-8 JSON bytes, with orjson when it is installed.
+    Values JSON cannot represent are encoded with str().
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=str).encode('utf-8')
@@ -0,0 +1,241 @@
+import hashlib
+import threading
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from metrics import get_metrics
+
+# Tags that display task data (their 'value' or 'valueList' binds a $data key)
+OBJECT_TAGS = frozenset({
+    'Audio', 'AudioPlus', 'Image', 'HyperText', 'List', 'Paragraphs', 'Pdf', 'PDF',
+    'Table', 'Text', 'TimeSeries', 'Video', 'Markdown', 'Chat',
+})
+
+# Tags that produce annotation results (they point at object tags through 'toName')
+CONTROL_TAGS = frozenset({
+    'Brush', 'BrushLabels', 'Choices', 'DateTime', 'Ellipse', 'EllipseLabels', 'HyperTextLabels',
+    'KeyPoint', 'KeyPointLabels', 'Labels', 'MagicWand', 'Number', 'Pairwise', 'ParagraphLabels',
+    'Polygon', 'PolygonLabels', 'Ranker', 'Rating', 'Rectangle', 'RectangleLabels', 'Relations', 'TextArea',
+    'Taxonomy', 'TimeSeriesLabels', 'VideoRectangle', 'BitmaskLabels', 'Bitmask', 'Vector', 'VectorLabels',
+})
+
+# Controls whose results are picked from child <Label>/<Choice> values
+_LABEL_CHILDREN = {'Choices': 'Choice', 'Taxonomy': 'Choice'}
+
+# Controls that do not need a toName (or a name)
+_NO_TARGET = frozenset({'Relations'})
+
+_CACHE_MAX_ENTRIES = 256
+
+def config_hash(xml):
+    return hashlib.sha256(xml.encode('utf-8')).hexdigest()
+
+def _split_names(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+def _data_key(value):
+    """
+    Top-level task data key bound by a '$var' value (e.g. '$image' -> 'image'), or None.
+    """
+    if not value or not value.startswith('$'):
+        return None
+    return value[1:].split('.', 1)[0].split('[', 1)[0] or None
+
+def _label_tag(tag):
+    return _LABEL_CHILDREN.get(tag, 'Label' if tag.endswith('Labels') else None)
+
+class LabelConfig:
+    """
+    Parsed label config: object tags, control tags and the task data keys they bind.
+    Built once per distinct XML (see parse_label_config) and treated as read-only.
+    Errors are limited to configs Label Studio rejects as well (broken XML, duplicate or
+    missing names, toName pointing at no tag); anything this parser is unsure about, such
+    as tags it does not know, is reported as a warning.
+    """
+    __slots__ = ('hash', 'objects', 'controls', 'data_keys', 'names', 'errors', 'warnings')
+
+    def __init__(self, xml):
+        self.hash = config_hash(xml)
+        self.objects = {}
+        self.controls = {}
+        self.data_keys = []
+        self.names = set()
+        self.errors = []
+        self.warnings = []
+        try:
+            root = ET.fromstring(xml)
+        except ET.ParseError as e:
+            self.errors.append(f"Invalid XML: {e}")
+            return
+        if root.tag != 'View':
+            self.errors.append(f"The root tag must be <View>, got <{root.tag}>.")
+        self._collect(root)
+        self._check()
+
+    @property
+    def valid(self):
+        return not self.errors
+
+    def _collect(self, root):
+        names = set()
+        data_keys = {}
+        for element in root.iter():
+            tag = element.tag
+            name = element.get('name')
+            # Objects bind one data value ('value') or a list of them ('valueList')
+            value = element.get('value') or element.get('valueList')
+            is_control = tag in CONTROL_TAGS or (element.get('toName') is not None and tag not in OBJECT_TAGS)
+            is_object = not is_control and (tag in OBJECT_TAGS or (name and (value or '').startswith('$')))
+            if name:
+                # Layout or unknown tags can still be toName targets
+                self.names.add(name)
+            if not is_control and not is_object:
+                continue
+            if not name:
+                # <Relations> is usually nameless; it configures the relation editor, not a result
+                if tag not in _NO_TARGET:
+                    self.errors.append(f"<{tag}> is missing the 'name' attribute.")
+                continue
+            if name in names:
+                self.errors.append(f"Tag name '{name}' is used more than once.")
+                continue
+            names.add(name)
+            key = _data_key(value)
+            if key:
+                data_keys.setdefault(key, None)
+            if is_object:
+                if not value:
+                    self.warnings.append(f"<{tag} name=\"{name}\"> has no 'value' or 'valueList' attribute.")
+                elif key is None:
+                    self.warnings.append(f"<{tag} name=\"{name}\"> value '{value}' is not bound to task data ($variable).")
+                self.objects[name] = {"name": name, "tag": tag, "value": value, "data_key": key}
+                continue
+            control = {"name": name, "tag": tag, "to_name": _split_names(element.get('toName'))}
+            child_tag = _label_tag(tag)
+            if child_tag:
+                control["labels"] = self._labels(element, tag, name, child_tag, dynamic=key is not None)
+            if key:
+                control["data_key"] = key
+            self.controls[name] = control
+        self.data_keys = list(data_keys)
+
+    def _labels(self, element, tag, name, child_tag, dynamic):
+        labels = []
+        seen = set()
+        for child in element.iter(child_tag):
+            value = child.get('value', child.get('alias'))
+            if value is None:
+                self.errors.append(f"<{child_tag}> in '{name}' is missing the 'value' attribute.")
+                continue
+            if value in seen:
+                # Taxonomy values only need to be unique among siblings
+                if tag == 'Taxonomy':
+                    continue
+                self.warnings.append(f"'{name}' lists the {child_tag.lower()} '{value}' more than once.")
+                continue
+            seen.add(value)
+            labels.append(value)
+        if not labels and not dynamic:
+            self.warnings.append(f"<{tag} name=\"{name}\"> has no <{child_tag}> children.")
+        return labels
+
+    def _check(self):
+        for control in self.controls.values():
+            if not control["to_name"]:
+                if control["tag"] not in _NO_TARGET:
+                    self.errors.append(f"<{control['tag']} name=\"{control['name']}\"> is missing the 'toName' attribute.")
+                continue
+            for target in control["to_name"]:
+                if target not in self.names:
+                    self.errors.append(f"'{control['name']}' has toName='{target}', which is not the name of any tag.")
+                elif target not in self.objects:
+                    self.warnings.append(
+                        f"'{control['name']}' has toName='{target}', which is not a known object tag."
+                    )
+        if not self.controls and not self.errors:
+            self.warnings.append("The config has no control tags, so it cannot produce annotations.")
+
+    @property
+    def required_data_keys(self):
+        """
+        Task data keys the object tags display; a task without one of them cannot be labeled.
+        """
+        return list(dict.fromkeys(o["data_key"] for o in self.objects.values() if o["data_key"]))
+
+    def labels(self, control_name=None):
+        """
+        Label values per control (only controls that pick from a fixed list).
+        """
+        return {
+            name: control["labels"]
+            for name, control in self.controls.items()
+            if "labels" in control and (control_name is None or name == control_name)
+        }
+
+    def validation(self):
+        return {"valid": self.valid, "errors": list(self.errors), "warnings": list(self.warnings)}
+
+    def to_dict(self):
+        return {
+            "hash": self.hash,
+            **self.validation(),
+            "objects": list(self.objects.values()),
+            "controls": list(self.controls.values()),
+            "data_keys": list(self.data_keys),
+        }
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0}
+
+def parse_label_config(xml):
+    """
+    Parse a label config, reusing the cached model for XML seen before (keyed by SHA-256).
+    Parsing never raises for bad configs: problems are reported in .errors.
+    :return: LabelConfig
+    """
+    if not isinstance(xml, str) or not xml.strip():
+        raise ValueError("label_config must be a non-empty XML string.")
+    key = config_hash(xml)
+    with _cache_lock:
+        model = _cache.get(key)
+        if model is not None:
+            _cache.move_to_end(key)
+            _cache_stats["hits"] += 1
+            get_metrics().inc('label_config_cache_requests_total', result='hit')
+            return model
+        _cache_stats["misses"] += 1
+    get_metrics().inc('label_config_cache_requests_total', result='miss')
+    model = LabelConfig(xml)
+    with _cache_lock:
+        _cache[key] = model
+        while len(_cache) > _CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return model
+
+def require_valid(xml):
+    """
+    Raise ValueError listing the local validation errors of a config, so invalid XML
+    never reaches Label Studio.
+    :return: LabelConfig
+    """
+    model = parse_label_config(xml)
+    if not model.valid:
+        raise ValueError("Invalid label_config: " + " ".join(model.errors))
+    return model
+
+async def project_label_config(project_id, valid_only=True):
+    """
+    Fetch a project's label config through the project cache and parse it.
+    :param valid_only: Return None instead of a model with validation errors
+    :return: LabelConfig, or None when the project has no config (or an invalid one)
+    """
+    from project_cache import fetch_project
+    xml = (await fetch_project(project_id, "config")).get("label_config")
+    if not isinstance(xml, str) or not xml.strip():
+        return None
+    model = parse_label_config(xml)
+    return model if model.valid or not valid_only else None
+
+def cache_stats():
+    with _cache_lock:
+        return {**_cache_stats, "size": len(_cache), "max_entries": _CACHE_MAX_ENTRIES}
@@ -1,46 +1,205 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
 from config import config
+from conditional_cache import accept_encoding, get_validator_store, request_key
+from json_codec import loads
+from response_shaping import top_level_fields
+from metrics import endpoint_template, get_metrics, record_upstream
+from resilience import backoff_delay, get_circuit_breaker, get_rate_limiter, parse_retry_after, should_retry
+
+# Task fields Label Studio only serializes when 'fields=task_only' is not set
+TASK_RELATED_FIELDS = frozenset({'annotations', 'predictions'})
+
+class LabelStudioAPIError(RuntimeError):
+    """
+    Upstream request failure. status_code is None for transport errors (timeouts, refused connections).
+    retry_after holds the upstream Retry-After delay in seconds, if one was sent.
+    """
+    def __init__(self, message, status_code=None, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self):
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+
+def _build_headers():
+    """
+    Build the auth headers for the configured LS_AUTH_TYPE.
+    """
+    auth_type = getattr(config, 'LS_AUTH_TYPE', 'personal').lower()
+    if auth_type == 'legacy':
+        return {
+            'Authorization': f'Token {config.LS_API_TOKEN}',
+            'Content-Type': 'application/json',
+            'Accept-Encoding': accept_encoding(),
+        }
+    return {
+        'Authorization': f'Bearer {config.LS_API_TOKEN}',
+        'Content-Type': 'application/json',
+        'Accept-Encoding': accept_encoding(),
+    }
+
+def _content_length(headers):
+    try:
+        return int(headers.get('Content-Length') or 0)
+    except ValueError:
+        return 0
+
+def _rate_limit_wait():
+    wait = get_rate_limiter().acquire()
+    if wait:
+        get_metrics().observe('upstream_rate_limit_wait_seconds', wait)
+    return wait
+
+def _record_savings(wire_bytes, body_bytes):
+    if body_bytes > wire_bytes > 0:
+        get_metrics().inc('upstream_bytes_saved_total', body_bytes - wire_bytes, reason='compression')
+
+def _record_not_modified(endpoint, body):
+    get_metrics().inc('upstream_not_modified_total', endpoint=endpoint_template(endpoint))
+    get_metrics().inc('upstream_bytes_saved_total', len(body), reason='not_modified')
+
+def _circuit_open_error(method, url, remaining):
+    get_metrics().inc('upstream_circuit_open_total')
+    return LabelStudioAPIError(
+        f"{method} {url} not sent: Label Studio is failing, circuit breaker open for another {remaining:.1f}s",
+        503,
+        retry_after=remaining,
+    )
 
 class LabelStudioClient:
     """
     Client for interacting with the Label Studio API.
     Supports both personal (Bearer <token>, default) and legacy (Token <token>) authentication schemes.
     Set LS_AUTH_TYPE in your environment or .env to 'personal' (default) or 'legacy'.
+    All requests go through a pooled requests.Session, so keep-alive connections are reused
+    across calls. Use get_client() to share one instance across the whole process.
+    Requests share the process-wide rate limiter and circuit breaker, and failed
+    idempotent requests are retried with jittered backoff (see resilience.py).
     """
     def __init__(self):
         self.base_url = config.LS_BASE_URL.rstrip('/')
         self.token = config.LS_API_TOKEN
         self.timeout = config.TIMEOUT
-        # Determine auth type
-        auth_type = getattr(config, 'LS_AUTH_TYPE', 'personal').lower()
-        if auth_type == 'legacy':
-            self.headers = {
-                'Authorization': f'Token {self.token}',
-                'Content-Type': 'application/json',
-            }
-        else:
-            self.headers = {
-                'Authorization': f'Bearer {self.token}',
-                'Content-Type': 'application/json',
-            }
+        self.headers = _build_headers()
+        self.session = self._build_session()
 
-    def get(self, endpoint, **kwargs):
+    def _build_session(self):
+        """
+        Build a requests.Session with a keep-alive connection pool sized from Config.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=config.POOL_CONNECTIONS,
+            pool_maxsize=config.POOL_MAXSIZE,
+            pool_block=config.POOL_BLOCK,
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update(self.headers)
+        if not config.KEEP_ALIVE:
+            session.headers['Connection'] = 'close'
+        return session
+
+    def close(self):
+        """
+        Close all pooled connections.
+        """
+        self.session.close()
+
+    def _request(self, method, endpoint, retries=None, **kwargs):
+        """
+        Send a request through the pooled session and raise for HTTP errors.
+        Waits for the shared rate limiter, fails fast while the circuit breaker is open,
+        and retries retryable failures (see resilience.should_retry).
+        GETs are sent conditionally when a validated copy is stored (see conditional_cache).
+        :param retries: Retries after the first attempt (default: LS_RETRIES)
+        :return: requests.Response
+        """
         url = f"{self.base_url}{endpoint}"
-        try:
-            resp = requests.get(url, headers=self.headers, timeout=self.timeout, **kwargs)
-            resp.raise_for_status()
-            return resp.json()
-        except requests.RequestException as e:
-            raise RuntimeError(f"GET {url} failed: {e}")
+        kwargs.setdefault('timeout', self.timeout)
+        retries = config.RETRIES if retries is None else retries
+        breaker = get_circuit_breaker()
+        store = get_validator_store()
+        key = request_key(url, kwargs.get('params')) if method == 'GET' and not kwargs.get('stream') else None
+        base_headers = kwargs.pop('headers', None) or {}
+        attempt = 0
+        while True:
+            if key is not None:
+                kwargs['headers'] = {**base_headers, **store.conditional_headers(key)}
+            elif base_headers:
+                kwargs['headers'] = base_headers
+            attempt += 1
+            remaining = breaker.check()
+            if remaining is not None:
+                raise _circuit_open_error(method, url, remaining)
+            time.sleep(_rate_limit_wait())
+            start = time.perf_counter()
+            try:
+                resp = self.session.request(method, url, **kwargs)
+                resp.raise_for_status()
+            except requests.RequestException as e:
+                response = e.response
+                error = LabelStudioAPIError(
+                    f"{method} {url} failed: {e}",
+                    response.status_code if response is not None else None,
+                    parse_retry_after(response.headers.get('Retry-After')) if response is not None else None,
+                )
+                record_upstream(method, endpoint, error.status_code or 'error', time.perf_counter() - start)
+                breaker.record(error)
+                if not should_retry(method, error, attempt, retries):
+                    raise error
+                get_metrics().inc('upstream_retries_total', method=method, endpoint=endpoint_template(endpoint))
+                time.sleep(backoff_delay(attempt, error.retry_after))
+                continue
+            # Streamed bodies are not read yet; fall back to the declared length
+            if kwargs.get('stream'):
+                response_bytes = _content_length(resp.headers)
+            else:
+                response_bytes = resp.raw.tell() if hasattr(resp.raw, 'tell') else len(resp.content)
+                _record_savings(response_bytes, len(resp.content))
+            record_upstream(method, endpoint, resp.status_code, time.perf_counter() - start,
+                            _content_length(resp.request.headers), response_bytes)
+            breaker.record()
+            if key is not None:
+                if resp.status_code == 304:
+                    cached = store.not_modified(key)
+                    if cached is None:
+                        # Evicted since the request was sent; fetch it again unconditionally
+                        continue
+                    _record_not_modified(endpoint, cached[0])
+                    return self._replay(resp, *cached)
+                store.store(key, resp.headers, resp.content)
+            return resp
+
+    @staticmethod
+    def _replay(resp, body, headers):
+        """
+        Build a 200 response from a stored body after a 304 Not Modified.
+        """
+        replay = requests.Response()
+        replay.status_code = 200
+        replay._content = body
+        replay.headers.update(headers)
+        replay.url = resp.url
+        replay.request = resp.request
+        return replay
+
+    def get(self, endpoint, **kwargs):
+        return loads(self._request('GET', endpoint, **kwargs).content)
 
     def post(self, endpoint, json=None, **kwargs):
-        url = f"{self.base_url}{endpoint}"
-        try:
-            resp = requests.post(url, headers=self.headers, json=json, timeout=self.timeout, **kwargs)
-            resp.raise_for_status()
-            return resp.json()
-        except requests.RequestException as e:
-            raise RuntimeError(f"POST {url} failed: {e}")
+        return loads(self._request('POST', endpoint, json=json, **kwargs).content)
 
     def patch(self, endpoint, json=None, **kwargs):
         """
@@ -50,13 +209,16 @@ class LabelStudioClient:
         :param kwargs: (optional) Additional arguments for requests.patch
         :return: API response as dict
         """
-        url = f"{self.base_url}{endpoint}"
-        try:
-            resp = requests.patch(url, headers=self.headers, json=json, timeout=self.timeout, **kwargs)
-            resp.raise_for_status()
-            return resp.json()
-        except requests.RequestException as e:
-            raise RuntimeError(f"PATCH {url} failed: {e}")
+        return loads(self._request('PATCH', endpoint, json=json, **kwargs).content)
+
+    def delete(self, endpoint, **kwargs):
+        """
+        Send a DELETE request to the Label Studio API.
+        :param endpoint: API endpoint (e.g., '/api/projects/{id}/')
+        :return: API response as dict (empty if the response has no body)
+        """
+        resp = self._request('DELETE', endpoint, **kwargs)
+        return loads(resp.content) if resp.content else {}
 
     def verify_connection(self):
         """
@@ -108,19 +270,395 @@ class LabelStudioClient:
         if not project_id:
             raise ValueError("project_id is required.")
         endpoint = f"/api/projects/{project_id}/export"
-        url = f"{self.base_url}{endpoint}"
         try:
-            resp = requests.get(url, headers=self.headers, params=query_params, timeout=self.timeout, stream=True)
-            resp.raise_for_status()
-            content_type = resp.headers.get('Content-Type', '')
-            # For JSON, parse and return as object; for others, return raw content
-            if 'application/json' in content_type:
-                return resp.json(), content_type
-            else:
-                return resp.content, content_type
-        except requests.RequestException as e:
+            with self._request('GET', endpoint, params=query_params, stream=True) as resp:
+                content_type = resp.headers.get('Content-Type', '')
+                # For JSON, parse and return as object; for others, return raw content
+                if 'application/json' in content_type:
+                    return loads(resp.content), content_type
+                else:
+                    return resp.content, content_type
+        except (requests.RequestException, RuntimeError) as e:
             raise RuntimeError(f"Exporting annotations failed: {e}")
 
+class AsyncLabelStudioClient:
+    """
+    Asyncio variant of LabelStudioClient backed by a shared httpx.AsyncClient pool.
+    Tools await these methods so concurrent tool calls overlap their upstream I/O
+    instead of blocking the FastMCP event loop. Use get_async_client() to share one
+    instance per event loop.
+    """
+    def __init__(self):
+        self.base_url = config.LS_BASE_URL.rstrip('/')
+        self.token = config.LS_API_TOKEN
+        self.timeout = config.TIMEOUT
+        self.headers = _build_headers()
+        if not config.KEEP_ALIVE:
+            self.headers['Connection'] = 'close'
+        limits = httpx.Limits(
+            max_connections=config.MAX_CONNECTIONS,
+            max_keepalive_connections=config.POOL_MAXSIZE if config.KEEP_ALIVE else 0,
+            keepalive_expiry=config.KEEPALIVE_EXPIRY,
+        )
+        self.client = httpx.AsyncClient(headers=self.headers, timeout=self.timeout, limits=limits)
+
+    async def aclose(self):
+        """
+        Close all pooled connections.
+        """
+        await self.client.aclose()
+
+    @staticmethod
+    def _encode_params(params):
+        # Label Studio expects structured query parameters (e.g. filters) as JSON strings
+        if not params:
+            return params
+        return {k: json.dumps(v) if isinstance(v, dict) else v for k, v in params.items() if v is not None}
+
+    @staticmethod
+    def _error(method, url, e):
+        if isinstance(e, httpx.HTTPStatusError):
+            return LabelStudioAPIError(
+                f"{method} {url} failed: {e}",
+                e.response.status_code,
+                parse_retry_after(e.response.headers.get('Retry-After')),
+            )
+        return LabelStudioAPIError(f"{method} {url} failed: {e}")
+
+    async def _admit(self, method, url):
+        """
+        Fail fast if the circuit breaker is open, then wait for the shared rate limiter.
+        """
+        remaining = get_circuit_breaker().check()
+        if remaining is not None:
+            raise _circuit_open_error(method, url, remaining)
+        wait = _rate_limit_wait()
+        if wait:
+            await asyncio.sleep(wait)
+
+    async def _request(self, method, endpoint, params=None, retries=None, **kwargs):
+        """
+        Send a request through the pooled async client and raise for HTTP errors.
+        Waits for the shared rate limiter, fails fast while the circuit breaker is open,
+        and retries retryable failures (see resilience.should_retry).
+        GETs are sent conditionally when a validated copy is stored (see conditional_cache).
+        :param retries: Retries after the first attempt (default: LS_RETRIES)
+        :return: httpx.Response
+        """
+        url = f"{self.base_url}{endpoint}"
+        params = self._encode_params(params)
+        retries = config.RETRIES if retries is None else retries
+        breaker = get_circuit_breaker()
+        store = get_validator_store()
+        key = request_key(url, params) if method == 'GET' else None
+        base_headers = kwargs.pop('headers', None) or {}
+        attempt = 0
+        while True:
+            attempt += 1
+            headers = {**base_headers, **store.conditional_headers(key)} if key is not None else base_headers
+            await self._admit(method, url)
+            start = time.perf_counter()
+            try:
+                resp = await self.client.request(method, url, params=params, headers=headers or None, **kwargs)
+                if resp.status_code != 304 or key is None:
+                    resp.raise_for_status()
+            except httpx.HTTPError as e:
+                error = self._error(method, url, e)
+                record_upstream(method, endpoint, error.status_code or 'error', time.perf_counter() - start)
+                breaker.record(error)
+                if not should_retry(method, error, attempt, retries):
+                    raise error
+                get_metrics().inc('upstream_retries_total', method=method, endpoint=endpoint_template(endpoint))
+                await asyncio.sleep(backoff_delay(attempt, error.retry_after))
+                continue
+            record_upstream(method, endpoint, resp.status_code, time.perf_counter() - start,
+                            _content_length(resp.request.headers), resp.num_bytes_downloaded)
+            _record_savings(resp.num_bytes_downloaded, len(resp.content))
+            breaker.record()
+            if key is not None:
+                if resp.status_code == 304:
+                    cached = store.not_modified(key)
+                    if cached is None:
+                        # Evicted since the request was sent; fetch it again unconditionally
+                        continue
+                    _record_not_modified(endpoint, cached[0])
+                    body, stored_headers = cached
+                    return httpx.Response(200, headers=stored_headers, content=body, request=resp.request)
+                store.store(key, resp.headers, resp.content)
+            return resp
+
+    async def get(self, endpoint, **kwargs):
+        return loads((await self._request('GET', endpoint, **kwargs)).content)
+
+    async def post(self, endpoint, json=None, **kwargs):
+        return loads((await self._request('POST', endpoint, json=json, **kwargs)).content)
+
+    async def post_raw(self, endpoint, content, **kwargs):
+        """
+        POST an already serialized JSON body, avoiding a second encode of large payloads.
+        :param content: Request body as bytes
+        :return: API response as dict (empty if the response has no body)
+        """
+        resp = await self._request('POST', endpoint, content=content, **kwargs)
+        return loads(resp.content) if resp.content else {}
+
+    async def patch(self, endpoint, json=None, **kwargs):
+        """
+        Send a PATCH request to the Label Studio API.
+        :param endpoint: API endpoint (e.g., '/api/projects/{id}/')
+        :param json: (optional) JSON payload to send in the request body
+        :return: API response as dict
+        """
+        return loads((await self._request('PATCH', endpoint, json=json, **kwargs)).content)
+
+    async def delete(self, endpoint, **kwargs):
+        """
+        Send a DELETE request to the Label Studio API.
+        :return: API response as dict (empty if the response has no body)
+        """
+        resp = await self._request('DELETE', endpoint, **kwargs)
+        return loads(resp.content) if resp.content else {}
+
+    async def verify_connection(self):
+        """
+        Verifies connectivity to Label Studio by calling /api/health.
+        Raises a clear error if the connection fails.
+        """
+        try:
+            await self.get('/api/health')
+        except Exception as e:
+            raise RuntimeError(f"Label Studio connection verification failed: {e}")
+
+    async def import_tasks(self, project_id, tasks):
+        """
+        Import tasks into a Label Studio project.
+        :param project_id: ID of the project to import tasks into
+        :param tasks: List of task dicts to import
+        :return: API response as dict
+        """
+        if not project_id or not isinstance(tasks, list) or not tasks:
+            raise ValueError("project_id and a non-empty list of tasks are required.")
+        endpoint = f"/api/projects/{project_id}/import"
+        try:
+            return await self.post(endpoint, json=tasks)
+        except Exception as e:
+            raise RuntimeError(f"Importing tasks failed: {e}")
+
+    async def import_tasks_bulk(self, project_id, tasks, checkpoint_path=None, on_chunk=None, **options):
+        """
+        Import a large stream of tasks in concurrent, individually retried chunks.
+        :param project_id: ID of the project to import tasks into
+        :param tasks: Iterable of task dicts (consumed lazily)
+        :param checkpoint_path: Optional JSON file; chunks recorded there are not re-uploaded
+        :param on_chunk: Optional callback invoked with each chunk result as it completes
+        :param options: chunk_size, max_chunk_bytes, concurrency, retries, timeout (see ChunkedUploader)
+        :return: Dict with 'summary' and per-chunk 'chunks' results
+        """
+        from bulk_import import ChunkedUploader
+        if not project_id:
+            raise ValueError("project_id is required.")
+        uploader = ChunkedUploader(self, f"/api/projects/{project_id}/import", checkpoint_path=checkpoint_path, **options)
+        return await uploader.run(tasks, on_chunk=on_chunk)
+
+    async def import_predictions_bulk(self, project_id, predictions, checkpoint_path=None, on_chunk=None, **options):
+        """
+        Create predictions for existing tasks in concurrent, individually retried chunks.
+        :param project_id: ID of the project the tasks belong to
+        :param predictions: Iterable of prediction dicts ({"task", "result", "score", "model_version"}; consumed lazily)
+        :param checkpoint_path: Optional JSON file; chunks recorded there are not re-uploaded
+        :param on_chunk: Optional callback invoked with each chunk result as it completes
+        :param options: chunk_size, max_chunk_bytes, concurrency, retries, timeout (see ChunkedUploader)
+        :return: Dict with 'summary' and per-chunk 'chunks' results
+        """
+        from bulk_import import ChunkedUploader
+        if not project_id:
+            raise ValueError("project_id is required.")
+        uploader = ChunkedUploader(self, f"/api/projects/{project_id}/import/predictions",
+                                   checkpoint_path=checkpoint_path, count_key='created', **options)
+        return await uploader.run(predictions, on_chunk=on_chunk)
+
+    async def list_tasks(self, project_id, **query_params):
+        """
+        List tasks for a given Label Studio project.
+        :param project_id: ID of the project to list tasks for
+        :param query_params: Optional query parameters (page, page_size, filters, etc.)
+        :return: API response as dict
+        """
+        if not project_id:
+            raise ValueError("project_id is required.")
+        endpoint = f"/api/projects/{project_id}/tasks/"
+        try:
+            return await self.get(endpoint, params=query_params)
+        except Exception as e:
+            raise RuntimeError(f"Listing tasks failed: {e}")
+
+    def _iter_all(self, endpoint, items_key, total_key, page_size, concurrency, fields, query_params):
+        from pagination import fetch_all
+        page_size = page_size or config.FETCH_PAGE_SIZE
+
+        async def fetch_page(page):
+            return await self.get(endpoint, params={**query_params, 'page': page, 'page_size': page_size})
+
+        return fetch_all(fetch_page, page_size, concurrency, items_key, total_key, fields)
+
+    def iter_all_tasks(self, project_id, page_size=None, concurrency=None, fields=None, **query_params):
+        """
+        Iterate over every task of a project, fetching pages concurrently but yielding in page order.
+        :param project_id: ID of the project to list tasks for
+        :param page_size: Tasks per page (default: LS_FETCH_PAGE_SIZE)
+        :param concurrency: Max pages in flight (default: LS_FETCH_CONCURRENCY)
+        :param fields: Optional list of task fields to keep; without annotations or predictions
+            among them, 'fields=task_only' is sent so Label Studio does not serialize them
+        :param query_params: Optional query parameters (filters, etc.)
+        :return: Async generator of task dicts
+        """
+        if not project_id:
+            raise ValueError("project_id is required.")
+        if fields and not TASK_RELATED_FIELDS & set(top_level_fields(fields)):
+            query_params.setdefault('fields', 'task_only')
+        return self._iter_all(f"/api/projects/{project_id}/tasks/", 'tasks', 'total', page_size, concurrency, fields, query_params)
+
+    def iter_all_projects(self, page_size=None, concurrency=None, fields=None, **query_params):
+        """
+        Iterate over every project. Selected fields are also pushed upstream via 'include'.
+        :return: Async generator of project dicts
+        """
+        if fields:
+            query_params.setdefault('include', ','.join(top_level_fields(fields)))
+        return self._iter_all('/api/projects/', 'results', 'count', page_size, concurrency, fields, query_params)
+
+    def iter_all_users(self, page_size=None, concurrency=None, fields=None, **query_params):
+        """
+        Iterate over every user.
+        :return: Async generator of user dicts
+        """
+        return self._iter_all('/api/users/', 'results', 'count', page_size, concurrency, fields, query_params)
+
+    async def export_annotations(self, project_id, **query_params):
+        """
+        Export annotations for a given Label Studio project.
+        :param project_id: ID of the project to export annotations from
+        :param query_params: Optional query parameters (exportType, etc.)
+        :return: Tuple (content, content_type)
+        """
+        if not project_id:
+            raise ValueError("project_id is required.")
+        url = f"{self.base_url}/api/projects/{project_id}/export"
+        endpoint = f"/api/projects/{project_id}/export"
+        await self._admit('GET', url)
+        start = time.perf_counter()
+        try:
+            async with self.client.stream('GET', url, params=self._encode_params(query_params)) as resp:
+                resp.raise_for_status()
+                content = await resp.aread()
+                content_type = resp.headers.get('Content-Type', '')
+        except httpx.HTTPError as e:
+            error = self._error('GET', url, e)
+            record_upstream('GET', endpoint, error.status_code or 'error', time.perf_counter() - start)
+            get_circuit_breaker().record(error)
+            raise RuntimeError(f"Exporting annotations failed: GET {url} failed: {e}")
+        record_upstream('GET', endpoint, resp.status_code, time.perf_counter() - start, 0, resp.num_bytes_downloaded)
+        get_circuit_breaker().record()
+        # For JSON, parse and return as object; for others, return raw content
+        if 'application/json' in content_type:
+            return loads(content), content_type
+        return content, content_type
+
+    async def export_annotations_to_file(self, project_id, path=None, compress=False, chunk_size=1 << 20, **query_params):
+        """
+        Stream a project export to a local file in chunks instead of holding it in memory.
+        :param project_id: ID of the project to export annotations from
+        :param path: Target file path (default: a timestamped file in LS_EXPORT_DIR)
+        :param compress: Gzip the file on the fly ('.gz' is appended to path if missing)
+        :param chunk_size: Bytes read from the response per chunk
+        :param query_params: Optional query parameters (exportType, etc.)
+        :return: Dict with path, content_type, bytes_received, file_size, sha256 (of the
+                 uncompressed export), record_count (None for binary formats) and elapsed_seconds
+        """
+        from export_store import count_records, default_export_path, export_extension
+        if not project_id:
+            raise ValueError("project_id is required.")
+        url = f"{self.base_url}/api/projects/{project_id}/export"
+        if path and compress and not path.endswith('.gz'):
+            path += '.gz'
+        start = asyncio.get_running_loop().time()
+        digest = hashlib.sha256()
+        received = 0
+        tmp_path = None
+        endpoint = f"/api/projects/{project_id}/export"
+        await self._admit('GET', url)
+        request_start = time.perf_counter()
+        try:
+            timeout = httpx.Timeout(self.timeout, read=config.EXPORT_TIMEOUT)
+            async with self.client.stream('GET', url, params=self._encode_params(query_params), timeout=timeout) as resp:
+                resp.raise_for_status()
+                content_type = resp.headers.get('Content-Type', '')
+                if not path:
+                    path = default_export_path(project_id, export_extension(content_type, query_params.get('exportType')), compress)
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                tmp_path = f"{path}.part"
+                with open(tmp_path, 'wb') as raw:
+                    out = gzip.GzipFile(fileobj=raw, mode='wb') if compress else raw
+                    async for chunk in resp.aiter_bytes(chunk_size):
+                        out.write(chunk)
+                        digest.update(chunk)
+                        received += len(chunk)
+                    if compress:
+                        out.close()
+            os.replace(tmp_path, path)
+        except httpx.HTTPError as e:
+            error = self._error('GET', url, e)
+            record_upstream('GET', endpoint, error.status_code or 'error', time.perf_counter() - request_start)
+            get_circuit_breaker().record(error)
+            raise RuntimeError(f"Exporting annotations failed: GET {url} failed: {e}")
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        record_upstream('GET', endpoint, resp.status_code, time.perf_counter() - request_start, 0, resp.num_bytes_downloaded)
+        get_circuit_breaker().record()
+        return {
+            "path": path,
+            "content_type": content_type,
+            "compressed": bool(compress),
+            "bytes_received": received,
+            "file_size": os.path.getsize(path),
+            "sha256": digest.hexdigest(),
+            # Counting is a second streaming pass over the file; keep it off the event loop
+            "record_count": await asyncio.to_thread(count_records, path),
+            "elapsed_seconds": round(asyncio.get_running_loop().time() - start, 3),
+        }
+
+_client = None
+_client_lock = threading.Lock()
+_async_client = None
+_async_client_loop = None
+
+def get_client():
+    """
+    Return the process-wide LabelStudioClient, creating it on first use.
+    Tools share this instance so they reuse one keep-alive connection pool
+    instead of opening a new TCP/TLS connection per call.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LabelStudioClient()
+    return _client
+
+def get_async_client():
+    """
+    Return the shared AsyncLabelStudioClient for the running event loop.
+    httpx connection pools are bound to the loop that created them, so a new
+    client is built if called from a different loop (e.g. successive asyncio.run calls).
+    """
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        _async_client = AsyncLabelStudioClient()
+        _async_client_loop = loop
+    return _async_client
+
 # Example usage (remove or comment out in production):
-# client = LabelStudioClient()
-# print(client.get('/api/projects/')) 
\ No newline at end of file
+# client = get_client()
+# print(client.get('/api/projects/'))
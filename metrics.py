@@ -0,0 +1,272 @@
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from config import config
+from json_codec import dumps
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+SIZE_BUCKETS = tuple(256 * 4 ** i for i in range(11))  # 256 B .. 256 MiB
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000, 10000)
+
+PROMETHEUS_PREFIX = 'label_studio_mcp_'
+
+# Response sizes stop being measured past this many bytes and are recorded as just above it
+RESPONSE_BYTES_CAP = 16 * 1024 * 1024
+
+_ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+def endpoint_template(endpoint):
+    """
+    Collapse numeric path segments so per-endpoint series stay bounded
+    (e.g. '/api/projects/42/tasks/' -> '/api/projects/{id}/tasks/').
+    """
+    return _ID_SEGMENT.sub('/{id}', endpoint.split('?', 1)[0])
+
+def _enabled():
+    try:
+        return config.METRICS_ENABLED
+    except ValueError:
+        # Invalid configuration: nothing reaches Label Studio, and tool errors must still be returned
+        return False
+
+class Histogram:
+    """
+    Fixed-bucket histogram. observe() is a bisect plus a few additions; quantiles are
+    estimated by linear interpolation inside the bucket that holds them.
+    """
+    __slots__ = ('bounds', 'counts', 'count', 'sum', 'min', 'max')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / n
+                return min(max(estimate, self.min), self.max)
+            seen += n
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6),
+            "min": round(self.min, 6),
+            "p50": round(self.quantile(0.5), 6),
+            "p90": round(self.quantile(0.9), 6),
+            "p99": round(self.quantile(0.99), 6),
+            "max": round(self.max, 6),
+        }
+
+class MetricsRegistry:
+    """
+    Process-wide counters and histograms keyed by metric name and label values.
+    A single lock keeps updates from the sync client's threads and the event loop consistent.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self.started_at = time.time()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, amount=1, **labels):
+        if not _enabled():
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        if not _enabled():
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started_at = time.time()
+
+    def snapshot(self):
+        """
+        JSON-friendly view: each metric maps to a list of {labels, value} or {labels, summary}.
+        """
+        with self._lock:
+            counters = list(self._counters.items())
+            histograms = [(key, h.summary()) for key, h in self._histograms.items()]
+        result = {"started_at": self.started_at, "uptime_seconds": round(time.time() - self.started_at, 3),
+                  "counters": {}, "histograms": {}}
+        for (name, labels), value in sorted(counters):
+            result["counters"].setdefault(name, []).append({"labels": dict(labels), "value": value})
+        for (name, labels), summary in sorted(histograms, key=lambda item: item[0]):
+            result["histograms"].setdefault(name, []).append({"labels": dict(labels), **summary})
+        return result
+
+    def to_prometheus(self):
+        """
+        Render all series in the Prometheus text exposition format.
+        """
+        def escape(value):
+            return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+        def fmt_labels(labels, extra=()):
+            pairs = [f'{k}="{escape(v)}"' for k, v in tuple(labels) + tuple(extra)]
+            return '{' + ','.join(pairs) + '}' if pairs else ''
+
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(((key, list(h.counts), h.bounds, h.sum, h.count) for key, h in self._histograms.items()),
+                                key=lambda item: item[0])
+        typed = set()
+        for (name, labels), value in counters:
+            full = PROMETHEUS_PREFIX + name
+            if full not in typed:
+                lines.append(f"# TYPE {full} counter")
+                typed.add(full)
+            lines.append(f"{full}{fmt_labels(labels)} {value}")
+        for (name, labels), counts, bounds, total, count in histograms:
+            full = PROMETHEUS_PREFIX + name
+            if full not in typed:
+                lines.append(f"# TYPE {full} histogram")
+                typed.add(full)
+            cumulative = 0
+            for bound, n in zip(tuple(bounds) + ('+Inf',), counts):
+                cumulative += n
+                lines.append(f"{full}_bucket{fmt_labels(labels, (('le', bound),))} {cumulative}")
+            lines.append(f"{full}_sum{fmt_labels(labels)} {total}")
+            lines.append(f"{full}_count{fmt_labels(labels)} {count}")
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path, format=None):
+        """
+        Write the metrics to a local file. format is 'json' or 'prometheus'
+        (default: prometheus for .prom/.txt paths, json otherwise).
+        :return: Dict with 'path', 'format' and 'bytes_written'
+        """
+        if format is None:
+            format = 'prometheus' if path.endswith(('.prom', '.txt')) else 'json'
+        if format not in ('json', 'prometheus'):
+            raise ValueError("format must be 'json' or 'prometheus'.")
+        text = self.to_prometheus() if format == 'prometheus' else json.dumps(self.snapshot(), indent=2)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+        return {"path": path, "format": format, "bytes_written": len(text.encode('utf-8'))}
+
+_registry = MetricsRegistry()
+
+def get_metrics():
+    return _registry
+
+# Upstream time accumulated by the tool call currently running in this context.
+# asyncio tasks spawned by a tool copy the context, so they add to the same scope.
+_tool_scope = contextvars.ContextVar('tool_scope', default=None)
+
+class _ToolScope:
+    __slots__ = ('upstream_seconds', 'upstream_requests')
+
+    def __init__(self):
+        self.upstream_seconds = 0.0
+        self.upstream_requests = 0
+
+def start_tool_scope():
+    scope = _ToolScope()
+    return scope, _tool_scope.set(scope)
+
+def end_tool_scope(token):
+    _tool_scope.reset(token)
+
+def record_upstream(method, endpoint, status, elapsed, request_bytes=0, response_bytes=0):
+    """
+    Record one upstream HTTP attempt (status is the HTTP status or 'error').
+    """
+    endpoint = endpoint_template(endpoint)
+    _registry.observe('upstream_request_duration_seconds', elapsed, method=method, endpoint=endpoint)
+    _registry.inc('upstream_requests_total', method=method, endpoint=endpoint, status=str(status))
+    if request_bytes:
+        _registry.observe('upstream_request_bytes', request_bytes, SIZE_BUCKETS, method=method, endpoint=endpoint)
+    if response_bytes:
+        _registry.observe('upstream_response_bytes', response_bytes, SIZE_BUCKETS, method=method, endpoint=endpoint)
+    scope = _tool_scope.get()
+    if scope is not None:
+        scope.upstream_seconds += elapsed
+        scope.upstream_requests += 1
+
+def response_size(response, cap=RESPONSE_BYTES_CAP):
+    """
+    Serialized size of a tool response, encoded with json_codec. Items of the top-level lists
+    are encoded one at a time so a huge response costs at most about `cap` bytes of encoding.
+    :return: Size in bytes, or cap + 1 if the response is larger than cap
+    """
+    if not isinstance(response, dict):
+        return min(len(dumps(response)), cap + 1)
+    size = 2 + max(len(response) - 1, 0)
+    for key, value in response.items():
+        size += len(dumps(str(key))) + 1
+        if isinstance(value, list):
+            size += 2 + max(len(value) - 1, 0)
+            for item in value:
+                size += len(dumps(item))
+                if size > cap:
+                    return cap + 1
+        else:
+            size += len(dumps(value))
+        if size > cap:
+            return cap + 1
+    return size
+
+def record_tool(tool, elapsed, scope, status, response=None):
+    """
+    Record one tool call: wall time, upstream time spent inside it and response size.
+    """
+    _registry.observe('tool_duration_seconds', elapsed, tool=tool)
+    _registry.inc('tool_calls_total', tool=tool, status=status)
+    if scope.upstream_requests:
+        _registry.observe('tool_upstream_seconds', scope.upstream_seconds, tool=tool)
+        _registry.observe('tool_upstream_requests', scope.upstream_requests, COUNT_BUCKETS, tool=tool)
+    if response is not None and _enabled() and config.METRICS_RESPONSE_BYTES:
+        try:
+            size = response_size(response)
+        except (TypeError, ValueError):
+            return
+        _registry.observe('tool_response_bytes', size, SIZE_BUCKETS, tool=tool)
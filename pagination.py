@@ -0,0 +1,127 @@
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from config import config
+from export_store import resolve_local_path
+from label_studio_client import LabelStudioAPIError
+from response_shaping import field_selector, shape_response
+
+def split_page(payload, items_key, total_key):
+    """
+    Return (items, total) from a paginated response. Plain list responses have no total.
+    """
+    if isinstance(payload, list):
+        return payload, None
+    return payload.get(items_key) or [], payload.get(total_key)
+
+def _page_key(items):
+    """
+    Cheap fingerprint of a page, used to notice an upstream that ignores the page number.
+    """
+    return len(items), json.dumps([items[0], items[-1]], sort_keys=True, default=str)
+
+async def fetch_all(fetch_page, page_size, concurrency=None, items_key='results', total_key='count', fields=None):
+    """
+    Yield every item of a paginated endpoint in page order, fetching pages concurrently.
+    The first page is fetched alone. Its actual length (the upstream may cap page_size) and
+    the total give the page count; the remaining pages are fetched through a sliding window
+    of at most `concurrency` requests, so memory is bounded by the window rather than the
+    result size. Without a total, pages are fetched speculatively, starting with one page in
+    flight and doubling while pages come back full, until an empty or short page, a 404, or
+    a page identical to the previous one (an endpoint that ignores 'page') marks the end.
+    :param fetch_page: Coroutine function taking a 1-based page number and returning the response
+    :param page_size: Items per page requested upstream
+    :param concurrency: Max pages in flight (default: LS_FETCH_CONCURRENCY)
+    :param items_key: Response key holding the page items
+    :param total_key: Response key holding the total item count
+    :param fields: Optional list of item fields to keep (dotted paths select nested fields)
+    :return: Async generator of items
+    :raises LabelStudioAPIError: if the upstream reports a total but keeps returning the same page
+    """
+    concurrency = concurrency or config.FETCH_CONCURRENCY
+    if page_size < 1 or concurrency < 1:
+        raise ValueError("page_size and concurrency must be at least 1.")
+    select = field_selector(fields)
+    items, total = split_page(await fetch_page(1), items_key, total_key)
+    for item in items:
+        yield select(item)
+    if not items or (total is not None and total <= len(items)):
+        return
+    served_size = len(items)
+    last_page = math.ceil(total / served_size) if total is not None else None
+    # Without a total every page past the end is a wasted request: grow the window gradually
+    limit = concurrency if last_page is not None else 1
+    previous = _page_key(items)
+    yielded = len(items)
+    next_page = 2
+    window = deque()
+
+    def schedule():
+        nonlocal next_page
+        while len(window) < limit and (last_page is None or next_page <= last_page):
+            window.append(asyncio.ensure_future(fetch_page(next_page)))
+            next_page += 1
+
+    try:
+        schedule()
+        while window:
+            try:
+                payload = await window.popleft()
+            except LabelStudioAPIError as e:
+                if last_page is None and e.status_code == 404:
+                    break
+                raise
+            items, _ = split_page(payload, items_key, total_key)
+            if not items:
+                break
+            key = _page_key(items)
+            if key == previous:
+                if last_page is None:
+                    break
+                raise LabelStudioAPIError(
+                    f"Pagination stopped after {yielded} of {total} items: the upstream returned the same "
+                    f"page twice, so it does not honor the 'page' parameter."
+                )
+            previous = key
+            for item in items:
+                yield select(item)
+            yielded += len(items)
+            if last_page is None:
+                if len(items) < served_size:
+                    break
+                limit = min(limit * 2, concurrency)
+            schedule()
+    finally:
+        for pending in window:
+            pending.cancel()
+
+async def collect(items, output_path=None, max_bytes=None):
+    """
+    Drain an async item generator into a list, or into a JSONL file if output_path is given.
+    In-memory results larger than max_bytes (default: LS_RESPONSE_MAX_BYTES) are cut and
+    marked 'truncated'; output_path has no size limit but must be inside LS_EXPORT_DIR.
+    :return: Dict with 'count', 'elapsed_seconds' and either 'items' or 'path'/'bytes_written'
+    """
+    start = time.perf_counter()
+    if output_path is None:
+        result = [item async for item in items]
+        response = {"items": result, "count": len(result), "elapsed_seconds": round(time.perf_counter() - start, 3)}
+        return shape_response(response, items_key="items", max_bytes=max_bytes,
+                              hint="Pass output_path to write every item to a local JSONL file.")
+    output_path = resolve_local_path(output_path)
+    count = 0
+    written = 0
+    with open(output_path, 'wb') as f:
+        async for item in items:
+            line = json.dumps(item, separators=(',', ':')).encode('utf-8') + b'\n'
+            f.write(line)
+            written += len(line)
+            count += 1
+    return {
+        "path": output_path,
+        "count": count,
+        "bytes_written": written,
+        "elapsed_seconds": round(time.perf_counter() - start, 3),
+    }
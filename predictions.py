@@ -0,0 +1,218 @@
+import itertools
+from collections import Counter
+from import_filter import MAX_REJECTION_SAMPLES
+from label_config import project_label_config
+
+# Controls a (task_id, label, score) row can target, with the key of their result value
+CLASSIFICATION_CONTROLS = {'Choices': 'choices', 'Taxonomy': 'taxonomy'}
+
+# Distinct single labels whose converted result is kept for reuse
+_MAX_CACHED_RESULTS = 4096
+
+def iter_column_records(task_ids, labels, scores=None):
+    """
+    Zip compact column arrays into prediction rows, one row at a time.
+    :param task_ids: List of task ids
+    :param labels: List with one label (or list of labels) per task id
+    :param scores: Optional list with one score per task id
+    :return: Generator of {"task_id", "label", "score"} rows
+    """
+    if not isinstance(task_ids, list) or not task_ids:
+        raise ValueError("task_ids must be a non-empty list.")
+    if not isinstance(labels, list) or len(labels) != len(task_ids):
+        raise ValueError("labels must be a list with one entry per task id.")
+    if scores is not None and (not isinstance(scores, list) or len(scores) != len(task_ids)):
+        raise ValueError("scores must be a list with one entry per task id.")
+    for task_id, label, score in zip(task_ids, labels, scores if scores is not None else itertools.repeat(None)):
+        yield {"task_id": task_id, "label": label, "score": score}
+
+def classification_controls(model):
+    """
+    Names of the controls of a LabelConfig that compact label rows can target.
+    """
+    return [name for name, control in model.controls.items()
+            if control["tag"] in CLASSIFICATION_CONTROLS and control["to_name"]]
+
+class _Rejected(Exception):
+    pass
+
+class PredictionBuilder:
+    """
+    Streaming conversion of prediction rows into Label Studio predictions.
+    A row names its task with 'task_id' (or 'task') and carries either a 'label' (a string,
+    or a list for multi-choice / a taxonomy path) for the classification control, or a
+    ready-made 'result' list, which is passed through. 'score' and 'model_version' are optional.
+    Rows that cannot be converted are counted and skipped rather than failing the upload.
+    :param model: LabelConfig of the project (None if it has no config: only 'result' rows are accepted)
+    :param from_name: Control the labels are for (default: the config's only Choices/Taxonomy control)
+    :param model_version: model_version of every prediction (rows can override it)
+    """
+    def __init__(self, model=None, from_name=None, model_version=None):
+        self.model_version = model_version
+        self.control = None
+        self.labels = None
+        self.rows_read = 0
+        self.converted = 0
+        self.rejected = 0
+        self.reasons = Counter()
+        self.unknown_labels = Counter()
+        self.rejections = []
+        self._results = {}
+        self._candidates = classification_controls(model) if model is not None else []
+        if from_name is not None:
+            if model is None or from_name not in model.controls:
+                raise ValueError(f"Control '{from_name}' is not defined in the project's label config.")
+            if from_name not in self._candidates:
+                raise ValueError(
+                    f"Control '{from_name}' is a <{model.controls[from_name]['tag']}>; label rows need a "
+                    f"{' or '.join(CLASSIFICATION_CONTROLS)} control. Send 'result' rows for other controls."
+                )
+            self._candidates = [from_name]
+        if len(self._candidates) == 1:
+            self.control = model.controls[self._candidates[0]]
+            self.value_key = CLASSIFICATION_CONTROLS[self.control["tag"]]
+            self.labels = frozenset(self.control.get("labels") or ()) or None
+
+    def require_control(self):
+        """
+        Raise ValueError unless label rows have a control to target (the config's only
+        Choices/Taxonomy control, or from_name).
+        """
+        if self.control is not None:
+            return
+        if not self._candidates:
+            raise ValueError("The project's label config has no Choices or Taxonomy control for label rows; "
+                             "send rows with a 'result' list instead.")
+        raise ValueError(f"The label config has several classification controls ({', '.join(self._candidates)}); "
+                         "pass from_name to choose one.")
+
+    def _check_labels(self, labels):
+        if self.labels is None:
+            return
+        unknown = [label for label in labels if label not in self.labels]
+        if unknown:
+            self.unknown_labels.update(unknown)
+            raise _Rejected('unknown_label')
+
+    def _label_result(self, label):
+        """
+        Result list of a label row. Rows with the same single label share one list: it is
+        only serialized, never modified, so a large upload builds one result per label.
+        """
+        if isinstance(label, str):
+            cached = self._results.get(label)
+            if cached is not None:
+                return cached
+        if self.control is None:
+            raise _Rejected('no_label_control')
+        result = [{
+            "from_name": self.control["name"],
+            "to_name": self.control["to_name"][0],
+            "type": self.control["tag"].lower(),
+            "value": self._value(label),
+        }]
+        if isinstance(label, str) and len(self._results) < _MAX_CACHED_RESULTS:
+            self._results[label] = result
+        return result
+
+    def _value(self, label):
+        if isinstance(label, str):
+            self._check_labels([label])
+            labels = [label]
+        elif isinstance(label, list) and label and all(isinstance(item, str) for item in label):
+            self._check_labels(label)
+            labels = label
+        else:
+            raise _Rejected('invalid_label')
+        # A taxonomy value is a list of paths; a list label is one path
+        return {self.value_key: [labels] if self.value_key == 'taxonomy' else labels}
+
+    def build(self, row):
+        """
+        :return: Prediction dict for one row
+        :raises _Rejected: if the row cannot be converted
+        """
+        if not isinstance(row, dict):
+            raise _Rejected('not_an_object')
+        task_id = row.get('task_id')
+        if task_id is None:
+            task_id = row.get('task')
+        if type(task_id) is not int:
+            try:
+                task_id = int(task_id)
+            except (TypeError, ValueError):
+                raise _Rejected('invalid_task_id')
+        result = row.get('result')
+        if result is not None:
+            if not isinstance(result, list):
+                raise _Rejected('invalid_result')
+        else:
+            label = row.get('label')
+            if label is None or label == '':
+                raise _Rejected('missing_label')
+            result = self._label_result(label)
+        prediction = {"task": task_id, "result": result}
+        score = row.get('score')
+        if score is not None and score != '':
+            try:
+                prediction["score"] = float(score)
+            except (TypeError, ValueError):
+                raise _Rejected('invalid_score')
+        model_version = row.get('model_version') or self.model_version
+        if model_version:
+            prediction["model_version"] = str(model_version)
+        return prediction
+
+    def check_rows(self, rows):
+        """
+        Check the first row before anything is uploaded: if it is a label row, the builder
+        must have a control for it (see require_control). Later label rows without one are
+        rejected as 'no_label_control' instead of failing a partly imported upload.
+        :return: Iterator over the same rows, first row included
+        """
+        rows = iter(rows)
+        for first in rows:
+            if isinstance(first, dict) and first.get('result') is None:
+                self.require_control()
+            return itertools.chain((first,), rows)
+        return iter(())
+
+    def convert(self, rows):
+        """
+        Yield the predictions of the rows that convert, in order.
+        """
+        for index, row in enumerate(rows):
+            self.rows_read += 1
+            try:
+                prediction = self.build(row)
+            except _Rejected as e:
+                reason = str(e)
+                self.rejected += 1
+                self.reasons[reason] += 1
+                if len(self.rejections) < MAX_REJECTION_SAMPLES:
+                    sample = {"row": index, "reason": reason}
+                    if isinstance(row, dict) and row.get('label') is not None:
+                        sample["label"] = row.get('label')
+                    self.rejections.append(sample)
+                continue
+            self.converted += 1
+            yield prediction
+
+    def stats(self):
+        return {
+            "from_name": self.control["name"] if self.control else None,
+            "to_name": self.control["to_name"][0] if self.control else None,
+            "rows_read": self.rows_read,
+            "converted": self.converted,
+            "rejected": self.rejected,
+            "reasons": dict(self.reasons.most_common()),
+            "unknown_labels": dict(self.unknown_labels.most_common(MAX_REJECTION_SAMPLES)),
+            "rejections": self.rejections,
+        }
+
+async def build_prediction_builder(project_id, from_name=None, model_version=None):
+    """
+    Build the PredictionBuilder of a project from its label config, fetched through the
+    project cache and parsed with the cached label_config model.
+    """
+    return PredictionBuilder(await project_label_config(project_id), from_name, model_version)
@@ -0,0 +1,186 @@
+import asyncio
+import time
+from collections import OrderedDict
+from config import config
+from label_studio_client import get_async_client
+from metrics import get_metrics
+
+PROGRESS_FIELDS = [
+    "task_number",
+    "finished_task_number",
+    "total_annotations_number",
+    "total_predictions_number",
+    "num_tasks_with_annotations",
+    "useful_annotation_number",
+    "ground_truth_number",
+    "skipped_annotations_number",
+    "queue_total",
+    "queue_done",
+    "overlap_cohort_percentage",
+]
+
+# Field group -> project payload keys it covers (None = the whole payload)
+FIELD_GROUPS = {
+    "detail": None,
+    "config": ("label_config",),
+    "guidelines": ("expert_instruction",),
+    "progress": tuple(PROGRESS_FIELDS),
+}
+
+class _Entry:
+    __slots__ = ("payload", "stamps")
+
+    def __init__(self, payload, fetched_at):
+        self.payload = payload
+        # One fetch refreshes every group; invalidation expires groups individually
+        self.stamps = {group: fetched_at for group in FIELD_GROUPS}
+
+class ProjectCache:
+    """
+    In-process LRU cache of /api/projects/{id}/ payloads with a TTL per field group.
+    Label configs and guidelines change rarely and stay fresh for a long time, while
+    progress counters expire quickly. Concurrent misses for the same project share a
+    single upstream request.
+    :param max_entries: Max projects kept before the least recently used is evicted
+    :param ttls: Dict of field group -> TTL in seconds
+    """
+    def __init__(self, max_entries, ttls):
+        self.max_entries = max_entries
+        self.ttls = dict(ttls)
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._stats = {group: {"hits": 0, "misses": 0} for group in FIELD_GROUPS}
+        self._evictions = 0
+        self._invalidations = 0
+
+    def _fresh(self, entry, group):
+        stamp = entry.stamps.get(group)
+        return stamp is not None and time.monotonic() - stamp < self.ttls[group]
+
+    def _store(self, project_id, payload):
+        self._entries[project_id] = _Entry(payload, time.monotonic())
+        self._entries.move_to_end(project_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    async def get(self, project_id, group, fetch):
+        """
+        Return the project payload, fetching it if the requested field group is stale.
+        :param project_id: Project ID
+        :param group: Field group the caller needs (see FIELD_GROUPS)
+        :param fetch: Coroutine function fetching the payload for project_id
+        :return: Project payload as dict
+        """
+        if group not in FIELD_GROUPS:
+            raise ValueError(f"Unknown project field group: {group}")
+        project_id = str(project_id)
+        entry = self._entries.get(project_id)
+        if entry is not None and self._fresh(entry, group):
+            self._entries.move_to_end(project_id)
+            self._stats[group]["hits"] += 1
+            get_metrics().inc('project_cache_requests_total', group=group, result='hit')
+            return entry.payload
+        self._stats[group]["misses"] += 1
+        get_metrics().inc('project_cache_requests_total', group=group, result='miss')
+        inflight = self._inflight.get(project_id)
+        if inflight is None:
+            inflight = asyncio.ensure_future(fetch(project_id))
+            self._inflight[project_id] = inflight
+            try:
+                payload = await asyncio.shield(inflight)
+                # Skip the store if the entry was invalidated while the fetch was in flight
+                if self._inflight.get(project_id) is inflight:
+                    self._store(project_id, payload)
+                return payload
+            finally:
+                if self._inflight.get(project_id) is inflight:
+                    del self._inflight[project_id]
+        return await asyncio.shield(inflight)
+
+    def invalidate(self, project_id, groups=None):
+        """
+        Expire cached field groups for a project, or drop the entry entirely.
+        :param project_id: Project ID
+        :param groups: Iterable of field groups to expire (None = the whole entry)
+        """
+        project_id = str(project_id)
+        self._invalidations += 1
+        self._inflight.pop(project_id, None)
+        if groups is None:
+            self._entries.pop(project_id, None)
+            return
+        entry = self._entries.get(project_id)
+        if entry is not None:
+            for group in groups:
+                entry.stamps.pop(group, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        """
+        Return hit/miss counters per field group plus size and eviction totals.
+        """
+        groups = {}
+        for group, counts in self._stats.items():
+            total = counts["hits"] + counts["misses"]
+            groups[group] = {
+                **counts,
+                "hit_ratio": round(counts["hits"] / total, 4) if total else None,
+                "ttl_seconds": self.ttls[group],
+            }
+        return {
+            "enabled": config.CACHE_ENABLED,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self._evictions,
+            "invalidations": self._invalidations,
+            "groups": groups,
+        }
+
+_project_cache = None
+
+def get_project_cache():
+    """
+    Return the process-wide ProjectCache, creating it on first use.
+    """
+    global _project_cache
+    if _project_cache is None:
+        _project_cache = ProjectCache(
+            max_entries=config.CACHE_MAX_PROJECTS,
+            ttls={
+                "detail": config.CACHE_DETAIL_TTL,
+                "config": config.CACHE_CONFIG_TTL,
+                "guidelines": config.CACHE_GUIDELINES_TTL,
+                "progress": config.CACHE_PROGRESS_TTL,
+            },
+        )
+    return _project_cache
+
+async def _fetch_project(project_id):
+    client = get_async_client()
+    return await client.get(f"/api/projects/{project_id}/")
+
+async def fetch_project(project_id, group="detail"):
+    """
+    Fetch a project's details through the shared cache.
+    :param project_id: Project ID
+    :param group: Field group the caller needs; decides which TTL applies
+    :return: Project payload as dict
+    """
+    if not config.CACHE_ENABLED:
+        return await _fetch_project(project_id)
+    return await get_project_cache().get(project_id, group, _fetch_project)
+
+def project_progress(project):
+    """
+    Progress counters of a project payload, or None if it has none.
+    """
+    return {k: project[k] for k in PROGRESS_FIELDS if k in project} or None
+
+def invalidate_project(project_id, groups=None):
+    """
+    Expire cached field groups after a write (None = drop the whole entry).
+    """
+    get_project_cache().invalidate(project_id, groups)
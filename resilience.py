@@ -0,0 +1,183 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from config import config
+
+# Methods that can be repeated without changing the result upstream
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header (delta seconds or HTTP date) into seconds, or None.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+def backoff_delay(attempt, retry_after=None, base=None, max_delay=None):
+    """
+    Seconds to wait before retry number `attempt` (1-based): the upstream Retry-After
+    when given, otherwise exponential backoff with +/-50% jitter. Capped at max_delay.
+    """
+    base = config.RETRY_BACKOFF if base is None else base
+    max_delay = config.RETRY_MAX_DELAY if max_delay is None else max_delay
+    if retry_after is not None:
+        return min(max_delay, retry_after)
+    # Cap after the jitter so no delay exceeds max_delay
+    return min(max_delay, base * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+
+def should_retry(method, error, attempt, retries):
+    """
+    Decide whether a failed request is retried. Idempotent requests are retried on
+    transport errors, 429 and 5xx; other methods only on 429, which Label Studio
+    returns before doing any work.
+    """
+    if attempt > retries or not error.retryable:
+        return False
+    return method.upper() in IDEMPOTENT_METHODS or error.status_code == 429
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by the sync and async clients.
+    acquire() reserves a token and returns how long the caller must wait for it, so
+    sync callers can time.sleep() and async callers can asyncio.sleep() on the same bucket.
+    :param rate: Tokens added per second (<= 0 disables limiting)
+    :param burst: Bucket capacity
+    """
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.rate > 0
+
+    def acquire(self):
+        """
+        Reserve one token. :return: Seconds to wait before sending (0.0 if a token was available)
+        """
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1.0
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+class CircuitBreaker:
+    """
+    Fail fast while Label Studio is down.
+    After `failure_threshold` consecutive upstream failures (transport errors or 5xx) the
+    circuit opens and requests are rejected without touching the network. After
+    `reset_timeout` seconds one probe request is let through; its outcome closes or
+    re-opens the circuit.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.failure_threshold > 0
+
+    def check(self):
+        """
+        :return: None if the request may proceed, else seconds until the next probe is allowed
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self.state == self.CLOSED:
+                return None
+            now = time.monotonic()
+            if self.state == self.OPEN:
+                remaining = self.opened_at + self.reset_timeout - now
+                if remaining > 0:
+                    return remaining
+                self.state = self.HALF_OPEN
+                self.probe_started_at = None
+            # Half open: a single probe at a time; a lost probe expires after reset_timeout
+            if self.probe_started_at is not None and now - self.probe_started_at < self.reset_timeout:
+                return self.probe_started_at + self.reset_timeout - now
+            self.probe_started_at = now
+            return None
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.probe_started_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.probe_started_at = None
+
+    def record(self, error=None):
+        """
+        Record a request outcome. Only transport errors and 5xx count as failures;
+        4xx (including 429) means the upstream is up.
+        """
+        if not self.enabled:
+            return
+        if error is not None and (error.status_code is None or error.status_code >= 500):
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def stats(self):
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures}
+
+_rate_limiter = None
+_circuit_breaker = None
+_lock = threading.Lock()
+
+def get_rate_limiter():
+    """
+    Return the process-wide TokenBucket (LS_RATE_LIMIT / LS_RATE_BURST).
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _lock:
+            if _rate_limiter is None:
+                _rate_limiter = TokenBucket(config.RATE_LIMIT, config.RATE_BURST)
+    return _rate_limiter
+
+def get_circuit_breaker():
+    """
+    Return the process-wide CircuitBreaker (LS_CIRCUIT_FAILURES / LS_CIRCUIT_RESET).
+    """
+    global _circuit_breaker
+    if _circuit_breaker is None:
+        with _lock:
+            if _circuit_breaker is None:
+                _circuit_breaker = CircuitBreaker(config.CIRCUIT_FAILURES, config.CIRCUIT_RESET)
+    return _circuit_breaker
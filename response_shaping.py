@@ -0,0 +1,200 @@
+import base64
+import binascii
+import json
+from config import config
+from json_codec import dumps
+
+# Marker appended to shortened strings
+_ELLIPSIS = '...[truncated]'
+
+def _field_tree(fields):
+    """
+    Turn dotted field paths into a nested selection tree ({'data': {'text': None}, 'id': None}).
+    A None leaf keeps the whole value; selecting a parent wins over its children.
+    """
+    tree = {}
+    for field in fields:
+        node = tree
+        parts = [p for p in field.split('.') if p]
+        for i, part in enumerate(parts):
+            if i == len(parts) - 1:
+                node[part] = None
+            elif node.get(part, {}) is None:
+                break
+            else:
+                node = node.setdefault(part, {})
+    return tree
+
+def _select(value, tree):
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [_select(v, tree) for v in value]
+    if not isinstance(value, dict):
+        return value
+    return {k: _select(value[k], sub) for k, sub in tree.items() if k in value}
+
+def field_selector(fields):
+    """
+    Build a function keeping only the selected fields of an item. Fields are top-level keys
+    or dotted paths into nested objects (e.g. 'data.text'); lists are selected element-wise.
+    With no fields the item is returned unchanged.
+    """
+    if not fields:
+        return lambda item: item
+    tree = _field_tree(fields)
+    return lambda item: _select(item, tree) if isinstance(item, dict) else item
+
+def select_fields(item, fields):
+    return field_selector(fields)(item)
+
+def top_level_fields(fields):
+    """
+    Top-level keys named by a list of (possibly dotted) field paths, in order.
+    """
+    return list(dict.fromkeys(f.split('.', 1)[0] for f in fields or () if f))
+
+def encode_cursor(state):
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(',', ':')).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    Decode a continuation cursor returned in 'next_cursor'.
+    """
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, binascii.Error):
+        raise ValueError("Invalid cursor.")
+    if not isinstance(state, dict) or not isinstance(state.get('offset', 0), int) or state.get('offset', 0) < 0:
+        raise ValueError("Invalid cursor.")
+    return state
+
+def response_budget(max_bytes=None):
+    """
+    Resolve a tool's max_bytes argument against LS_RESPONSE_MAX_BYTES (0 = unlimited).
+    """
+    max_bytes = config.RESPONSE_MAX_BYTES if max_bytes is None else max_bytes
+    if max_bytes < 0:
+        raise ValueError("max_bytes cannot be negative.")
+    return max_bytes
+
+def _shrink(value, keep):
+    """
+    Reduce a value to roughly `keep` serialized bytes.
+    """
+    if isinstance(value, str):
+        # A character can take up to four UTF-8 bytes, so cut the encoded text, not the string,
+        # dropping a character split at the cut
+        budget = max(0, keep - len(_ELLIPSIS) - 2)
+        text = value.encode('utf-8')[:budget].decode('utf-8', errors='ignore')
+        # JSON escapes (quotes, control characters) can still push the serialized text over
+        overflow = len(dumps(text)) - 2 - budget
+        while overflow > 0:
+            text = text[:len(text) - overflow]
+            overflow = len(dumps(text)) - 2 - budget
+        return text + _ELLIPSIS
+    if isinstance(value, list):
+        kept, size = [], 2
+        for element in value:
+            element_size = len(dumps(element)) + 1
+            if size + element_size > keep:
+                break
+            kept.append(element)
+            size += element_size
+        return {"items": kept, "total_items": len(value)}
+    return {"omitted_keys": list(value)[:50], "key_count": len(value)}
+
+def summarize_object(obj, max_bytes):
+    """
+    Fit a dict into max_bytes by shortening its largest fields first.
+    Shortened fields are listed in '_truncated_fields' with their original size, so the
+    caller can request them explicitly via 'fields'.
+    :return: Tuple (object, original_bytes)
+    """
+    sizes = {k: len(dumps(v)) + len(dumps(k)) + 2 for k, v in obj.items()}
+    original = sum(sizes.values()) + 1
+    total = original
+    result = dict(obj)
+    truncated = {}
+    # Leave room for the '_truncated_fields' entry itself
+    target = max(0, max_bytes - 64 - 32 * min(len(obj), 20))
+    for key in sorted(sizes, key=sizes.get, reverse=True):
+        if total <= target:
+            break
+        if not isinstance(obj[key], (str, list, dict)):
+            continue
+        keep = max(0, sizes[key] - (total - target))
+        result[key] = _shrink(obj[key], keep)
+        total += len(dumps(result[key])) + len(dumps(key)) + 2 - sizes[key]
+        truncated[key] = sizes[key]
+    if truncated:
+        result["_truncated_fields"] = truncated
+    return result, original
+
+def shape_response(payload, fields=None, items_key=None, max_bytes=None, offset=0, cursor_state=None, hint=None):
+    """
+    Trim a tool response before it is serialized.
+    Fields are selected on each item of payload[items_key] (or on the payload itself),
+    items before `offset` are skipped, and if the result exceeds the byte budget the item
+    list is cut and a 'next_cursor' is returned that resumes at the first omitted item.
+    Single objects over budget are summarized with summarize_object().
+    :param payload: Upstream response (dict, or a plain list of items, which is wrapped
+        as {'results', 'count'} only when it has to be truncated)
+    :param fields: Optional list of fields to keep (dotted paths allowed)
+    :param items_key: Key of the item list in payload (None for single objects)
+    :param max_bytes: Byte budget (default: LS_RESPONSE_MAX_BYTES, 0 = unlimited)
+    :param offset: Items of payload[items_key] to skip (from a decoded cursor)
+    :param cursor_state: State stored in the continuation cursor (e.g. the upstream page);
+        None when the response cannot be resumed, in which case only 'hint' is returned
+    :param hint: Optional advice returned with a truncated response
+    :return: Shaped response dict
+    """
+    max_bytes = response_budget(max_bytes)
+    select = field_selector(fields)
+    bare_list = isinstance(payload, list)
+    if bare_list:
+        payload, items_key = {"results": payload, "count": len(payload)}, "results"
+    if items_key is None or not isinstance(payload.get(items_key), list):
+        shaped = select(payload)
+        if max_bytes and isinstance(shaped, dict) and len(dumps(shaped)) > max_bytes:
+            shaped, original = summarize_object(shaped, max_bytes)
+            shaped["truncated"] = {"original_bytes": original, "max_bytes": max_bytes}
+        return shaped
+    items = payload[items_key]
+    selected = [select(item) for item in items[offset:]]
+    shaped = {**payload, items_key: selected}
+    if not max_bytes:
+        return selected if bare_list else shaped
+    envelope = len(dumps({**payload, items_key: []})) + 256
+    sizes = [len(dumps(item)) + 1 for item in selected]
+    total = envelope + sum(sizes)
+    if total <= max_bytes:
+        # Plain list responses keep their shape unless they have to be cut
+        return selected if bare_list else shaped
+    kept, used = 0, envelope
+    for size in sizes:
+        if used + size > max_bytes:
+            break
+        used += size
+        kept += 1
+    if kept == 0 and selected:
+        # A single oversized item is summarized rather than dropped
+        first = selected[0]
+        if isinstance(first, dict):
+            first, _ = summarize_object(first, max(0, max_bytes - envelope))
+        shaped[items_key] = [first]
+        kept = 1
+    else:
+        shaped[items_key] = selected[:kept]
+    remaining = len(selected) - kept
+    shaped["truncated"] = {
+        "original_bytes": total,
+        "max_bytes": max_bytes,
+        "returned_items": kept,
+        "omitted_items": remaining,
+    }
+    if hint:
+        shaped["truncated"]["hint"] = hint
+    if cursor_state is not None:
+        shaped["next_cursor"] = encode_cursor({**cursor_state, "offset": offset + kept}) if remaining else None
+    return shaped
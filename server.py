@@ -1,18 +1,30 @@
 from mcp_instance import mcp
+# Tool modules import their dependencies on first call, so importing them only registers the tools
 from tools.project import *
 from tools.task import *
 from tools.user import *
 from tools.analytics import *
-from label_studio_client import LabelStudioClient
+from tools.mirror import *
+from tools.diagnostics import *
 
 if __name__ == "__main__":
-    # Verify Label Studio connection before starting the server
+    import sys
+    from config import config
+    from health import get_health_monitor
     try:
-        client = LabelStudioClient()
-        client.verify_connection()
-        print("Label Studio connection verified. Starting MCP server...")
-    except Exception as e:
-        import sys
-        print(f"[ERROR] {e}", file=sys.stderr)
-        sys.exit(1)
-    mcp.run() 
\ No newline at end of file
+        startup_check = config.STARTUP_CHECK
+    except ValueError as e:
+        # Serve anyway so the client sees the problem through the health tool and tool errors
+        print(f"[WARNING] {e}", file=sys.stderr)
+        startup_check = 'off'
+    monitor = get_health_monitor()
+    if startup_check == 'blocking':
+        # Verify Label Studio connection before starting the server
+        result = monitor.check()
+        if result["status"] != 'ok':
+            print(f"[ERROR] Label Studio connection verification failed: {result['error']}", file=sys.stderr)
+            sys.exit(1)
+        print("Label Studio connection verified. Starting MCP server...", file=sys.stderr)
+    if startup_check != 'off':
+        monitor.start()
+    mcp.run()
@@ -0,0 +1,394 @@
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from config import config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    project_id INTEGER NOT NULL,
+    id INTEGER NOT NULL,
+    data TEXT,
+    is_labeled INTEGER NOT NULL DEFAULT 0,
+    total_annotations INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (project_id, id)
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_labeled ON tasks (project_id, is_labeled, id);
+
+CREATE TABLE IF NOT EXISTS annotations (
+    project_id INTEGER NOT NULL,
+    id INTEGER NOT NULL,
+    task_id INTEGER NOT NULL,
+    completed_by INTEGER,
+    was_cancelled INTEGER NOT NULL DEFAULT 0,
+    lead_time REAL,
+    created_at TEXT,
+    updated_at TEXT,
+    result TEXT,
+    PRIMARY KEY (project_id, id)
+);
+CREATE INDEX IF NOT EXISTS idx_annotations_task ON annotations (project_id, task_id);
+CREATE INDEX IF NOT EXISTS idx_annotations_user ON annotations (project_id, completed_by, task_id);
+
+CREATE TABLE IF NOT EXISTS labels (
+    project_id INTEGER NOT NULL,
+    annotation_id INTEGER NOT NULL,
+    task_id INTEGER NOT NULL,
+    from_name TEXT,
+    label TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_labels_label ON labels (project_id, from_name, label);
+CREATE INDEX IF NOT EXISTS idx_labels_task ON labels (project_id, task_id);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    project_id INTEGER PRIMARY KEY,
+    last_synced_at REAL NOT NULL,
+    last_full_sync_at REAL,
+    updated_at_watermark TEXT,
+    max_task_id INTEGER
+);
+"""
+
+# Largest page of rows a mirror query returns; bigger limits are clamped
+MAX_PAGE_ROWS = 1000
+
+def _page(limit, offset):
+    if limit < 1 or offset < 0:
+        raise ValueError("limit must be >= 1 and offset must be >= 0.")
+    return min(limit, MAX_PAGE_ROWS), offset
+
+def extract_labels(result):
+    """
+    Return (from_name, label) pairs from an annotation result list.
+    Covers choices, taxonomy and every *labels value type (labels, rectanglelabels, ...).
+    """
+    pairs = []
+    for region in result or []:
+        value = region.get("value") or {}
+        for key, labels in value.items():
+            if key != "choices" and key != "taxonomy" and not key.endswith("labels"):
+                continue
+            for label in labels or []:
+                # Taxonomy values are paths, e.g. ["Animal", "Cat"]
+                pairs.append((region.get("from_name"), "/".join(label) if isinstance(label, list) else str(label)))
+    return pairs
+
+def _user_id(completed_by):
+    if isinstance(completed_by, dict):
+        return completed_by.get("id")
+    return completed_by
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat() if timestamp else None
+
+# Tasks updated this long before a sync started are fetched again by the next incremental sync
+WATERMARK_OVERLAP_SECONDS = 120
+
+def parse_timestamp(value):
+    """
+    Parse a Label Studio ISO 8601 timestamp (any fractional-second precision, 'Z' or offset).
+    :return: Aware datetime (naive values are taken as UTC), or None if value is not a timestamp
+    """
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def next_watermark(started_at, newest_seen=None, previous=None):
+    """
+    Watermark to store after a sync that started at started_at (epoch seconds).
+    Pages are fetched concurrently, so a task updated after its page was fetched can be
+    older than the newest updated_at seen: the watermark is the sync start minus
+    WATERMARK_OVERLAP_SECONDS, or the newest updated_at seen if that is earlier (a Label
+    Studio clock behind ours). A sync that saw no task keeps the previous watermark.
+    :param newest_seen: Newest parsed updated_at of the fetched tasks (None if there were none)
+    :param previous: Stored watermark of the previous sync (None for a full sync)
+    :return: ISO 8601 UTC timestamp
+    """
+    if newest_seen is None and previous is not None:
+        return previous
+    watermark = datetime.fromtimestamp(started_at - WATERMARK_OVERLAP_SECONDS, tz=timezone.utc)
+    if newest_seen is not None and newest_seen < watermark:
+        watermark = newest_seen.astimezone(timezone.utc)
+    return watermark.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+class TaskMirror:
+    """
+    Local SQLite mirror of project tasks and annotations.
+    Tasks are upserted in batches during sync; queries hit covering indexes instead of
+    Label Studio. Each project records a sync watermark so later syncs only fetch
+    tasks updated since the previous one.
+    :param path: SQLite database path
+    """
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def upsert_tasks(self, project_id, tasks):
+        """
+        Insert or replace a batch of tasks with their annotations and extracted labels.
+        :return: Tuple (task_count, annotation_count)
+        """
+        task_rows = []
+        annotation_rows = []
+        label_rows = []
+        for task in tasks:
+            annotations = task.get("annotations") or []
+            task_rows.append((
+                project_id,
+                task["id"],
+                json.dumps(task.get("data")),
+                int(bool(task.get("is_labeled", any(not a.get("was_cancelled") for a in annotations)))),
+                task.get("total_annotations", len(annotations)),
+                task.get("created_at"),
+                task.get("updated_at"),
+            ))
+            for annotation in annotations:
+                annotation_rows.append((
+                    project_id,
+                    annotation["id"],
+                    task["id"],
+                    _user_id(annotation.get("completed_by")),
+                    int(bool(annotation.get("was_cancelled"))),
+                    annotation.get("lead_time"),
+                    annotation.get("created_at"),
+                    annotation.get("updated_at"),
+                    json.dumps(annotation.get("result")),
+                ))
+                for from_name, label in extract_labels(annotation.get("result")):
+                    label_rows.append((project_id, annotation["id"], task["id"], from_name, label))
+        task_ids = [(project_id, row[1]) for row in task_rows]
+        with self._lock, self._conn:
+            # Annotations of re-synced tasks are replaced wholesale so deletions upstream are mirrored
+            self._conn.executemany("DELETE FROM labels WHERE project_id = ? AND task_id = ?", task_ids)
+            self._conn.executemany("DELETE FROM annotations WHERE project_id = ? AND task_id = ?", task_ids)
+            self._conn.executemany("INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)", task_rows)
+            self._conn.executemany("INSERT OR REPLACE INTO annotations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", annotation_rows)
+            self._conn.executemany("INSERT INTO labels VALUES (?, ?, ?, ?, ?)", label_rows)
+        return len(task_rows), len(annotation_rows)
+
+    def delete_missing(self, project_id, keep_ids):
+        """
+        Drop mirrored tasks of a project that are not in keep_ids (used after a full sync).
+        :return: Number of tasks removed
+        """
+        with self._lock, self._conn:
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep_ids (id INTEGER PRIMARY KEY)")
+            self._conn.execute("DELETE FROM keep_ids")
+            self._conn.executemany("INSERT OR IGNORE INTO keep_ids VALUES (?)", ((i,) for i in keep_ids))
+            removed = self._conn.execute(
+                "DELETE FROM tasks WHERE project_id = ? AND id NOT IN (SELECT id FROM keep_ids)", (project_id,)
+            ).rowcount
+            for table in ("annotations", "labels"):
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE project_id = ? AND task_id NOT IN (SELECT id FROM keep_ids)", (project_id,)
+                )
+            self._conn.execute("DELETE FROM keep_ids")
+        return removed
+
+    def get_state(self, project_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_synced_at, last_full_sync_at, updated_at_watermark, max_task_id FROM sync_state WHERE project_id = ?",
+                (project_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"last_synced_at": row[0], "last_full_sync_at": row[1], "updated_at_watermark": row[2], "max_task_id": row[3]}
+
+    def set_state(self, project_id, synced_at, full, updated_at_watermark, max_task_id):
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO sync_state (project_id, last_synced_at, last_full_sync_at, updated_at_watermark, max_task_id)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (project_id) DO UPDATE SET
+                    last_synced_at = excluded.last_synced_at,
+                    last_full_sync_at = COALESCE(excluded.last_full_sync_at, sync_state.last_full_sync_at),
+                    updated_at_watermark = excluded.updated_at_watermark,
+                    max_task_id = excluded.max_task_id
+                """,
+                (project_id, synced_at, synced_at if full else None, updated_at_watermark, max_task_id),
+            )
+
+    def freshness(self, project_id):
+        """
+        Describe how stale the mirrored data of a project is.
+        """
+        state = self.get_state(project_id)
+        if state is None:
+            raise ValueError(f"Project {project_id} has not been synced to the local mirror; run sync_task_mirror first.")
+        return {
+            "last_synced_at": _iso(state["last_synced_at"]),
+            "last_full_sync_at": _iso(state["last_full_sync_at"]),
+            "staleness_seconds": round(time.time() - state["last_synced_at"], 1),
+        }
+
+    def _query(self, sql, params):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def count_tasks(self, project_id):
+        return self._query("SELECT COUNT(*) FROM tasks WHERE project_id = ?", (project_id,))[0][0]
+
+    def unlabeled_tasks(self, project_id, limit=100, offset=0):
+        limit, offset = _page(limit, offset)
+        total = self._query("SELECT COUNT(*) FROM tasks WHERE project_id = ? AND is_labeled = 0", (project_id,))[0][0]
+        rows = self._query(
+            "SELECT id, data FROM tasks WHERE project_id = ? AND is_labeled = 0 ORDER BY id LIMIT ? OFFSET ?",
+            (project_id, limit, offset),
+        )
+        return {"total": total, "tasks": [{"id": row[0], "data": json.loads(row[1])} for row in rows]}
+
+    def tasks_by_annotator(self, project_id, annotator_id=None, limit=100, offset=0):
+        limit, offset = _page(limit, offset)
+        if annotator_id is None:
+            rows = self._query(
+                """
+                SELECT completed_by, COUNT(DISTINCT task_id), COUNT(*), SUM(was_cancelled)
+                FROM annotations WHERE project_id = ? GROUP BY completed_by ORDER BY COUNT(*) DESC
+                """,
+                (project_id,),
+            )
+            return {"annotators": [
+                {"annotator_id": row[0], "task_count": row[1], "annotation_count": row[2], "cancelled_count": row[3]}
+                for row in rows
+            ]}
+        total = self._query(
+            "SELECT COUNT(DISTINCT task_id) FROM annotations WHERE project_id = ? AND completed_by = ?",
+            (project_id, annotator_id),
+        )[0][0]
+        rows = self._query(
+            """
+            SELECT DISTINCT task_id FROM annotations WHERE project_id = ? AND completed_by = ?
+            ORDER BY task_id LIMIT ? OFFSET ?
+            """,
+            (project_id, annotator_id, limit, offset),
+        )
+        return {"annotator_id": annotator_id, "total": total, "task_ids": [row[0] for row in rows]}
+
+    def label_counts(self, project_id, from_name=None):
+        sql = """
+            SELECT l.from_name, l.label, COUNT(*), COUNT(DISTINCT l.task_id)
+            FROM labels l JOIN annotations a ON a.project_id = l.project_id AND a.id = l.annotation_id
+            WHERE l.project_id = ? AND a.was_cancelled = 0
+        """
+        params = [project_id]
+        if from_name:
+            sql += " AND l.from_name = ?"
+            params.append(from_name)
+        sql += " GROUP BY l.from_name, l.label ORDER BY COUNT(*) DESC"
+        rows = self._query(sql, params)
+        return {"labels": [{"from_name": r[0], "label": r[1], "count": r[2], "task_count": r[3]} for r in rows]}
+
+def updated_since_filter(watermark):
+    """
+    Task list filter selecting tasks whose updated_at is newer than the watermark.
+    """
+    return {
+        "conjunction": "and",
+        "items": [{
+            "filter": "filter:tasks:updated_at",
+            "operator": "greater",
+            "type": "Datetime",
+            "value": watermark,
+        }],
+    }
+
+async def sync_project(client, mirror, project_id, full=False, page_size=None, concurrency=None, batch_size=500):
+    """
+    Sync a project's tasks and annotations into the mirror.
+    The first sync (or full=True) fetches every task and drops mirrored tasks that no
+    longer exist upstream. Later syncs only request tasks whose updated_at is newer
+    than the stored watermark (see next_watermark). SQLite work runs in a worker thread,
+    so a long sync does not block other tool calls.
+    :return: Dict describing the sync (mode, tasks/annotations written, elapsed time)
+    """
+    project_id = int(project_id)
+    state = await asyncio.to_thread(mirror.get_state, project_id)
+    incremental = not full and state is not None and state["updated_at_watermark"] is not None
+    query_params = {}
+    if incremental:
+        query_params["filters"] = updated_since_filter(state["updated_at_watermark"])
+    started_wall = time.time()
+    start = time.perf_counter()
+    newest_seen = None
+    max_task_id = state["max_task_id"] if incremental else None
+    seen_ids = []
+    batch = []
+    tasks_written = 0
+    annotations_written = 0
+
+    async def flush():
+        nonlocal batch, tasks_written, annotations_written
+        rows, batch = batch, []
+        task_count, annotation_count = await asyncio.to_thread(mirror.upsert_tasks, project_id, rows)
+        tasks_written += task_count
+        annotations_written += annotation_count
+
+    async for task in client.iter_all_tasks(project_id, page_size=page_size, concurrency=concurrency, **query_params):
+        batch.append(task)
+        if not incremental:
+            seen_ids.append(task["id"])
+        updated_at = parse_timestamp(task.get("updated_at"))
+        if updated_at is not None and (newest_seen is None or updated_at > newest_seen):
+            newest_seen = updated_at
+        if max_task_id is None or task["id"] > max_task_id:
+            max_task_id = task["id"]
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+    removed = 0 if incremental else await asyncio.to_thread(mirror.delete_missing, project_id, seen_ids)
+    watermark = next_watermark(started_wall, newest_seen, state["updated_at_watermark"] if incremental else None)
+    await asyncio.to_thread(mirror.set_state, project_id, started_wall, not incremental, watermark, max_task_id)
+    tasks_mirrored = await asyncio.to_thread(mirror.count_tasks, project_id)
+    return {
+        "project_id": project_id,
+        "mode": "incremental" if incremental else "full",
+        "tasks_written": tasks_written,
+        "annotations_written": annotations_written,
+        "tasks_removed": removed,
+        "tasks_mirrored": tasks_mirrored,
+        "updated_at_watermark": watermark,
+        "elapsed_seconds": round(time.perf_counter() - start, 3),
+    }
+
+_task_mirror = None
+_task_mirror_lock = threading.Lock()
+
+def mirror_path():
+    """
+    SQLite file of the mirror (LS_MIRROR_PATH) with the Label Studio instance key in its name,
+    so project ids of different instances never share rows.
+    """
+    path = config.MIRROR_PATH or os.path.join(tempfile.gettempdir(), 'label-studio-mcp', 'mirror.sqlite3')
+    root, ext = os.path.splitext(path)
+    return f"{root}-{config.INSTANCE_KEY}{ext}"
+
+def get_task_mirror():
+    """
+    Return the process-wide TaskMirror, opening the database on first use.
+    """
+    global _task_mirror
+    with _task_mirror_lock:
+        if _task_mirror is None:
+            _task_mirror = TaskMirror(mirror_path())
+        return _task_mirror
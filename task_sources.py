@@ -0,0 +1,154 @@
+import csv
+import gzip
+import io
+import json
+import os
+import time
+import json_codec
+
+FORMATS = ('jsonl', 'json', 'csv', 'tsv')
+
+_EXTENSIONS = {
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.json': 'json',
+    '.csv': 'csv',
+    '.tsv': 'tsv',
+}
+
+def detect_format(path):
+    """
+    Infer the task file format from its extension (a trailing .gz is ignored).
+    """
+    name = path[:-3] if path.endswith('.gz') else path
+    fmt = _EXTENSIONS.get(os.path.splitext(name)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Cannot infer task file format from {path}; pass format as one of {', '.join(FORMATS)}.")
+    return fmt
+
+class FileProgress:
+    """
+    Counters updated while a task file is read and uploaded.
+    bytes_read is the position in the file on disk (compressed bytes for .gz files).
+    """
+    def __init__(self, path):
+        self.path = path
+        self.total_bytes = os.path.getsize(path)
+        self.rows_read = 0
+        self.rows_sent = 0
+        self.bytes_read = 0
+        self.started = time.perf_counter()
+
+    def to_dict(self):
+        elapsed = time.perf_counter() - self.started
+        return {
+            "rows_read": self.rows_read,
+            "rows_sent": self.rows_sent,
+            "bytes_read": self.bytes_read,
+            "total_bytes": self.total_bytes,
+            "percent": round(100.0 * self.bytes_read / self.total_bytes, 1) if self.total_bytes else 100.0,
+            "elapsed_seconds": round(elapsed, 3),
+            "bytes_per_second": round(self.bytes_read / elapsed, 1) if elapsed > 0 else None,
+        }
+
+def _open_text(path, raw):
+    stream = gzip.GzipFile(fileobj=raw, mode='rb') if path.endswith('.gz') else raw
+    return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+
+def _iter_jsonl(text):
+    for line_number, line in enumerate(text, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json_codec.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e}")
+
+def iter_json_array(text, read_size=1 << 16):
+    """
+    Incrementally decode the items of a top-level JSON array from a text stream.
+    Only the current item and one read buffer are held in memory. A top-level
+    object is treated as a single task.
+    """
+    decoder = json.JSONDecoder()
+    buffer = text.read(read_size).lstrip()
+    if not buffer:
+        return
+    if buffer[0] == '{':
+        buffer += text.read()
+        yield json.loads(buffer)
+        return
+    if buffer[0] != '[':
+        raise ValueError("JSON task file must contain an array of tasks or a single task object.")
+    pos = 1
+    eof = False
+    while True:
+        # Skip whitespace and separators between items
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            chunk = text.read(read_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+        if pos >= len(buffer):
+            raise ValueError("Unexpected end of JSON array.")
+        if buffer[pos] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise ValueError("Malformed JSON array item.")
+            chunk = text.read(read_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        # A number can be split across reads; only trust it when followed by a delimiter
+        if end == len(buffer) and not eof:
+            chunk = text.read(read_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield item
+        pos = end
+        if pos > read_size:
+            buffer, pos = buffer[pos:], 0
+
+def _iter_csv(text, delimiter):
+    for row in csv.DictReader(text, delimiter=delimiter):
+        yield {k: v for k, v in row.items() if k is not None}
+
+def iter_task_file(path, format=None, progress=None):
+    """
+    Stream task dicts from a local JSONL, JSON array or CSV/TSV file (optionally .gz).
+    Rows are parsed one at a time so memory stays bounded regardless of file size.
+    :param path: Local file path
+    :param format: One of FORMATS; inferred from the extension if omitted
+    :param progress: Optional FileProgress updated as rows are read
+    :return: Generator of task dicts
+    """
+    if not path or not os.path.isfile(path):
+        raise ValueError(f"Task file not found: {path}")
+    fmt = (format or detect_format(path)).lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported task file format '{fmt}'; expected one of {', '.join(FORMATS)}.")
+    with open(path, 'rb') as raw:
+        text = _open_text(path, raw)
+        if fmt == 'jsonl':
+            rows = _iter_jsonl(text)
+        elif fmt == 'json':
+            rows = iter_json_array(text)
+        else:
+            rows = _iter_csv(text, ',' if fmt == 'csv' else '\t')
+        for row in rows:
+            if not isinstance(row, dict):
+                raise ValueError(f"Each task must be a JSON object, got {type(row).__name__}.")
+            if progress is not None:
+                progress.rows_read += 1
+                progress.bytes_read = raw.tell()
+            yield row
+        if progress is not None:
+            progress.bytes_read = raw.tell()
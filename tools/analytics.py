@@ -1,31 +1,157 @@
+import asyncio
+import os
+import time
 from mcp_instance import mcp
-from label_studio_client import LabelStudioClient
+from config import config
 from error_handling import mcp_tool_error_handler
+from batch import normalize_ids, run_batch
+from typing import List, Optional
+
+# project_id -> (export path, monotonic time it was written)
+_recent_exports = {}
+# project_id -> lock serializing refreshes of that project's export file
+_export_locks = {}
+
+def _project_export_path(project_id):
+    """
+    One export file per project (and Label Studio instance): a refresh replaces it, which also
+    invalidates its .columns.npz by mtime, instead of leaving the previous export behind.
+    """
+    from export_store import export_dir
+    return os.path.join(export_dir(), f"analytics-{config.INSTANCE_KEY}-project-{project_id}.json")
+
+async def _load_table(project_id=None, path=None, refresh_export=False):
+    """
+    Resolve an AnnotationTable from an export file, or from a JSON export of the project
+    streamed to disk (reused for LS_ANALYTICS_EXPORT_TTL seconds unless refresh_export is set).
+    """
+    from label_studio_client import get_async_client
+    import annotation_arrays
+    from export_store import resolve_local_path
+    if path:
+        path = resolve_local_path(path)
+    else:
+        if not project_id:
+            raise ValueError("Either project_id or path is required.")
+        key = str(project_id)
+        async with _export_locks.setdefault(key, asyncio.Lock()):
+            cached = _recent_exports.get(key)
+            if refresh_export or cached is None or time.monotonic() - cached[1] > config.ANALYTICS_EXPORT_TTL:
+                export = await get_async_client().export_annotations_to_file(
+                    project_id, path=_project_export_path(project_id), exportType='JSON'
+                )
+                cached = _recent_exports[key] = (export['path'], time.monotonic())
+        path = cached[0]
+    table = await asyncio.to_thread(annotation_arrays.load_table, path)
+    return path, table
 
 @mcp.tool(
     description="Extract and return only the progress metrics from the project details."
 )
 @mcp_tool_error_handler
-def get_project_progress(project_id: str) -> dict:
+async def get_project_progress(project_id: str) -> dict:
+    from project_cache import fetch_project, project_progress
     if not project_id:
         raise ValueError("project_id is required.")
-    client = LabelStudioClient()
-    endpoint = f"/api/projects/{project_id}/"
-    project = client.get(endpoint)
-    progress_fields = [
-        "task_number",
-        "finished_task_number",
-        "total_annotations_number",
-        "total_predictions_number",
-        "num_tasks_with_annotations",
-        "useful_annotation_number",
-        "ground_truth_number",
-        "skipped_annotations_number",
-        "queue_total",
-        "queue_done",
-        "overlap_cohort_percentage",
-    ]
-    progress = {k: project.get(k) for k in progress_fields if k in project}
+    progress = project_progress(await fetch_project(project_id, "progress"))
     if not progress:
         return {"progress": None, "warning": "No progress metrics found for this project."}
-    return {"progress": progress} 
\ No newline at end of file
+    return {"progress": progress}
+
+@mcp.tool(
+    description="Progress metrics for many projects in one call. Projects are fetched concurrently (at most 'concurrency' at a time, default LS_BATCH_CONCURRENCY) through the same project cache as get_project_progress. A project that fails gets its own 'error' entry instead of failing the batch. Returns 'results' in input order and a 'summary' with succeeded/failed counts and elapsed time."
+)
+@mcp_tool_error_handler
+async def get_projects_progress(project_ids: List[str], concurrency: Optional[int] = None) -> dict:
+    from project_cache import fetch_project, project_progress
+    project_ids = normalize_ids(project_ids)
+
+    async def fetch(project_id):
+        progress = project_progress(await fetch_project(project_id, "progress"))
+        if not progress:
+            return {"progress": None, "warning": "No progress metrics found for this project."}
+        return {"progress": progress}
+
+    return await run_batch(project_ids, fetch, concurrency, id_key="project_id")
+
+@mcp.tool(
+    description="Count labels across non-cancelled annotations using the vectorized analytics engine. Pass 'path' to an export written by export_annotations_to_file (JSON or JSONL), or 'project_id' to stream a fresh JSON export (reused for a few minutes; set 'refresh_export' to force a new one). Optionally restrict to one control tag with 'from_name'."
+)
+@mcp_tool_error_handler
+async def get_label_distribution(
+    project_id: Optional[str] = None,
+    path: Optional[str] = None,
+    from_name: Optional[str] = None,
+    refresh_export: bool = False
+) -> dict:
+    import annotation_arrays
+    path, table = await _load_table(project_id, path, refresh_export)
+    result = await asyncio.to_thread(annotation_arrays.label_distribution, table, from_name)
+    return {"path": path, **result}
+
+@mcp.tool(
+    description="Per-annotator throughput from an annotation export: annotation and task counts, cancelled annotations, total and mean lead time, annotations per hour of lead time, and first/last annotation timestamps. Pass 'path' to an export file or 'project_id' to stream one."
+)
+@mcp_tool_error_handler
+async def get_annotator_throughput(
+    project_id: Optional[str] = None,
+    path: Optional[str] = None,
+    refresh_export: bool = False
+) -> dict:
+    import annotation_arrays
+    path, table = await _load_table(project_id, path, refresh_export)
+    result = await asyncio.to_thread(annotation_arrays.annotator_throughput, table)
+    return {"path": path, **result}
+
+@mcp.tool(
+    description="Lead time percentiles (seconds) of non-cancelled annotations from an annotation export, optionally broken down per annotator. 'percentiles' defaults to [50, 75, 90, 95, 99]. Pass 'path' to an export file or 'project_id' to stream one."
+)
+@mcp_tool_error_handler
+async def get_lead_time_percentiles(
+    project_id: Optional[str] = None,
+    path: Optional[str] = None,
+    percentiles: Optional[List[float]] = None,
+    by_annotator: bool = False,
+    refresh_export: bool = False
+) -> dict:
+    import annotation_arrays
+    if percentiles is not None and any(p < 0 or p > 100 for p in percentiles):
+        raise ValueError("percentiles must be between 0 and 100.")
+    path, table = await _load_table(project_id, path, refresh_export)
+    result = await asyncio.to_thread(
+        annotation_arrays.lead_time_percentiles, table, percentiles or (50, 75, 90, 95, 99), by_annotator
+    )
+    return {"path": path, **result}
+
+@mcp.tool(
+    description="Inter-annotator agreement from an annotation export: pairwise Cohen's kappa between annotators sharing at least 'min_overlap' tasks, and Fleiss' kappa over tasks with two or more annotations. Uses the first label of each annotation for the control 'from_name' (all controls if omitted). Pass 'path' to an export file or 'project_id' to stream one."
+)
+@mcp_tool_error_handler
+async def get_annotator_agreement(
+    project_id: Optional[str] = None,
+    path: Optional[str] = None,
+    from_name: Optional[str] = None,
+    min_overlap: int = 10,
+    refresh_export: bool = False
+) -> dict:
+    import annotation_arrays
+    path, table = await _load_table(project_id, path, refresh_export)
+    cohen = await asyncio.to_thread(annotation_arrays.cohen_kappa, table, from_name, min_overlap)
+    fleiss = await asyncio.to_thread(annotation_arrays.fleiss_kappa, table, from_name)
+    return {"path": path, "cohen_kappa": cohen, "fleiss_kappa": fleiss}
+
+@mcp.tool(
+    description="Bounding-box agreement from an annotation export: mean best-match IoU of rectangle regions between annotations of the same task, overall and per label. With 'same_label' (default), boxes are only matched against boxes with the same label. Pass 'path' to an export file or 'project_id' to stream one."
+)
+@mcp_tool_error_handler
+async def get_region_iou(
+    project_id: Optional[str] = None,
+    path: Optional[str] = None,
+    from_name: Optional[str] = None,
+    same_label: bool = True,
+    refresh_export: bool = False
+) -> dict:
+    import annotation_arrays
+    path, table = await _load_table(project_id, path, refresh_export)
+    result = await asyncio.to_thread(annotation_arrays.region_iou, table, from_name, same_label)
+    return {"path": path, **result}
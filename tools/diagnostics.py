@@ -0,0 +1,53 @@
+from mcp_instance import mcp
+from error_handling import mcp_tool_error_handler
+from conditional_cache import get_validator_store
+from json_codec import JSON_BACKEND
+from metrics import get_metrics
+from resilience import get_circuit_breaker
+from typing import Optional
+import asyncio
+
+@mcp.tool(
+    description="Return server metrics collected since start (or the last reset): per-tool wall time, upstream time and response size, and per-endpoint upstream latency, request/response bytes, status counts, retries, rate-limit waits, project and label config cache hits, 304 Not Modified responses and bytes saved by conditional requests and compression. Histograms are summarized as count/mean/p50/p90/p99/max. 'format' is 'json' (default) or 'prometheus' (text exposition). With 'path', the metrics are also written to that local file in LS_EXPORT_DIR. 'reset' clears the metrics after reading them."
+)
+@mcp_tool_error_handler
+async def get_server_metrics(
+    format: Optional[str] = None,
+    path: Optional[str] = None,
+    reset: bool = False
+) -> dict:
+    from label_config import cache_stats as label_config_cache_stats
+    from export_store import resolve_local_path
+    if format not in (None, 'json', 'prometheus'):
+        raise ValueError("format must be 'json' or 'prometheus'.")
+    registry = get_metrics()
+    if format == 'prometheus':
+        result = {"prometheus": registry.to_prometheus()}
+    else:
+        result = {
+            **registry.snapshot(),
+            "circuit_breaker": get_circuit_breaker().stats(),
+            "validator_store": get_validator_store().stats(),
+            "label_config_cache": label_config_cache_stats(),
+            "json_backend": JSON_BACKEND,
+        }
+    if path:
+        result["dump"] = registry.dump(resolve_local_path(path), format)
+    if reset:
+        registry.reset()
+    return result
+
+@mcp.tool(
+    description="Report whether the server can reach Label Studio. Returns the last background health check ('status' is 'ok', 'unreachable', 'misconfigured' or 'unknown' before the first check), when it ran, its latency, the last error and the circuit breaker state. Set 'refresh' to run a check now; one is also run if none has been yet."
+)
+@mcp_tool_error_handler
+async def health(refresh: bool = False) -> dict:
+    from health import get_health_monitor
+    monitor = get_health_monitor()
+    if refresh or not monitor.checks:
+        result = await asyncio.to_thread(monitor.check)
+    else:
+        result = monitor.snapshot()
+    if result["status"] != 'misconfigured':
+        result["circuit_breaker"] = get_circuit_breaker().stats()
+    return result
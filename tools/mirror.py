@@ -0,0 +1,60 @@
+from mcp_instance import mcp
+from error_handling import mcp_tool_error_handler
+from typing import Optional
+import asyncio
+
+@mcp.tool(
+    description="Sync a project's tasks and annotations into the local SQLite mirror. The first sync (or full=True) copies every task and removes tasks deleted upstream; later syncs only fetch tasks updated since the previous sync. Run this before the mirror_* query tools, and again whenever their 'staleness_seconds' is too high."
+)
+@mcp_tool_error_handler
+async def sync_task_mirror(project_id: str, full: bool = False) -> dict:
+    from label_studio_client import get_async_client
+    from task_mirror import get_task_mirror, sync_project
+    if not project_id:
+        raise ValueError("project_id is required.")
+    client = get_async_client()
+    mirror = await asyncio.to_thread(get_task_mirror)
+    return await sync_project(client, mirror, project_id, full=full)
+
+def _query(project_id, method, *args):
+    """
+    Run a TaskMirror query and add the project's freshness. Called in a worker thread:
+    SQLite calls block.
+    """
+    from task_mirror import get_task_mirror
+    mirror = get_task_mirror()
+    project_id = int(project_id)
+    freshness = mirror.freshness(project_id)
+    return {**getattr(mirror, method)(project_id, *args), "freshness": freshness}
+
+@mcp.tool(
+    description="List unlabeled tasks of a project from the local mirror (no Label Studio round trip). Returns 'total', a page of tasks ('limit' of at most 1000, 'offset') and 'freshness' describing how stale the mirror is."
+)
+@mcp_tool_error_handler
+async def mirror_unlabeled_tasks(project_id: str, limit: int = 100, offset: int = 0) -> dict:
+    if not project_id:
+        raise ValueError("project_id is required.")
+    return await asyncio.to_thread(_query, project_id, 'unlabeled_tasks', limit, offset)
+
+@mcp.tool(
+    description="Query tasks by annotator from the local mirror. Without 'annotator_id', returns per-annotator task and annotation counts; with it, returns a page of task ids that annotator worked on. Includes 'freshness' describing how stale the mirror is."
+)
+@mcp_tool_error_handler
+async def mirror_tasks_by_annotator(
+    project_id: str,
+    annotator_id: Optional[int] = None,
+    limit: int = 100,
+    offset: int = 0
+) -> dict:
+    if not project_id:
+        raise ValueError("project_id is required.")
+    return await asyncio.to_thread(_query, project_id, 'tasks_by_annotator', annotator_id, limit, offset)
+
+@mcp.tool(
+    description="Count labels (choices, labels, rectanglelabels, taxonomy, ...) across non-cancelled annotations of a project from the local mirror. Optionally restrict to one control tag with 'from_name'. Includes 'freshness' describing how stale the mirror is."
+)
+@mcp_tool_error_handler
+async def mirror_label_counts(project_id: str, from_name: Optional[str] = None) -> dict:
+    if not project_id:
+        raise ValueError("project_id is required.")
+    return await asyncio.to_thread(_query, project_id, 'label_counts', from_name)
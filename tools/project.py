@@ -1,23 +1,57 @@
 from mcp_instance import mcp
-from label_studio_client import LabelStudioClient
 from error_handling import mcp_tool_error_handler
+from response_shaping import decode_cursor, select_fields, shape_response, top_level_fields
+from batch import normalize_ids, run_batch
+from typing import Optional, List
 
 @mcp.tool(
-    description="List projects from Label Studio. Optionally filter by title (case-insensitive substring match) using the 'title' parameter. This endpoint is paginated with a fixed page size of 20 items: use the 'page' parameter to fetch each page in sequence, starting from 1. To retrieve all projects, keep incrementing 'page' and calling this tool until the 'next' field in the response is null. Each response contains 'results', 'count', 'next', and 'previous' fields."
+    description="List projects from Label Studio. Optionally filter by title (case-insensitive substring match) using the 'title' parameter. This endpoint is paginated with a fixed page size of 20 items: use the 'page' parameter to fetch each page in sequence, starting from 1. To retrieve all projects, keep incrementing 'page' and calling this tool until the 'next' field in the response is null. Each response contains 'results', 'count', 'next', and 'previous' fields. Use 'fields' to choose the project fields returned (passed upstream as 'include'; dotted paths such as 'created_by.email' select nested fields). Responses larger than 'max_bytes' (default LS_RESPONSE_MAX_BYTES) are cut and return a 'next_cursor'; pass it back as 'cursor' with the same other arguments to continue."
 )
 @mcp_tool_error_handler
-def list_projects(page: int = 1, title: str = None) -> dict:
-    client = LabelStudioClient()
-    params = {'page': page, 'page_size': 20, 'include': 'id,title,created_by,created_at,is_published'}
+async def list_projects(
+    page: int = 1,
+    title: str = None,
+    fields: Optional[List[str]] = None,
+    max_bytes: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> dict:
+    from label_studio_client import get_async_client
+    client = get_async_client()
+    state = decode_cursor(cursor) if cursor else {}
+    page = state.get('page', page)
+    include = ','.join(top_level_fields(fields)) if fields else 'id,title,created_by,created_at,is_published'
+    params = {'page': page, 'page_size': 20, 'include': include}
     if title:
         params['title'] = title
-    return client.get('/api/projects/', params=params)
+    result = await client.get('/api/projects/', params=params)
+    return shape_response(result, fields, 'results', max_bytes, state.get('offset', 0), {'page': page})
+
+@mcp.tool(
+    description="Fetch ALL projects in one call instead of paging with list_projects. Pages are fetched concurrently and returned in order. Use 'fields' to keep only the project fields you need (they are also passed upstream as 'include'). If 'output_path' is given, projects are written to that local JSONL file in LS_EXPORT_DIR and only the path and count are returned. In-memory results larger than 'max_bytes' (default LS_RESPONSE_MAX_BYTES) are cut and marked 'truncated'."
+)
+@mcp_tool_error_handler
+async def fetch_all_projects(
+    fields: Optional[List[str]] = None,
+    output_path: Optional[str] = None,
+    title: Optional[str] = None,
+    page_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    max_bytes: Optional[int] = None
+) -> dict:
+    from label_studio_client import get_async_client
+    from pagination import collect
+    client = get_async_client()
+    query_params = {}
+    if title:
+        query_params['title'] = title
+    projects = client.iter_all_projects(page_size=page_size, concurrency=concurrency, fields=fields, **query_params)
+    return await collect(projects, output_path, max_bytes)
 
 @mcp.tool(
-    description="Create a new project in Label Studio. Requires a title and label_config. Optional fields allow further customization."
+    description="Create a new project in Label Studio. Requires a title and label_config. Optional fields allow further customization. The label_config is validated locally first (well-formed XML, unique names, toName references); an invalid config is rejected without calling Label Studio. Set 'skip_local_validation' to send it as is and let Label Studio validate it."
 )
 @mcp_tool_error_handler
-def create_project(
+async def create_project(
     title: str,
     label_config: str,
     description: str = None,
@@ -28,11 +62,16 @@ def create_project(
     show_annotation_history: bool = False,
     organization: int = None,
     color: str = None,
-    maximum_annotations: int = 1
+    maximum_annotations: int = 1,
+    skip_local_validation: bool = False
 ) -> dict:
+    from label_studio_client import get_async_client
+    from label_config import require_valid
     if not title or not label_config:
         raise ValueError("Both title and label_config are required.")
-    client = LabelStudioClient()
+    if not skip_local_validation:
+        require_valid(label_config)
+    client = get_async_client()
     payload = {
         "title": title,
         "label_config": label_config,
@@ -47,29 +86,48 @@ def create_project(
         "maximum_annotations": maximum_annotations,
     }
     payload = {k: v for k, v in payload.items() if v is not None}
-    return client.post("/api/projects/", json=payload)
+    return await client.post("/api/projects/", json=payload)
 
 @mcp.tool(
-    description="Fetch and return complete project details from the Label Studio API."
+    description="Fetch and return complete project details from the Label Studio API. Use 'fields' to return only some fields (dotted paths such as 'created_by.email' select nested fields). Details larger than 'max_bytes' (default LS_RESPONSE_MAX_BYTES) have their largest fields shortened and listed in '_truncated_fields'; request those fields explicitly to get them in full."
 )
 @mcp_tool_error_handler
-def get_project(project_id: str) -> dict:
+async def get_project(project_id: str, fields: Optional[List[str]] = None, max_bytes: Optional[int] = None) -> dict:
+    from project_cache import fetch_project
     if not project_id:
         raise ValueError("project_id is required.")
-    client = LabelStudioClient()
-    endpoint = f"/api/projects/{project_id}/"
-    return client.get(endpoint)
+    project = await fetch_project(project_id, "detail")
+    return shape_response(project, fields, max_bytes=max_bytes)
+
+@mcp.tool(
+    description="Fetch details of many projects in one call. Projects are fetched concurrently (at most 'concurrency' at a time, default LS_BATCH_CONCURRENCY) through the same project cache as get_project. Use 'fields' to keep only some project fields. A project that fails gets its own 'error' entry instead of failing the batch. Returns 'results' in input order (each with 'project_id' and 'project' or 'error') and a 'summary' with succeeded/failed counts and elapsed time. Results larger than 'max_bytes' (default LS_RESPONSE_MAX_BYTES) are cut and marked 'truncated'."
+)
+@mcp_tool_error_handler
+async def get_projects(
+    project_ids: List[str],
+    fields: Optional[List[str]] = None,
+    concurrency: Optional[int] = None,
+    max_bytes: Optional[int] = None
+) -> dict:
+    from project_cache import fetch_project
+    project_ids = normalize_ids(project_ids)
+
+    async def fetch(project_id):
+        return {"project": select_fields(await fetch_project(project_id, "detail"), fields)}
+
+    result = await run_batch(project_ids, fetch, concurrency, id_key="project_id")
+    return shape_response(result, items_key="results", max_bytes=max_bytes,
+                          hint="Request fewer project_ids or fewer fields.")
 
 @mcp.tool(
     description="Extract and return only the guidelines section from the project details."
 )
 @mcp_tool_error_handler
-def get_project_guidelines(project_id: str) -> dict:
+async def get_project_guidelines(project_id: str) -> dict:
+    from project_cache import fetch_project
     if not project_id:
         raise ValueError("project_id is required.")
-    client = LabelStudioClient()
-    endpoint = f"/api/projects/{project_id}/"
-    project = client.get(endpoint)
+    project = await fetch_project(project_id, "guidelines")
     guidelines = project.get("expert_instruction")
     if guidelines is None or not isinstance(guidelines, str):
         return {"guidelines": None, "warning": "No guidelines found for this project."}
@@ -79,12 +137,11 @@ def get_project_guidelines(project_id: str) -> dict:
     description="Extract and return only the label configuration from the project details."
 )
 @mcp_tool_error_handler
-def get_label_config(project_id: str) -> dict:
+async def get_label_config(project_id: str) -> dict:
+    from project_cache import fetch_project
     if not project_id:
         raise ValueError("project_id is required.")
-    client = LabelStudioClient()
-    endpoint = f"/api/projects/{project_id}/"
-    project = client.get(endpoint)
+    project = await fetch_project(project_id, "config")
     label_config = project.get("label_config")
     if label_config is None or not isinstance(label_config, str):
         return {"label_config": None, "warning": "No label_config found for this project."}
@@ -94,21 +151,27 @@ def get_label_config(project_id: str) -> dict:
     description="Set the published status of a project (publish/unpublish)."
 )
 @mcp_tool_error_handler
-def set_project_published(project_id: str, published: bool) -> dict:
+async def set_project_published(project_id: str, published: bool) -> dict:
+    from label_studio_client import get_async_client
+    from project_cache import invalidate_project
     if not project_id:
         raise ValueError("project_id is required.")
     if published is None:
         raise ValueError("published is required.")
-    client = LabelStudioClient()
+    client = get_async_client()
     endpoint = f"/api/projects/{project_id}/"
     payload = {"is_published": published}
-    return client.patch(endpoint, json=payload)
+    result = await client.patch(endpoint, json=payload)
+    invalidate_project(project_id, ["detail"])
+    return result
 
 @mcp.tool(
     description="Update project settings and guidelines."
 )
 @mcp_tool_error_handler
-def update_project_settings(project_id: str, title: str = None, description: str = None, expert_instruction: str = None) -> dict:
+async def update_project_settings(project_id: str, title: str = None, description: str = None, expert_instruction: str = None) -> dict:
+    from label_studio_client import get_async_client
+    from project_cache import invalidate_project
     if not project_id:
         raise ValueError("project_id is required.")
     payload = {}
@@ -120,56 +183,103 @@ def update_project_settings(project_id: str, title: str = None, description: str
         payload["expert_instruction"] = expert_instruction
     if not payload:
         raise ValueError("At least one field (title, description, expert_instruction) must be provided.")
-    client = LabelStudioClient()
+    client = get_async_client()
     endpoint = f"/api/projects/{project_id}/"
-    return client.patch(endpoint, json=payload)
+    result = await client.patch(endpoint, json=payload)
+    invalidate_project(project_id, ["detail", "guidelines"] if "expert_instruction" in payload else ["detail"])
+    return result
 
 @mcp.tool(
-    description="Update the label configuration for a project."
+    description="Update the label configuration for a project. The config is validated locally first; an invalid config is rejected without calling Label Studio. Set 'skip_local_validation' to send it as is and let Label Studio validate it."
 )
 @mcp_tool_error_handler
-def update_label_config(project_id: str, label_config: str) -> dict:
+async def update_label_config(project_id: str, label_config: str, skip_local_validation: bool = False) -> dict:
+    from label_studio_client import get_async_client
+    from project_cache import invalidate_project
+    from label_config import require_valid
     if not project_id:
         raise ValueError("project_id is required.")
     if not label_config:
         raise ValueError("label_config is required.")
-    client = LabelStudioClient()
+    if not skip_local_validation:
+        require_valid(label_config)
+    client = get_async_client()
     endpoint = f"/api/projects/{project_id}/"
     payload = {"label_config": label_config}
-    return client.patch(endpoint, json=payload)
+    result = await client.patch(endpoint, json=payload)
+    invalidate_project(project_id, ["detail", "config"])
+    return result
 
 @mcp.tool(
     description="Delete a project with confirmation safeguard. Requires project_id and confirm=True.",
     tags={"destructive"}
 )
 @mcp_tool_error_handler
-def delete_project(project_id: str, confirm: bool = False) -> dict:
+async def delete_project(project_id: str, confirm: bool = False) -> dict:
+    from label_studio_client import get_async_client
+    from project_cache import invalidate_project
+    from import_filter import drop_hash_index
     if not project_id:
         raise ValueError("project_id is required.")
     if not confirm:
         return {"error": "Confirmation required to delete project. Set confirm=True."}
-    client = LabelStudioClient()
+    client = get_async_client()
     endpoint = f"/api/projects/{project_id}/"
-    import requests
-    url = f"{client.base_url}{endpoint}"
-    try:
-        resp = requests.delete(url, headers=client.headers, timeout=client.timeout)
-        resp.raise_for_status()
-        return {"success": True, "message": f"Project {project_id} deleted."}
-    except requests.RequestException as e:
-        raise RuntimeError(f"DELETE {url} failed: {e}")
+    await client.delete(endpoint)
+    invalidate_project(project_id)
+    drop_hash_index(project_id)
+    return {"success": True, "message": f"Project {project_id} deleted."}
 
 @mcp.tool(
-    description="Validate a labeling interface XML config for a given project. Requires project_id and label_config."
+    description="Validate a labeling interface XML config for a given project. Requires project_id and label_config. The config is first checked locally (well-formed XML, unique tag names, toName references, $data bindings, label lists); if that fails, the local 'errors' are returned without an upstream call. Otherwise Label Studio validates it against the project's existing data, unless 'local_only' is set."
 )
 @mcp_tool_error_handler
-def validate_label_config(
+async def validate_label_config(
     project_id: str,
-    label_config: str
+    label_config: str,
+    local_only: bool = False
 ) -> dict:
+    from label_studio_client import get_async_client
+    from label_config import parse_label_config
     if not project_id or not label_config:
         raise ValueError("Both project_id and label_config are required.")
-    client = LabelStudioClient()
+    local = parse_label_config(label_config).validation()
+    if not local["valid"] or local_only:
+        return {**local, "source": "local"}
+    client = get_async_client()
     endpoint = f"/api/projects/{project_id}/validate/"
     payload = {"label_config": label_config}
-    return client.post(endpoint, json=payload) 
\ No newline at end of file
+    result = await client.post(endpoint, json=payload)
+    if local["warnings"] and isinstance(result, dict):
+        result = {**result, "warnings": local["warnings"]}
+    return result
+
+@mcp.tool(
+    description="Summarize a label config from the local parsed model: object tags with the task data keys they bind, control tags with their toName targets and label choices, and local validation errors/warnings. Pass 'project_id' to use the project's config (through the project cache) or 'label_config' for an XML string. 'control' restricts 'labels' to one control."
+)
+@mcp_tool_error_handler
+async def get_label_config_summary(
+    project_id: Optional[str] = None,
+    label_config: Optional[str] = None,
+    control: Optional[str] = None
+) -> dict:
+    from label_config import parse_label_config, project_label_config
+    if label_config:
+        model = parse_label_config(label_config)
+    elif not project_id:
+        raise ValueError("Either project_id or label_config is required.")
+    else:
+        model = await project_label_config(project_id, valid_only=False)
+        if model is None:
+            return {"summary": None, "warning": "No label_config found for this project."}
+    if control is not None and control not in model.controls:
+        raise ValueError(f"Control '{control}' is not defined in the label config.")
+    return {**model.to_dict(), "labels": model.labels(control)}
+
+@mcp.tool(
+    description="Return hit/miss counters, size and TTLs of the in-process project details cache."
+)
+@mcp_tool_error_handler
+async def get_project_cache_stats() -> dict:
+    from project_cache import get_project_cache
+    return get_project_cache().stats()
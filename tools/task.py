@@ -1,65 +1,344 @@
 from mcp_instance import mcp
-from label_studio_client import LabelStudioClient
 from error_handling import mcp_tool_error_handler
+from response_shaping import decode_cursor, shape_response, top_level_fields
 from typing import Optional, List, Dict
+import asyncio
 import base64
+import logging
+import os
 
 @mcp.tool(
-    description="Import a list of tasks into a Label Studio project. Requires a project_id and a non-empty list of tasks. The 'tasks' parameter is required and must be a non-empty list; omitting it or providing an empty list will result in an error."
+    description="Import a list of tasks into a Label Studio project. Requires a project_id and a non-empty list of tasks. The 'tasks' parameter is required and must be a non-empty list; omitting it or providing an empty list will result in an error. Before anything is sent, tasks missing a data key used by the project's label config are rejected (set 'validate' to false to skip this). Set 'deduplicate' to true to also drop tasks already imported into the project through this server with deduplication on (same data, by content hash). The 'validation' result reports rejected and duplicate counts."
 )
 @mcp_tool_error_handler
-def import_tasks(
+async def import_tasks(
     project_id: str,
-    tasks: List[Dict]
+    tasks: List[Dict],
+    validate: Optional[bool] = None,
+    deduplicate: Optional[bool] = None
 ) -> dict:
+    from label_studio_client import get_async_client
+    from project_cache import invalidate_project
+    from import_filter import build_import_filter
     if not project_id or not isinstance(tasks, list) or not tasks:
         raise ValueError("project_id and a non-empty list of tasks are required.")
-    client = LabelStudioClient()
-    return client.import_tasks(str(project_id), tasks)
+    import_filter = await build_import_filter(project_id, validate, deduplicate)
+    accepted = list(import_filter.filter(tasks))
+    if not accepted:
+        return {"task_count": 0, "validation": import_filter.stats()}
+    client = get_async_client()
+    result = await client.import_tasks(str(project_id), accepted)
+    import_filter.commit(0, len(accepted))
+    invalidate_project(project_id, ["detail", "progress"])
+    return {**result, "validation": import_filter.stats()} if isinstance(result, dict) else result
 
 @mcp.tool(
-    description="List tasks for a given Label Studio project. This endpoint is paginated: use the 'page' parameter to fetch each page in sequence, starting from 1. Supports custom page sizes via 'page_size'. To retrieve all tasks, keep incrementing 'page' and calling this tool until the 'next' field in the response is null. Each response contains 'tasks', 'total', 'next', and 'previous' fields. Filtering is supported via the 'filters' parameter. Annotation results can be included in the response by using the appropriate query parameters."
+    description="Import a large list of tasks in chunks. Tasks are split by count ('chunk_size') and serialized size ('max_chunk_bytes'), uploaded with bounded parallelism ('concurrency'), and each failed chunk is retried on its own. Pass 'checkpoint_path' (a file in LS_EXPORT_DIR) to make the import resumable: re-running with the same tasks and checkpoint skips chunks that already succeeded. Returns an aggregate 'summary' (items imported/failed, throughput) and per-chunk 'chunks' results. Before anything is sent, tasks missing a data key used by the project's label config are rejected (set 'validate' to false to skip this). Set 'deduplicate' to true to also drop tasks already imported into the project through this server with deduplication on (same data, by content hash). The 'validation' result reports rejected and duplicate counts."
 )
 @mcp_tool_error_handler
-def list_tasks(
+async def bulk_import_tasks(
+    project_id: str,
+    tasks: List[Dict],
+    chunk_size: Optional[int] = None,
+    max_chunk_bytes: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    retries: Optional[int] = None,
+    checkpoint_path: Optional[str] = None,
+    validate: Optional[bool] = None,
+    deduplicate: Optional[bool] = None
+) -> dict:
+    from label_studio_client import get_async_client
+    from project_cache import invalidate_project
+    from import_filter import build_import_filter
+    from export_store import resolve_local_path
+    if not project_id or not isinstance(tasks, list) or not tasks:
+        raise ValueError("project_id and a non-empty list of tasks are required.")
+    if checkpoint_path:
+        checkpoint_path = resolve_local_path(checkpoint_path)
+    import_filter = await build_import_filter(project_id, validate, deduplicate)
+    client = get_async_client()
+    try:
+        result = await client.import_tasks_bulk(
+            str(project_id),
+            import_filter.filter(tasks),
+            checkpoint_path=checkpoint_path,
+            on_chunk=import_filter.on_chunk,
+            chunk_size=chunk_size,
+            max_chunk_bytes=max_chunk_bytes,
+            concurrency=concurrency,
+            retries=retries,
+        )
+    finally:
+        invalidate_project(project_id, ["detail", "progress"])
+    result["validation"] = import_filter.stats()
+    return result
+
+@mcp.tool(
+    description="Import tasks from a local file on the server without sending them through the MCP message. Supports JSONL, a JSON array, CSV and TSV (optionally gzip-compressed, format inferred from the extension unless 'format' is given). The file is parsed incrementally and uploaded in concurrent chunks as it is read, so memory stays bounded for any file size. Accepts the same chunking, retry and 'checkpoint_path' options as bulk_import_tasks. Returns the import 'summary', per-chunk results and 'progress' (rows read, rows sent, bytes/sec). Before anything is sent, tasks missing a data key used by the project's label config are rejected (set 'validate' to false to skip this). Set 'deduplicate' to true to also drop tasks already imported into the project through this server with deduplication on (same data, by content hash). The 'validation' result reports rejected and duplicate counts."
+)
+@mcp_tool_error_handler
+async def import_tasks_from_file(
+    project_id: str,
+    path: str,
+    format: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+    max_chunk_bytes: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    retries: Optional[int] = None,
+    checkpoint_path: Optional[str] = None,
+    validate: Optional[bool] = None,
+    deduplicate: Optional[bool] = None
+) -> dict:
+    from label_studio_client import get_async_client
+    from project_cache import invalidate_project
+    from bulk_import import ChunkedUploader
+    from task_sources import iter_task_file, FileProgress
+    from import_filter import build_import_filter
+    from export_store import resolve_local_path
+    if not project_id or not path:
+        raise ValueError("project_id and path are required.")
+    if not os.path.isfile(path):
+        raise ValueError(f"Task file not found: {path}")
+    if checkpoint_path:
+        checkpoint_path = resolve_local_path(checkpoint_path)
+    progress = FileProgress(path)
+    import_filter = await build_import_filter(project_id, validate, deduplicate)
+    rows = import_filter.filter(iter_task_file(path, format=format, progress=progress))
+
+    def on_chunk(chunk):
+        import_filter.on_chunk(chunk)
+        if chunk["status"] == "imported":
+            progress.rows_sent += chunk["item_count"]
+        logging.info(f"import_tasks_from_file {path}: {progress.to_dict()}")
+
+    client = get_async_client()
+    uploader = ChunkedUploader(
+        client,
+        f"/api/projects/{project_id}/import",
+        chunk_size=chunk_size,
+        max_chunk_bytes=max_chunk_bytes,
+        concurrency=concurrency,
+        retries=retries,
+        checkpoint_path=checkpoint_path,
+    )
+    try:
+        result = await uploader.run(rows, on_chunk=on_chunk)
+    finally:
+        invalidate_project(project_id, ["detail", "progress"])
+    result["progress"] = progress.to_dict()
+    result["validation"] = import_filter.stats()
+    return result
+
+@mcp.tool(
+    description="Upload model predictions for existing tasks in bulk (pre-labeling). Give either 'path' to a local JSONL/JSON/CSV file of rows (optionally gzip-compressed) or the compact columns 'task_ids', 'labels' and optional 'scores'. A row has 'task_id' and either a 'label' (a string, or a list for multi-choice or a taxonomy path) for the classification control 'from_name' (default: the label config's only Choices/Taxonomy control), or a ready-made 'result' list; 'score' and 'model_version' are optional. Rows are converted and uploaded in concurrent chunks as they are read, each failed chunk is retried on its own, and 'checkpoint_path' makes the upload resumable. Rows with unknown labels or bad task ids are skipped and counted in 'conversion'. Returns a 'summary' (predictions created, failed, throughput) and the 'failed_chunks'."
+)
+@mcp_tool_error_handler
+async def import_predictions(
+    project_id: str,
+    path: Optional[str] = None,
+    task_ids: Optional[List[int]] = None,
+    labels: Optional[List] = None,
+    scores: Optional[List[float]] = None,
+    format: Optional[str] = None,
+    from_name: Optional[str] = None,
+    model_version: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+    max_chunk_bytes: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    retries: Optional[int] = None,
+    checkpoint_path: Optional[str] = None,
+    max_bytes: Optional[int] = None
+) -> dict:
+    from label_studio_client import get_async_client
+    from project_cache import invalidate_project
+    from task_sources import iter_task_file, FileProgress
+    from predictions import build_prediction_builder, iter_column_records
+    from export_store import resolve_local_path
+    if not project_id:
+        raise ValueError("project_id is required.")
+    if bool(path) == (task_ids is not None):
+        raise ValueError("Pass either path or task_ids/labels/scores.")
+    if checkpoint_path:
+        checkpoint_path = resolve_local_path(checkpoint_path)
+    progress = None
+    if path:
+        if not os.path.isfile(path):
+            raise ValueError(f"Prediction file not found: {path}")
+        progress = FileProgress(path)
+        rows = iter_task_file(path, format=format, progress=progress)
+    else:
+        rows = iter_column_records(task_ids, labels, scores)
+    builder = await build_prediction_builder(project_id, from_name, model_version)
+    rows = builder.check_rows(rows)
+
+    def on_chunk(chunk):
+        if progress is not None:
+            if chunk["status"] == "imported":
+                progress.rows_sent += chunk["item_count"]
+            logging.info(f"import_predictions {path}: {progress.to_dict()}")
+
+    client = get_async_client()
+    try:
+        result = await client.import_predictions_bulk(
+            str(project_id),
+            builder.convert(rows),
+            checkpoint_path=checkpoint_path,
+            on_chunk=on_chunk,
+            chunk_size=chunk_size,
+            max_chunk_bytes=max_chunk_bytes,
+            concurrency=concurrency,
+            retries=retries,
+        )
+    finally:
+        invalidate_project(project_id, ["detail", "progress"])
+    response = {
+        "summary": result["summary"],
+        "conversion": builder.stats(),
+        "failed_chunks": [chunk for chunk in result["chunks"] if chunk["status"] == "failed"],
+    }
+    if progress is not None:
+        response["progress"] = progress.to_dict()
+    return shape_response(response, items_key="failed_chunks", max_bytes=max_bytes,
+                          hint="Re-run with the same checkpoint_path to retry only the failed chunks.")
+
+@mcp.tool(
+    description="List tasks for a given Label Studio project. This endpoint is paginated: use the 'page' parameter to fetch each page in sequence, starting from 1. Supports custom page sizes via 'page_size'. To retrieve all tasks, keep incrementing 'page' and calling this tool until the 'next' field in the response is null. Each response contains 'tasks', 'total', 'next', and 'previous' fields. Filtering is supported via the 'filters' parameter. Annotation results can be included in the response by passing the appropriate query parameters in 'query_params'. Use 'fields' to keep only some task fields (e.g. ['id', 'data.text']); when neither annotations nor predictions are selected they are not fetched from Label Studio at all. Responses larger than 'max_bytes' (default LS_RESPONSE_MAX_BYTES) are cut and return a 'next_cursor'; pass it back as 'cursor' with the same other arguments to continue."
+)
+@mcp_tool_error_handler
+async def list_tasks(
     project_id: str,
     page: Optional[int] = None,
     page_size: Optional[int] = None,
     filters: Optional[dict] = None,
-    **kwargs
+    query_params: Optional[dict] = None,
+    fields: Optional[List[str]] = None,
+    max_bytes: Optional[int] = None,
+    cursor: Optional[str] = None
 ) -> dict:
+    from label_studio_client import get_async_client, TASK_RELATED_FIELDS
     if not project_id:
         raise ValueError("project_id is required.")
-    client = LabelStudioClient()
-    query_params = {}
+    client = get_async_client()
+    state = decode_cursor(cursor) if cursor else {}
+    page = state.get('page', page)
+    params = dict(query_params or {})
     if page is not None:
-        query_params['page'] = page
+        params['page'] = page
     if page_size is not None:
-        query_params['page_size'] = page_size
+        params['page_size'] = page_size
+    if filters is not None:
+        params['filters'] = filters
+    if fields and not TASK_RELATED_FIELDS & set(top_level_fields(fields)):
+        params.setdefault('fields', 'task_only')
+    result = await client.list_tasks(project_id, **params)
+    items_key = 'tasks' if isinstance(result, dict) and 'tasks' in result else 'results'
+    return shape_response(result, fields, items_key, max_bytes, state.get('offset', 0), {'page': page or 1})
+
+@mcp.tool(
+    description="Fetch ALL tasks of a project in one call instead of paging with list_tasks. Reads the total and the served page size from the first page, then fetches the remaining pages concurrently ('concurrency') and returns tasks in page order. Use 'fields' to keep only the task fields you need (e.g. ['id', 'data']). If 'output_path' is given, tasks are written to that local JSONL file in LS_EXPORT_DIR and only the path and count are returned; otherwise tasks are returned in 'items', cut and marked 'truncated' beyond 'max_bytes' (default LS_RESPONSE_MAX_BYTES). 'filters' works as in list_tasks."
+)
+@mcp_tool_error_handler
+async def fetch_all_tasks(
+    project_id: str,
+    fields: Optional[List[str]] = None,
+    output_path: Optional[str] = None,
+    page_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    filters: Optional[dict] = None,
+    max_bytes: Optional[int] = None
+) -> dict:
+    from label_studio_client import get_async_client
+    from pagination import collect
+    if not project_id:
+        raise ValueError("project_id is required.")
+    client = get_async_client()
+    query_params = {}
     if filters is not None:
         query_params['filters'] = filters
-    query_params.update(kwargs)
-    return client.list_tasks(project_id, **query_params)
+    tasks = client.iter_all_tasks(project_id, page_size=page_size, concurrency=concurrency, fields=fields, **query_params)
+    return await collect(tasks, output_path, max_bytes)
 
 @mcp.tool(
-    description="Export annotations for a given Label Studio project. Optionally specify exportType for format."
+    description="Export annotations for a given Label Studio project. Optionally specify exportType for format. The whole export is returned in one response; for large projects use export_annotations_to_file instead."
 )
 @mcp_tool_error_handler
-def export_annotations(
+async def export_annotations(
     project_id: str,
     exportType: Optional[str] = None,
-    **kwargs
+    query_params: Optional[dict] = None
 ) -> dict:
+    from label_studio_client import get_async_client
     if not project_id:
         raise ValueError("project_id is required.")
-    client = LabelStudioClient()
-    query_params = {}
+    client = get_async_client()
+    params = dict(query_params or {})
     if exportType is not None:
-        query_params['exportType'] = exportType
-    query_params.update(kwargs)
-    content, content_type = client.export_annotations(project_id, **query_params)
+        params['exportType'] = exportType
+    content, content_type = await client.export_annotations(project_id, **params)
     if 'json' in content_type.lower():
         return {'content': content, 'content_type': content_type}
     else:
         encoded = base64.b64encode(content).decode('utf-8')
-        return {'content': encoded, 'content_type': content_type, 'encoding': 'base64'} 
\ No newline at end of file
+        return {'content': encoded, 'content_type': content_type, 'encoding': 'base64'}
+
+@mcp.tool(
+    description="Stream a project export to a local file on the server instead of returning it in the response. 'path' must be inside LS_EXPORT_DIR (default: a timestamped file there). Optionally gzip-compress it on the fly ('compress'). Returns a handle with the file 'path', 'file_size', 'bytes_received', 'sha256' of the export content and 'record_count'. Use read_export_page with the returned path to read records in pages. Extra export options (e.g. download_all_tasks) can be passed in 'query_params'."
+)
+@mcp_tool_error_handler
+async def export_annotations_to_file(
+    project_id: str,
+    exportType: Optional[str] = None,
+    path: Optional[str] = None,
+    compress: bool = False,
+    query_params: Optional[dict] = None
+) -> dict:
+    from label_studio_client import get_async_client
+    from export_store import resolve_local_path
+    if not project_id:
+        raise ValueError("project_id is required.")
+    client = get_async_client()
+    params = dict(query_params or {})
+    if exportType is not None:
+        params['exportType'] = exportType
+    if path:
+        path = resolve_local_path(path)
+    return await client.export_annotations_to_file(project_id, path=path, compress=compress, **params)
+
+@mcp.tool(
+    description="Incremental export: keep a local compacted JSONL snapshot of a project's tasks and annotations, and on each run fetch only tasks updated since the stored watermark (the first run, or full=True, fetches everything). Returns a delta manifest with the task ids 'added', 'updated' and 'deleted' since the previous run, the 'snapshot_path', and 'delta_records_path' holding just the changed tasks. 'detect_deletions' lists task ids (without annotations) to find deleted tasks. 'columnar' also writes the annotation columns (.columns.npz) used by the analytics tools. Read the files with read_export_page or pass 'snapshot_path' as 'path' to the analytics tools."
+)
+@mcp_tool_error_handler
+async def export_annotations_incremental(
+    project_id: str,
+    full: bool = False,
+    detect_deletions: bool = True,
+    columnar: bool = False,
+    max_bytes: Optional[int] = None
+) -> dict:
+    from label_studio_client import get_async_client
+    from export_snapshots import update_snapshot
+    if not project_id:
+        raise ValueError("project_id is required.")
+    client = get_async_client()
+    manifest = await update_snapshot(client, project_id, full=full, detect_deletions=detect_deletions, columnar=columnar)
+    return shape_response(manifest, max_bytes=max_bytes)
+
+@mcp.tool(
+    description="Read a page of records from an export file written by export_annotations_to_file (JSON, JSONL, CSV or TSV, optionally .gz). Only files in LS_EXPORT_DIR or LS_SNAPSHOT_DIR can be read. Use 'offset' and 'limit' (at most 1000) to page through the file; keep calling with 'offset' set to the returned 'next_offset' until it is null. Pages larger than 'max_bytes' (default LS_RESPONSE_MAX_BYTES) are cut and marked 'truncated', with 'next_offset' pointing at the first omitted record."
+)
+@mcp_tool_error_handler
+async def read_export_page(
+    path: str,
+    offset: int = 0,
+    limit: int = 100,
+    max_bytes: Optional[int] = None
+) -> dict:
+    from export_store import read_records, resolve_local_path
+    if not path:
+        raise ValueError("path is required.")
+    page = await asyncio.to_thread(read_records, resolve_local_path(path), offset, limit)
+    result = shape_response(page, items_key="records", max_bytes=max_bytes,
+                            hint="Continue from next_offset, or pass a smaller limit.")
+    if "truncated" in result:
+        result["next_offset"] = offset + result["truncated"]["returned_items"]
+    return result
@@ -1,32 +1,69 @@
 from mcp_instance import mcp
-from label_studio_client import LabelStudioClient
 from error_handling import mcp_tool_error_handler
-from typing import Optional
+from response_shaping import decode_cursor, shape_response
+from typing import Optional, List
 
 @mcp.tool(
-    description="List users from Label Studio. This endpoint is paginated: use the 'page' and 'page_size' parameters to fetch each page in sequence, starting from 1. To retrieve all users, keep incrementing 'page' and calling this tool until the 'next' field in the response is null. Each response contains 'results', 'count', 'next', and 'previous' fields."
+    description="List users from Label Studio. This endpoint is paginated: use the 'page' and 'page_size' parameters to fetch each page in sequence, starting from 1. To retrieve all users, keep incrementing 'page' and calling this tool until the 'next' field in the response is null. Each response contains 'results', 'count', 'next', and 'previous' fields. Use 'fields' to keep only some user fields (e.g. ['id', 'email']). Responses larger than 'max_bytes' (default LS_RESPONSE_MAX_BYTES) are cut and return a 'next_cursor'; pass it back as 'cursor' with the same other arguments to continue."
 )
 @mcp_tool_error_handler
-def list_users(page: int = 1, page_size: int = 20) -> dict:
-    client = LabelStudioClient()
+async def list_users(
+    page: int = 1,
+    page_size: int = 20,
+    fields: Optional[List[str]] = None,
+    max_bytes: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> dict:
+    from label_studio_client import get_async_client
+    client = get_async_client()
+    state = decode_cursor(cursor) if cursor else {}
+    page = state.get('page', page)
     params = {'page': page, 'page_size': page_size}
-    return client.get('/api/users/', params=params)
+    result = await client.get('/api/users/', params=params)
+    return shape_response(result, fields, 'results', max_bytes, state.get('offset', 0), {'page': page})
 
 @mcp.tool(
-    description="List all users assigned to a specific project. Returns all users assigned to the project. Each response contains 'results', 'count', 'next', and 'previous' fields."
+    description="Fetch ALL users in one call instead of paging with list_users. Pages are fetched concurrently and returned in order. Use 'fields' to keep only the user fields you need (e.g. ['id', 'email']). If 'output_path' is given, users are written to that local JSONL file in LS_EXPORT_DIR and only the path and count are returned. In-memory results larger than 'max_bytes' (default LS_RESPONSE_MAX_BYTES) are cut and marked 'truncated'."
 )
 @mcp_tool_error_handler
-def list_project_users(project_id: str) -> dict:
+async def fetch_all_users(
+    fields: Optional[List[str]] = None,
+    output_path: Optional[str] = None,
+    page_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    max_bytes: Optional[int] = None
+) -> dict:
+    from label_studio_client import get_async_client
+    from pagination import collect
+    client = get_async_client()
+    users = client.iter_all_users(page_size=page_size, concurrency=concurrency, fields=fields)
+    return await collect(users, output_path, max_bytes)
+
+@mcp.tool(
+    description="List all users assigned to a specific project. Returns all users assigned to the project. Each response contains 'results', 'count', 'next', and 'previous' fields. Use 'fields' to keep only some member fields. Responses larger than 'max_bytes' (default LS_RESPONSE_MAX_BYTES) are cut and return a 'next_cursor'; pass it back as 'cursor' with the same other arguments to continue."
+)
+@mcp_tool_error_handler
+async def list_project_users(
+    project_id: str,
+    fields: Optional[List[str]] = None,
+    max_bytes: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> dict:
+    from label_studio_client import get_async_client
     if not project_id:
         raise ValueError("project_id is required.")
-    client = LabelStudioClient()
+    client = get_async_client()
+    state = decode_cursor(cursor) if cursor else {}
     endpoint = f"/api/projects/{project_id}/members/"
-    return client.get(endpoint)
+    result = await client.get(endpoint)
+    return shape_response(result, fields, 'results', max_bytes, state.get('offset', 0), {})
 
 @mcp.tool(
-    description="Get information about the currently authenticated user."
+    description="Get information about the currently authenticated user. Use 'fields' to return only some fields."
 )
 @mcp_tool_error_handler
-def whoami() -> dict:
-    client = LabelStudioClient()
-    return client.get('/api/current-user/whoami') 
\ No newline at end of file
+async def whoami(fields: Optional[List[str]] = None) -> dict:
+    from label_studio_client import get_async_client
+    client = get_async_client()
+    result = await client.get('/api/current-user/whoami')
+    return shape_response(result, fields) 
\ No newline at end of file